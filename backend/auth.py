@@ -1,15 +1,13 @@
-import os
 import random
 from flask import Blueprint, request, jsonify
-from supabase import create_client, Client
+from supabase import Client
 from dotenv import load_dotenv
+import supabase_client
 
 load_dotenv()
 auth_bp = Blueprint("auth", __name__)
 
-SUPABASE_URL = os.environ["SUPABASE_URL"]
-SUPABASE_KEY = os.environ["SUPABASE_SERVICE_KEY"]
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+supabase: Client = supabase_client.get_client()
 
 
 # -----------------------------
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark: per-call latency of a fresh Supabase client versus the shared one.
+
+"fresh" builds a new client for every query, as repos constructed per call used
+to (new pool, new connection, new TLS handshake). "shared" reuses
+supabase_client's pooled client, so only the first query pays for the connection.
+
+By default the queries go to a local stand-in for PostgREST over plain HTTP, so
+the numbers show client construction plus TCP setup only. Use --live to query the
+real project from SUPABASE_URL, where each fresh client also pays DNS and TLS.
+
+    python bench_supabase_client.py                 # local stand-in, 200 calls
+    python bench_supabase_client.py --calls 50 --live --table task
+"""
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+from supabase import create_client
+
+import supabase_client
+
+
+class _FakePostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+    def do_GET(self):
+        body = json.dumps([{"id": 1}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_fake_server() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakePostgrestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _measure(calls: int, query: Callable[[], None]) -> List[float]:
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        query()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: List[float]) -> None:
+    ordered = sorted(timings)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(f"{label:<8} mean {statistics.mean(timings):8.2f} ms   p50 {statistics.median(timings):8.2f} ms   "
+          f"p95 {p95:8.2f} ms   first {timings[0]:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="queries per variant")
+    parser.add_argument("--live", action="store_true", help="query SUPABASE_URL instead of a local stand-in")
+    parser.add_argument("--table", default="task", help="table to select one row from")
+    args = parser.parse_args()
+
+    if args.live:
+        url, key = os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVICE_KEY"]
+    else:
+        url, key = _start_fake_server(), "bench-key"
+
+    def fresh_query():
+        client = create_client(url, key)
+        client.table(args.table).select("id").limit(1).execute()
+        client.postgrest.session.close()
+
+    shared = supabase_client.build_client(url, key)
+
+    def shared_query():
+        shared.table(args.table).select("id").limit(1).execute()
+
+    print(f"{args.calls} calls per variant against {'SUPABASE_URL' if args.live else url}")
+    _report("fresh", _measure(args.calls, fresh_query))
+    _report("shared", _measure(args.calls, shared_query))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 import os
+import sys
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 from pathlib import Path
 
+# Make the shared backend modules (supabase_client, service_client, notification_outbox)
+# importable for this service's repos and services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Load .env from parent directory (backend/.env)
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
@@ -16,6 +21,10 @@ def create_app():
     from controllers.comment_controller import comment_bp
     app.register_blueprint(comment_bp)
 
+    # Deliver notification triggers left in the outbox by a previous run
+    import notification_outbox  # importable once the services have set up the backend path
+    notification_outbox.start_dispatcher()
+
     return app
 
 if __name__ == "__main__":
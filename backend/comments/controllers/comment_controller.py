@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from services.comment_service import CommentService
+from utils.parsing import parse_comment_list_query, parse_task_ids
 
 comment_bp = Blueprint("comments", __name__, url_prefix="/comments")
 service = CommentService()
@@ -37,23 +38,59 @@ def create_comment():
 @comment_bp.route("/task/<int:task_id>", methods=["GET"])
 def get_task_comments(task_id: int):
     """
-    Get all comments for a specific task.
+    Get the comments of a task, newest first.
     
     Parameters:
     - task_id: ID of the task
     
+    Query parameters (optional):
+    - limit: page size (1-200); omit for every comment
+    - cursor: next_cursor from the previous page
+    
     Returns:
     {
         "Code": 200,
         "Message": "Success",
-        "data": [ ... list of comments ... ]
+        "data": [ ... list of comments ... ],
+        "next_cursor": "<cursor>" | null   (only when limit is given)
     }
     """
     try:
-        result = service.get_comments_by_task(task_id)
+        query = parse_comment_list_query(request.args)
+        result = service.get_comments_by_task(task_id, **query)
         status_code = result.get("Code", 200)
         return jsonify(result), status_code
         
+    except ValueError as ve:
+        return jsonify({"Code": 400, "Message": str(ve)}), 400
+    except Exception as e:
+        return jsonify({"Code": 500, "Message": str(e)}), 500
+
+@comment_bp.route("/counts", methods=["GET"])
+def get_comment_counts():
+    """
+    Get comment counts for many tasks in one call, e.g. for a task board.
+    
+    Query parameters:
+    - task_ids: comma-separated task IDs (at most 500)
+    - latest: "true" to also return each task's most recent comment
+    
+    Returns:
+    {
+        "Code": 200,
+        "Message": "Success",
+        "data": [ {"task_id": 1, "count": 3, "latest": { ... comment ... } | null}, ... ]
+    }
+    """
+    try:
+        task_ids = parse_task_ids(request.args.get("task_ids"))
+        include_latest = request.args.get("latest", "").lower() in ("1", "true", "yes")
+        result = service.get_comment_counts(task_ids, include_latest=include_latest)
+        status_code = result.get("Code", 200)
+        return jsonify(result), status_code
+        
+    except ValueError as ve:
+        return jsonify({"Code": 400, "Message": str(ve)}), 400
     except Exception as e:
         return jsonify({"Code": 500, "Message": str(e)}), 500
 
@@ -0,0 +1,19 @@
+-- Index and function behind CommentRepo.count_by_tasks (GET /comments/counts).
+-- Run once in the Supabase SQL editor, or with psql, before deploying the
+-- comments service.
+--
+-- The counts are grouped in the database, so the service reads one row per
+-- task however many comments the tasks have.
+
+-- Serves both the grouped counts and the keyset-paginated threads
+CREATE INDEX IF NOT EXISTS idx_comment_task_created ON comment (task_id, created_at DESC, id DESC);
+
+-- Comment count and latest comment id (newest created_at, then highest id) of
+-- each given task. Tasks without comments are not returned.
+CREATE OR REPLACE FUNCTION comment_counts(p_task_ids BIGINT[])
+RETURNS TABLE (task_id BIGINT, comment_count BIGINT, latest_id BIGINT) LANGUAGE sql STABLE AS $$
+    SELECT c.task_id::BIGINT, count(*), (array_agg(c.id ORDER BY c.created_at DESC, c.id DESC))[1]::BIGINT
+    FROM comment c
+    WHERE c.task_id = ANY (p_task_ids)
+    GROUP BY c.task_id;
+$$;
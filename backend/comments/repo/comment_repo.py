@@ -1,18 +1,17 @@
 import os
-from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from typing import Optional, Dict, Any, List, Tuple
+from supabase import Client
 from dotenv import load_dotenv
 
-load_dotenv()
+import supabase_client
 
-SUPABASE_URL = os.environ["SUPABASE_URL"]
-SUPABASE_KEY = os.environ["SUPABASE_SERVICE_KEY"]
+load_dotenv()
 
 TABLE = "comment"
 
 class CommentRepo:
     def __init__(self):
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.client: Client = supabase_client.get_client()
 
     def insert_comment(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Insert a new comment into the database."""
@@ -21,9 +20,38 @@ class CommentRepo:
             raise RuntimeError("Insert failed – no data returned")
         return res.data[0]
 
-    def find_by_task(self, task_id: int) -> List[Dict[str, Any]]:
-        """Find all comments for a specific task, ordered by created_at descending."""
-        res = self.client.table(TABLE).select("*").eq("task_id", task_id).order("created_at", desc=True).execute()
+    def find_by_task(self, task_id: int, limit: Optional[int] = None,
+                     cursor: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Find comments for a specific task, newest first.
+
+        When limit or cursor is given, results are keyset-paginated on (created_at, id).
+        """
+        query = self.client.table(TABLE).select("*").eq("task_id", task_id)
+        if cursor is not None:
+            created_at, last_id = cursor
+            # Quote the timestamp: it contains PostgREST-reserved characters (':' and '.')
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id})'
+            )
+        query = query.order("created_at", desc=True).order("id", desc=True)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.execute().data or []
+
+    def count_by_tasks(self, task_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        task_id, comment_count and latest_id of every listed task that has comments,
+        grouped in the database by the comment_counts function (see comment_counts.sql).
+        """
+        res = self.client.rpc("comment_counts", {"p_task_ids": task_ids}).execute()
+        return res.data or []
+
+    def find_by_ids(self, comment_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get several comments by ID in one query."""
+        if not comment_ids:
+            return []
+        res = self.client.table(TABLE).select("*").in_("id", comment_ids).execute()
         return res.data or []
 
     def get_comment(self, comment_id: int) -> Optional[Dict[str, Any]]:
@@ -46,3 +74,4 @@ class CommentRepo:
         """Delete a comment by its ID."""
         res = self.client.table(TABLE).delete().eq("id", comment_id).execute()
         return len(res.data) > 0
+
@@ -38,7 +38,7 @@ def run_model_tests():
         env['PYTHONPATH'] = os.getcwd()
         
         result = subprocess.run([sys.executable, "-m", "unittest", 
-                               "test_comment_model", "-v"],
+                               "test_comment_model", "test_comment_service", "-v"],
                               cwd="tests", capture_output=True, text=True, env=env)
         
         print("Model Test Results:")
@@ -1,9 +1,12 @@
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, UTC
 import re
-import requests
 from models.comment import Comment
 from repo.comment_repo import CommentRepo
+from utils.parsing import encode_comment_cursor
+
+import service_client
+import notification_outbox
 
 class CommentService:
     def __init__(self, repo: Optional[CommentRepo] = None):
@@ -41,132 +44,88 @@ class CommentService:
         mentions = re.findall(mention_pattern, content)
         return list(set(mentions))  # Remove duplicates
 
-    def _get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
+    def _get_task(self, task_id: int) -> Optional[Dict[str, Any]]:
         """
-        Get user by username (extracted from email).
+        Fetch the task from the tasks service, or None if it cannot be loaded.
         """
         try:
-            # Search for user by email pattern (username@domain)
-            users = self.repo.client.table("user").select("userid, email, name, role").execute()
-            for user in users.data:
-                if user.get('email'):
-                    email_username = self._extract_username_from_email(user['email'])
-                    if email_username.lower() == username.lower():
-                        return user
-            return None
+            response = service_client.get("tasks", f"/tasks/{task_id}")
+            if response.status_code == 200:
+                return response.json().get('task') or None
         except Exception as e:
-            print(f"Error fetching user by username {username}: {e}")
-            return None
+            print(f"Warning: Could not fetch task {task_id}: {e}")
+        return None
 
-    def _get_task_collaborators(self, task_id: int) -> List[int]:
+    def _load_comment_context(self, task_id: int, user_id: int) -> Dict[str, Any]:
         """
-        Get all collaborators for a task (owner + collaborators list).
+        Load everything a new comment needs about its author and its task, once:
+        one user row and one task fetch, shared by the comment row and its notifications.
         """
-        try:
-            # Get task details from tasks service
-            response = requests.get(f"http://127.0.0.1:5002/tasks/{task_id}")
-            if response.status_code == 200:
-                task_data = response.json()
-                collaborators = []
-                
-                # Add owner
-                if task_data.get('task', {}).get('owner_id'):
-                    collaborators.append(task_data['task']['owner_id'])
-                
-                # Add collaborators
-                task_collaborators = task_data.get('task', {}).get('collaborators', [])
-                if task_collaborators:
-                    collaborators.extend(task_collaborators)
-                
-                return list(set(collaborators))  # Remove duplicates
-            return []
-        except Exception as e:
-            print(f"Error fetching task collaborators for task {task_id}: {e}")
-            return []
+        return {"user": self._get_user_data(user_id), "task": self._get_task(task_id)}
 
-    def _send_mention_notifications(self, mentions: List[str], commenter_name: str, task_id: int, task_title: str, comment_content: str, commenter_id: int):
+    def _get_task_collaborators(self, task: Optional[Dict[str, Any]]) -> List[int]:
         """
-        Send notifications to mentioned users using structured format.
+        Get all collaborators for a task (owner + collaborators list).
         """
-        # Fetch the commenter's actual name from the database
-        commenter_user_data = self._get_user_data(commenter_id)
-        actual_commenter_name = commenter_name
-        if commenter_user_data and commenter_user_data.get('name'):
-            actual_commenter_name = commenter_user_data['name']
-        
-        for username in mentions:
-            user = self._get_user_by_username(username)
-            if user:
-                try:
-                    response = requests.post("http://127.0.0.1:5006/notifications/triggers/comment-mention-structured", 
-                                           json={
-                                               "task_id": task_id,
-                                               "mentioned_user_id": user['userid'],
-                                               "commenter_name": actual_commenter_name,
-                                               "comment_content": comment_content,
-                                               "task_name": task_title
-                                           })
-                    if response.status_code not in [200, 201]:
-                        print(f"Warning: Failed to send mention notification to user {user['userid']}: {response.status_code}")
-                except Exception as e:
-                    print(f"Error sending mention notification: {e}")
+        if not task:
+            return []
+        collaborators = []
+        if task.get('owner_id'):
+            collaborators.append(task['owner_id'])
+        collaborators.extend(task.get('collaborators') or [])
+        return list(dict.fromkeys(collaborators))  # Remove duplicates
 
-    def _send_collaborator_notifications(self, collaborator_ids: List[int], commenter_name: str, task_id: int, task_title: str, comment_content: str, commenter_id: int):
+    def _mentioned_user_ids(self, mentions: List[str]) -> List[int]:
         """
-        Send notifications to task collaborators (excluding the commenter) using structured format.
+        Resolve @mentions to user IDs with one call to the users service, which answers
+        from its in-memory user index; unknown usernames are skipped.
         """
-        # Fetch the commenter's actual name from the database
-        commenter_user_data = self._get_user_data(commenter_id)
-        actual_commenter_name = commenter_name
-        if commenter_user_data and commenter_user_data.get('name'):
-            actual_commenter_name = commenter_user_data['name']
-        
-        # Exclude the commenter from notifications
-        collaborators_to_notify = [cid for cid in collaborator_ids if cid != commenter_id]
-        
-        for user_id in collaborators_to_notify:
-            try:
-                response = requests.post("http://127.0.0.1:5006/notifications/triggers/comment-collaborator-structured", 
-                                       json={
-                                           "task_id": task_id,
-                                           "collaborator_user_id": user_id,
-                                           "commenter_name": actual_commenter_name,
-                                           "comment_content": comment_content,
-                                           "task_name": task_title
-                                       })
-                if response.status_code not in [200, 201]:
-                    print(f"Warning: Failed to send collaborator notification to user {user_id}: {response.status_code}")
-            except Exception as e:
-                print(f"Error sending collaborator notification: {e}")
+        try:
+            response = service_client.get("users", "/users/by-username",
+                                          params={"usernames": ",".join(mentions)})
+            if response.status_code != 200:
+                print(f"Warning: Could not resolve mentions, users service returned HTTP {response.status_code}")
+                return []
+            users = response.json().get('data') or {}
+        except Exception as e:
+            print(f"Warning: Could not resolve mentions: {e}")
+            return []
+        return list(dict.fromkeys(users[username.lower()]['userid'] for username in mentions
+                                  if username.lower() in users))
 
-    def _trigger_comment_notifications(self, task_id: int, commenter_id: int, commenter_name: str, comment_content: str):
+    def _trigger_comment_notifications(self, task_id: int, commenter_id: int, commenter_name: str,
+                                       comment_content: str, context: Dict[str, Any]):
         """
         Main method to trigger all comment notifications based on the user story requirements.
+        Mentioned users are notified if the comment has mentions, otherwise every task
+        collaborator except the commenter. All recipients go out as one batch trigger.
         """
         try:
-            # Get task title
-            task_title = "Unknown Task"
-            try:
-                response = requests.get(f"http://127.0.0.1:5002/tasks/{task_id}")
-                if response.status_code == 200:
-                    task_data = response.json()
-                    task_title = task_data.get('task', {}).get('task_name', 'Unknown Task')
-            except Exception as e:
-                print(f"Warning: Could not fetch task title: {e}")
+            user, task = context.get('user'), context.get('task')
+            if user and user.get('name'):
+                commenter_name = user['name']
 
-            # Extract mentions from comment content
             mentions = self._extract_mentions(comment_content)
-            
-            # Get task collaborators
-            collaborators = self._get_task_collaborators(task_id)
-            
-            # If there are mentions, send mention notifications only
             if mentions:
-                self._send_mention_notifications(mentions, commenter_name, task_id, task_title, comment_content, commenter_id)
+                kind, recipients = "mention", self._mentioned_user_ids(mentions)
             else:
-                # No mentions, send collaborator notifications to all collaborators
-                self._send_collaborator_notifications(collaborators, commenter_name, task_id, task_title, comment_content, commenter_id)
-                
+                kind = "collaborator"
+                recipients = [cid for cid in self._get_task_collaborators(task) if cid != commenter_id]
+            if not recipients:
+                return
+
+            task_details = None
+            if task:
+                task_details = {field: task[field] for field in ('task_name', 'description', 'status', 'due_date')
+                                if task.get(field) is not None}
+            notification_outbox.enqueue("/notifications/triggers/comment-batch", {
+                "task_id": task_id,
+                "kind": kind,
+                "user_ids": recipients,
+                "commenter_name": commenter_name,
+                "comment_content": comment_content,
+                "task": task_details
+            })
         except Exception as e:
             print(f"Error in _trigger_comment_notifications: {e}")
 
@@ -175,6 +134,10 @@ class CommentService:
         Create a new comment.
         Required fields: task_id, user_id, content
         Optional fields: user_name (will be extracted from email if not provided), user_role
+
+        The commenter and the task are loaded once up front (see _load_comment_context),
+        so a comment costs one user read, one task fetch and one insert, plus a single
+        queued notification trigger.
         """
         # Validate required fields
         required_fields = ['task_id', 'user_id', 'content']
@@ -183,9 +146,11 @@ class CommentService:
         if missing_fields:
             raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
 
-        # If user_name is not provided, fetch from user table
+        context = self._load_comment_context(payload['task_id'], payload['user_id'])
+        user_data = context['user']
+
+        # If user_name is not provided, take it from the user table
         if not payload.get('user_name'):
-            user_data = self._get_user_data(payload['user_id'])
             if user_data and user_data.get('name'):
                 payload['user_name'] = user_data['name']
             elif user_data and user_data.get('email'):
@@ -193,9 +158,8 @@ class CommentService:
             else:
                 payload['user_name'] = "Unknown"
         
-        # If user_role is not provided, fetch from user table
+        # If user_role is not provided, take it from the user table
         if not payload.get('user_role'):
-            user_data = self._get_user_data(payload['user_id'])
             payload['user_role'] = user_data.get('role', 'user').lower() if user_data else 'user'
 
         # Create comment from payload
@@ -214,7 +178,8 @@ class CommentService:
                 task_id=payload['task_id'],
                 commenter_id=payload['user_id'],
                 commenter_name=payload['user_name'],
-                comment_content=payload['content']
+                comment_content=payload['content'],
+                context=context
             )
         except Exception as e:
             print(f"Warning: Failed to trigger comment notifications: {e}")
@@ -225,20 +190,53 @@ class CommentService:
             "data": created
         }
 
-    def get_comments_by_task(self, task_id: int) -> Dict[str, Any]:
-        """Get all comments for a specific task."""
-        comments = self.repo.find_by_task(task_id)
-        if not comments:
+    def get_comments_by_task(self, task_id: int, limit: Optional[int] = None,
+                             cursor: Optional[Tuple[str, int]] = None) -> Dict[str, Any]:
+        """
+        Get the comments of a task, newest first.
+        Pass limit/cursor for keyset pagination; the response then carries next_cursor.
+        """
+        comments = self.repo.find_by_task(task_id, limit=limit, cursor=cursor)
+        # An empty later page is not an error
+        if not comments and cursor is None:
             return {
                 "Code": 404,
                 "Message": f"No comments found for task ID {task_id}",
                 "data": []
             }
-        return {
+        result = {
             "Code": 200,
             "Message": "Success",
             "data": comments
         }
+        if limit is not None:
+            result["next_cursor"] = encode_comment_cursor(comments[-1]) if len(comments) == limit else None
+        return result
+
+    def get_comment_counts(self, task_ids: List[int], include_latest: bool = False) -> Dict[str, Any]:
+        """
+        Comment counts for many tasks at once, and optionally each task's latest comment.
+
+        Counts and latest comment ids come from one grouped query (the comment_counts
+        function, see repo/comment_counts.sql); the latest comments are then read in one
+        query by id. Tasks without comments are reported with a count of 0.
+        """
+        counts = {task_id: 0 for task_id in task_ids}
+        latest_ids: Dict[int, int] = {}
+        for row in self.repo.count_by_tasks(task_ids):
+            counts[row['task_id']] = row['comment_count']
+            latest_ids[row['task_id']] = row['latest_id']
+
+        data = [{"task_id": task_id, "count": count} for task_id, count in counts.items()]
+        if include_latest:
+            latest = {comment['id']: comment for comment in self.repo.find_by_ids(list(latest_ids.values()))}
+            for entry in data:
+                entry["latest"] = latest.get(latest_ids.get(entry["task_id"]))
+        return {
+            "Code": 200,
+            "Message": "Success",
+            "data": data
+        }
 
     def get_comment_by_id(self, comment_id: int) -> Dict[str, Any]:
         """Get a single comment by its ID."""
@@ -6,6 +6,8 @@ from io import BytesIO
 
 # Add parent directory to path to find modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.comment_service import CommentService
 from models.comment import Comment
 from repo.comment_repo import CommentRepo
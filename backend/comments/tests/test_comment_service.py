@@ -0,0 +1,179 @@
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+import sys
+import os
+
+# Add parent directory to path to find modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from services.comment_service import CommentService
+from repo import comment_repo
+from utils.parsing import decode_comment_cursor, encode_comment_cursor, parse_comment_list_query, parse_task_ids
+
+
+def _task_response():
+    response = Mock(status_code=200)
+    response.json.return_value = {"task": {
+        "id": 5, "task_name": "Launch", "description": "Ship it", "status": "Ongoing",
+        "due_date": "2026-10-20T00:00:00Z", "owner_id": 1, "collaborators": [1, 2, 3], "subtasks": []
+    }}
+    return response
+
+
+class TestCreateCommentPipeline(unittest.TestCase):
+    """Unit tests for the upstream calls made by create_comment."""
+
+    def setUp(self):
+        self.repo = MagicMock()
+        self.repo.insert_comment.return_value = {"id": 10}
+        user_query = self.repo.client.table.return_value.select.return_value.eq.return_value.single.return_value
+        user_query.execute.return_value.data = {"email": "alice@example.com", "role": "Manager", "name": "Alice"}
+        self.service = CommentService(repo=self.repo)
+
+    def _create(self, content, users_response=None, **extra):
+        payload = {"task_id": 5, "user_id": 1, "content": content, **extra}
+        if users_response is None:
+            users_response = Mock(status_code=200)
+            users_response.json.return_value = {"data": {"bob": {"userid": 2}, "carol": {"userid": 3}},
+                                                "missing": ["nobody"]}
+        responses = {"tasks": _task_response(), "users": users_response}
+        with patch("services.comment_service.service_client.get",
+                   side_effect=lambda service, path, **kwargs: responses[service]) as service_get, \
+                patch("services.comment_service.notification_outbox.enqueue") as enqueue:
+            result = self.service.create_comment(payload)
+        return result, service_get, enqueue
+
+    def test_context_is_loaded_once(self):
+        """Test one user read and one task fetch fill the comment and its notifications."""
+        result, service_get, enqueue = self._create("Looks good")
+
+        assert result["Code"] == 201
+        assert self.repo.client.table.call_count == 1
+        service_get.assert_called_once_with("tasks", "/tasks/5")
+        inserted = self.repo.insert_comment.call_args.args[0]
+        assert (inserted["user_name"], inserted["user_role"]) == ("Alice", "manager")
+
+    def test_collaborators_are_notified_in_one_batch(self):
+        """Test a comment without mentions queues one trigger for every collaborator but the author."""
+        _, _, enqueue = self._create("Looks good", user_name="A. Smith")
+
+        enqueue.assert_called_once()
+        path, payload = enqueue.call_args.args
+        assert path == "/notifications/triggers/comment-batch"
+        assert payload["kind"] == "collaborator"
+        assert payload["user_ids"] == [2, 3]
+        assert payload["commenter_name"] == "Alice"
+        assert payload["task"] == {"task_name": "Launch", "description": "Ship it", "status": "Ongoing",
+                                   "due_date": "2026-10-20T00:00:00Z"}
+
+    def test_mentions_are_resolved_and_notified_in_one_batch(self):
+        """Test all mentions resolve in one users service call and go out as one trigger."""
+        _, service_get, enqueue = self._create("@Bob and @carol please check, @nobody too")
+
+        users_calls = [call for call in service_get.call_args_list if call.args[0] == "users"]
+        assert len(users_calls) == 1
+        assert users_calls[0].args[1] == "/users/by-username"
+        assert sorted(users_calls[0].kwargs["params"]["usernames"].split(",")) == ["Bob", "carol", "nobody"]
+        enqueue.assert_called_once()
+        payload = enqueue.call_args.args[1]
+        assert payload["kind"] == "mention"
+        assert sorted(payload["user_ids"]) == [2, 3]
+
+    def test_failed_mention_lookup_still_creates_the_comment(self):
+        """Test an unavailable users service skips mention notifications but keeps the comment."""
+        result, _, enqueue = self._create("@bob please check", users_response=Mock(status_code=503))
+
+        assert result["Code"] == 201
+        self.repo.insert_comment.assert_called_once()
+        enqueue.assert_not_called()
+
+    def test_unreachable_task_still_creates_the_comment(self):
+        """Test a failed task fetch skips collaborator notifications but keeps the comment."""
+        with patch("services.comment_service.service_client.get", side_effect=ConnectionError("down")), \
+                patch("services.comment_service.notification_outbox.enqueue") as enqueue:
+            result = self.service.create_comment({"task_id": 5, "user_id": 1, "content": "Hi"})
+
+        assert result["Code"] == 201
+        enqueue.assert_not_called()
+
+
+
+def _comment(comment_id, task_id, created_at):
+    return {"id": comment_id, "task_id": task_id, "created_at": created_at, "content": f"Comment {comment_id}"}
+
+
+class TestCommentThreadsAndCounts(unittest.TestCase):
+    """Unit tests for paginated threads and batched comment counts."""
+
+    def setUp(self):
+        self.repo = MagicMock()
+        self.service = CommentService(repo=self.repo)
+
+    def test_thread_pages_chain_on_created_at_and_id(self):
+        """Test a full page points at its last comment and a later empty page is not a 404."""
+        self.repo.find_by_task.return_value = [_comment(3, 5, "2026-10-18T10:00:00+00:00"),
+                                               _comment(2, 5, "2026-10-18T09:00:00+00:00")]
+
+        result = self.service.get_comments_by_task(5, limit=2)
+
+        assert decode_comment_cursor(result["next_cursor"]) == ("2026-10-18T09:00:00+00:00", 2)
+        self.repo.find_by_task.return_value = []
+        assert self.service.get_comments_by_task(5, limit=2, cursor=("2026-10-18T09:00:00+00:00", 2))["Code"] == 200
+        assert self.service.get_comments_by_task(5)["Code"] == 404
+
+    def test_counts_and_latest_for_many_tasks(self):
+        """Test counts come from one grouped query and latest comments from one query by id."""
+        self.repo.count_by_tasks.return_value = [{"task_id": 5, "comment_count": 2, "latest_id": 4},
+                                                 {"task_id": 6, "comment_count": 1, "latest_id": 2}]
+        self.repo.find_by_ids.return_value = [_comment(4, 5, "2026-10-18T11:00:00+00:00"),
+                                              _comment(2, 6, "2026-10-18T10:00:00+00:00")]
+
+        data = self.service.get_comment_counts([5, 6, 7], include_latest=True)["data"]
+
+        assert [(entry["task_id"], entry["count"]) for entry in data] == [(5, 2), (6, 1), (7, 0)]
+        assert [entry["latest"] and entry["latest"]["id"] for entry in data] == [4, 2, None]
+        self.repo.count_by_tasks.assert_called_once_with([5, 6, 7])
+        assert sorted(self.repo.find_by_ids.call_args.args[0]) == [2, 4]
+
+    def test_counts_without_latest_skip_the_second_query(self):
+        """Test plain counts read nothing but the grouped counts."""
+        self.repo.count_by_tasks.return_value = []
+
+        data = self.service.get_comment_counts([5])["data"]
+
+        assert data == [{"task_id": 5, "count": 0}]
+        self.repo.find_by_ids.assert_not_called()
+
+    def test_query_parameters_are_validated(self):
+        """Test limit, cursor and task_ids parsing."""
+        cursor = encode_comment_cursor(_comment(2, 5, "2026-10-18T09:00:00+00:00"))
+        assert parse_comment_list_query({"limit": "20", "cursor": cursor}) == {
+            "limit": 20, "cursor": ("2026-10-18T09:00:00+00:00", 2)}
+        assert parse_comment_list_query({}) == {"limit": None, "cursor": None}
+        assert parse_task_ids("3, 1,3") == [3, 1]
+        for bad in ({"limit": "0"}, {"limit": "201"}, {"limit": "ten"}, {"cursor": "not-a-cursor"}):
+            with self.assertRaises(ValueError):
+                parse_comment_list_query(bad)
+        for bad in (None, "", "a,b", ",".join(str(i) for i in range(501))):
+            with self.assertRaises(ValueError):
+                parse_task_ids(bad)
+
+    @patch("repo.comment_repo.supabase_client.get_client")
+    def test_repo_builds_keyset_query(self, mock_get_client):
+        """Test the thread query filters after the cursor, newest first, with the page size."""
+        mock_get_client.return_value = MagicMock()
+        repo = comment_repo.CommentRepo()
+        query = repo.client.table.return_value.select.return_value.eq.return_value
+
+        repo.find_by_task(5, limit=20, cursor=("2026-10-18T09:00:00+00:00", 42))
+
+        query.or_.assert_called_once_with('created_at.lt."2026-10-18T09:00:00+00:00",'
+                                          'and(created_at.eq."2026-10-18T09:00:00+00:00",id.lt.42)')
+        ordered = query.or_.return_value.order
+        ordered.assert_called_once_with("created_at", desc=True)
+        ordered.return_value.order.assert_called_once_with("id", desc=True)
+        ordered.return_value.order.return_value.limit.assert_called_once_with(20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import base64
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+# ---- Comment Thread Query Parsing (pagination) ----
+MAX_PAGE_LIMIT = 200
+# Most task ids per comment-count request
+MAX_BATCH_TASK_IDS = 500
+
+def encode_comment_cursor(comment: Dict[str, Any]) -> str:
+    """
+    Build an opaque keyset cursor from the (created_at, id) of the last comment on a page.
+    """
+    raw = json.dumps([comment["created_at"], comment["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_comment_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_comment_cursor back into (created_at, id).
+    """
+    try:
+        created_at, comment_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return str(created_at), int(comment_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: '{cursor}'")
+
+def parse_comment_list_query(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse the optional limit / cursor query parameters of /comments/task/<id>.
+
+    - limit: page size (1..MAX_PAGE_LIMIT). Omit for the full, unpaginated thread.
+    - cursor: next_cursor value returned by the previous page.
+    """
+    g = args.get
+
+    limit = None
+    limit_raw = g("limit")
+    if limit_raw not in (None, ""):
+        try:
+            limit = int(limit_raw)
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+
+    cursor_raw = g("cursor")
+    cursor = decode_comment_cursor(cursor_raw) if cursor_raw else None
+
+    return {"limit": limit, "cursor": cursor}
+
+def parse_task_ids(ids_raw: Optional[str]) -> List[int]:
+    """
+    Parse the comma-separated task_ids of a comment-count request:
+    1..MAX_BATCH_TASK_IDS integers. Duplicates are dropped.
+    """
+    try:
+        task_ids = [int(part) for part in (ids_raw or "").split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("task_ids must be a comma-separated list of integers")
+    if not task_ids:
+        raise ValueError("task_ids is required")
+    if len(task_ids) > MAX_BATCH_TASK_IDS:
+        raise ValueError(f"At most {MAX_BATCH_TASK_IDS} task_ids can be given at once")
+    return list(dict.fromkeys(task_ids))
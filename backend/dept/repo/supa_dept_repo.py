@@ -1,9 +1,9 @@
 import os
 from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from supabase import Client
 from dotenv import load_dotenv
 
-
+import supabase_client
 
 TABLE = "dept"
 
@@ -11,10 +11,7 @@ class SupabaseDeptRepo:
     def __init__(self):
         load_dotenv()
 
-        SUPABASE_URL = os.environ["SUPABASE_URL"]
-        SUPABASE_KEY = os.environ["SUPABASE_SERVICE_KEY"]
-        
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.client: Client = supabase_client.get_client()
 
     def insert_dept(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Insert a new department"""
@@ -1,8 +1,13 @@
 import os
+import sys
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Make the shared backend modules (supabase_client, service_client, notification_outbox)
+# importable for this service's repos and services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 load_dotenv()
 
 def create_app():
@@ -18,5 +23,14 @@ def create_app():
 if __name__ == "__main__":
     app = create_app()
     port = "5006"
+    debug = True
+
+    # Start the notification push hub; with the reloader, only in the process that serves requests
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        from controllers.notification_controller import service
+        from services.notification_hub import REPLAY_LIMIT, hub
+        hub.start(replay=lambda user_id, since: service.repo.find_by_user(user_id, since=since, limit=REPLAY_LIMIT))
+        print(f"Notification push hub listening on port {hub.port}")
+
     print(f"Notifications microservice running on port {port}")
-    app.run(host="0.0.0.0", port=int(port), debug=True)
+    app.run(host="0.0.0.0", port=int(port), debug=debug)
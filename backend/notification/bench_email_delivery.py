@@ -0,0 +1,104 @@
+"""
+Throughput benchmark: one email per recipient versus bulk SendGrid personalizations.
+
+"serial" calls send_email_notification once per recipient, as reminder runs and
+multi-collaborator events used to (one mail/send request each, one after the
+other). "bulk" calls send_bulk_email_notification, which packs up to
+SENDGRID_BATCH_SIZE recipients into each request and sends the chunks
+concurrently on the shared client.
+
+Requests go to a local stand-in for the SendGrid v3 mail/send endpoint that
+answers 202 after --latency ms, so no real email is sent and no API key is used.
+
+    python bench_email_delivery.py                       # 500 recipients, 50 ms provider latency
+    python bench_email_delivery.py --recipients 5000 --latency 100
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Make the shared backend modules (supabase_client) importable for the notification repo
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _FakeSendGridHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.05
+    requests = 0
+    personalizations = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.lock:
+            type(self).requests += 1
+            type(self).personalizations += len(body.get("personalizations", []))
+        time.sleep(self.latency)
+        self.send_response(202)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _start_fake_sendgrid(latency_ms: float) -> str:
+    _FakeSendGridHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeSendGridHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _reset_counters():
+    _FakeSendGridHandler.requests = 0
+    _FakeSendGridHandler.personalizations = 0
+
+
+def _report(label: str, recipients: int, elapsed: float) -> None:
+    print(f"{label:<7} {elapsed:8.2f} s   {recipients / elapsed:10.1f} emails/s   "
+          f"{_FakeSendGridHandler.requests:6d} requests   {_FakeSendGridHandler.personalizations:6d} personalizations")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, default=500, help="emails per variant")
+    parser.add_argument("--latency", type=float, default=50, help="stand-in response time in ms")
+    args = parser.parse_args()
+
+    # Configure the service before importing it so the shared client targets the stand-in
+    os.environ["SENDGRID_API_HOST"] = _start_fake_sendgrid(args.latency)
+    os.environ["SENDGRID_API_KEY"] = "SG.bench-key"
+    os.environ["SENDGRID_FROM_EMAIL"] = "bench@example.com"
+    from services.notification_service import NotificationService
+
+    service = NotificationService(repo=object())  # email only; the repo is never touched
+    recipients = [{"email": f"user{i}@example.com", "substitutions": {"-user_name-": f"User {i}"}}
+                  for i in range(args.recipients)]
+    subject, message = "Deadline Reminder", "<p>Dear <strong>-user_name-</strong>, your task is due soon.</p>"
+
+    print(f"{args.recipients} recipients per variant, {args.latency:.0f} ms per provider call")
+
+    _reset_counters()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # send_email_notification logs every call
+        for recipient in recipients:
+            service.send_email_notification(recipient["email"], subject, message)
+    _report("serial", args.recipients, time.perf_counter() - start)
+
+    _reset_counters()
+    start = time.perf_counter()
+    result = service.send_bulk_email_notification(recipients, subject, message)
+    _report("bulk", args.recipients, time.perf_counter() - start)
+    if result["status"] != 200:
+        print(f"bulk send reported {result['message']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from services.notification_service import NotificationService
 from services.notification_trigger_service import NotificationTriggerService
+from utils.parsing import parse_notification_ids, parse_notification_list_query
 
 notification_bp = Blueprint("notifications", __name__)
 service = NotificationService()
@@ -44,28 +45,39 @@ def create_notification():
 @notification_bp.route("/notifications/user/<int:user_id>", methods=["GET"])
 def get_notifications_by_user(user_id: int):
     """
-    Get all notifications for a specific user.
+    Get notifications for a specific user, newest first.
     
     Parameters:
     - user_id: ID of the user
     
+    Query Parameters (all optional):
+    - fields: Comma-separated notification columns to return (id and created_at always included)
+    - limit: Page size (1-200). Omit to return every notification.
+    - cursor: The next_cursor value from the previous page
+    - since: ISO timestamp; only notifications created at or after it are returned
+    
     Returns:
     {
         "data": [ ... list of notifications ... ],
+        "next_cursor": "<str>" | null (only when limit is given),
         "status": 200
     }
     
     Responses:
-        200: Notifications found and returned
+        200: Notifications found and returned (possibly empty for a cursor or since request)
+        400: Invalid fields, limit, cursor or since
         404: No notifications found for this user
         500: Internal Server Error
     """
     try:
-        result = service.get_notifications_by_user(user_id)
+        query = parse_notification_list_query(request.args)
+        result = service.get_notifications_by_user(user_id, **query)
         status_code = result.pop("status", 200)
         
         return jsonify(result), status_code
         
+    except ValueError as ve:
+        return jsonify({"error": str(ve), "status": 400}), 400
     except Exception as e:
         return jsonify({"error": str(e), "status": 500}), 500
 
@@ -185,24 +197,95 @@ def get_unread_count(user_id: int):
 @notification_bp.route("/notifications/user/<int:user_id>/unread", methods=["GET"])
 def get_unread_notifications(user_id: int):
     """
-    Get all unread notifications for a user.
+    Get unread notifications for a user, newest first.
     
     Parameters:
     - user_id: ID of the user
     
+    Query Parameters (all optional): fields, limit, cursor and since, as for
+    GET /notifications/user/<user_id>
+    
     Returns:
     {
         "data": [ ... list of unread notifications ... ],
+        "next_cursor": "<str>" | null (only when limit is given),
         "status": 200
     }
     
     Responses:
-        200: Unread notifications found and returned
+        200: Unread notifications found and returned (possibly empty for a cursor or since request)
+        400: Invalid fields, limit, cursor or since
         404: No unread notifications found for this user
         500: Internal Server Error
     """
     try:
-        result = service.get_unread_notifications(user_id)
+        query = parse_notification_list_query(request.args)
+        result = service.get_unread_notifications(user_id, **query)
+        status_code = result.pop("status", 200)
+        
+        return jsonify(result), status_code
+        
+    except ValueError as ve:
+        return jsonify({"error": str(ve), "status": 400}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "status": 500}), 500
+
+@notification_bp.route("/notifications/user/<int:user_id>/read", methods=["PUT", "PATCH"])
+def mark_notifications_as_read(user_id: int):
+    """
+    Mark several of a user's notifications as read in one query.
+    
+    Parameters:
+    - user_id: ID of the user owning the notifications
+    
+    Required fields in JSON body:
+    - ids: List of notification IDs (at most 500); IDs of other users are ignored
+    
+    Returns:
+    {
+        "message": "<n> notification(s) marked as read",
+        "data": { "updated": <n> },
+        "status": 200
+    }
+    
+    Responses:
+        200: Notifications marked as read
+        400: Missing or invalid ids
+        500: Internal Server Error
+    """
+    try:
+        ids = parse_notification_ids(request.get_json(silent=True) or {})
+        result = service.mark_notifications_as_read(user_id, ids)
+        status_code = result.pop("status", 200)
+        
+        return jsonify(result), status_code
+        
+    except ValueError as ve:
+        return jsonify({"error": str(ve), "status": 400}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "status": 500}), 500
+
+@notification_bp.route("/notifications/user/<int:user_id>/read-all", methods=["PUT", "PATCH"])
+def mark_all_notifications_as_read(user_id: int):
+    """
+    Mark every unread notification of a user as read in one query.
+    
+    Parameters:
+    - user_id: ID of the user
+    
+    Returns:
+    {
+        "message": "<n> notification(s) marked as read",
+        "data": { "updated": <n> },
+        "status": 200
+    }
+    
+    Responses:
+        200: Notifications marked as read
+        500: Internal Server Error
+    """
+    try:
+        result = service.mark_all_notifications_as_read(user_id)
         status_code = result.pop("status", 200)
         
         return jsonify(result), status_code
@@ -210,6 +293,41 @@ def get_unread_notifications(user_id: int):
     except Exception as e:
         return jsonify({"error": str(e), "status": 500}), 500
 
+@notification_bp.route("/notifications/user/<int:user_id>/delete", methods=["POST"])
+def delete_notifications(user_id: int):
+    """
+    Delete several of a user's notifications in one query.
+    
+    Parameters:
+    - user_id: ID of the user owning the notifications
+    
+    Required fields in JSON body:
+    - ids: List of notification IDs (at most 500); IDs of other users are ignored
+    
+    Returns:
+    {
+        "message": "<n> notification(s) deleted",
+        "data": { "deleted": [ ... deleted notification IDs ... ] },
+        "status": 200
+    }
+    
+    Responses:
+        200: Notifications deleted
+        400: Missing or invalid ids
+        500: Internal Server Error
+    """
+    try:
+        ids = parse_notification_ids(request.get_json(silent=True) or {})
+        result = service.delete_notifications(user_id, ids)
+        status_code = result.pop("status", 200)
+        
+        return jsonify(result), status_code
+        
+    except ValueError as ve:
+        return jsonify({"error": str(ve), "status": 400}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "status": 500}), 500
+
 @notification_bp.route("/notifications/<int:notification_id>", methods=["DELETE"])
 def delete_notification(notification_id: int):
     """
@@ -410,10 +528,7 @@ def trigger_task_collaborator_addition_notification():
         if not task_id or not collaborator_ids:
             return jsonify({"error": "task_id and collaborator_ids are required", "status": 400}), 400
         
-        results = []
-        for collaborator_id in collaborator_ids:
-            result = trigger_service.notify_task_assignment(task_id, collaborator_id, creator_name)
-            results.append({"user_id": collaborator_id, "result": result})
+        results = trigger_service.notify_task_collaborator_addition(task_id, collaborator_ids, creator_name)
         
         return jsonify({"message": "Collaborator notifications sent", "results": results, "status": 200}), 200
         
@@ -564,4 +679,46 @@ def trigger_comment_collaborator_structured_notification():
         return jsonify(result), status_code
         
     except Exception as e:
-        return jsonify({"error": str(e), "status": 500}), 500
\ No newline at end of file
+        return jsonify({"error": str(e), "status": 500}), 500
+
+@notification_bp.route("/notifications/triggers/comment-batch", methods=["POST"])
+def trigger_comment_batch_notification():
+    """
+    Trigger every notification of one comment in a single call.
+    
+    Required fields in JSON body:
+    - task_id: ID of the task
+    - kind: "mention" (mentioned users) or "collaborator" (task collaborators)
+    - user_ids: IDs of the users to notify
+    - commenter_name: Name of the person who commented
+    - comment_content: Content of the comment
+    - task: task_name, description, status and due_date (optional, fetched when omitted)
+    
+    Returns:
+    {
+        "message": "Comment notifications sent",
+        "results": [ ... notification results for each user ... ],
+        "status": 200
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        task_id = data.get("task_id")
+        kind = data.get("kind")
+        user_ids = data.get("user_ids", [])
+        commenter_name = data.get("commenter_name")
+        comment_content = data.get("comment_content")
+        
+        if not all([task_id, kind, user_ids, commenter_name, comment_content]):
+            return jsonify({"error": "task_id, kind, user_ids, commenter_name, and comment_content are required", "status": 400}), 400
+        
+        results = trigger_service.notify_comment_recipients(task_id, kind, user_ids, commenter_name,
+                                                            comment_content, data.get("task"))
+        
+        return jsonify({"message": "Comment notifications sent", "results": results, "status": 200}), 200
+        
+    except ValueError as e:
+        return jsonify({"error": str(e), "status": 400}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "status": 500}), 500
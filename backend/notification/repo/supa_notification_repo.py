@@ -1,20 +1,20 @@
 import os
-from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from typing import Optional, Dict, Any, List, Tuple
+from supabase import Client
+from postgrest.types import CountMethod, ReturnMethod
 from dotenv import load_dotenv
 
+import supabase_client
+
 # Load environment variables from .env file
 load_dotenv()
 
-SUPABASE_URL = os.environ["SUPABASE_URL"]
-SUPABASE_KEY = os.environ["SUPABASE_SERVICE_KEY"]
-
 # Table name for notifications
 TABLE = "notification"
 
 class SupabaseNotificationRepo:
     def __init__(self):
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.client: Client = supabase_client.get_client()
 
     def insert_notification(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Insert a new notification into the database."""
@@ -23,12 +23,36 @@ class SupabaseNotificationRepo:
             raise RuntimeError("Insert failed — no data returned")
         return res.data[0]
 
-    def find_by_user(self, user_id: int) -> List[Dict[str, Any]]:
+    def find_by_user(self, user_id: int, fields: str = "*", limit: Optional[int] = None,
+                     cursor: Optional[Tuple[str, int]] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Find all notifications for a specific user, ordered by created_at descending.
+        Find notifications for a specific user, newest first.
+
+        When limit or cursor is given, results are keyset-paginated on (created_at, id);
+        since keeps only notifications created at or after that timestamp.
         """
-        res = self.client.table(TABLE).select("*").eq("userid", user_id).order("created_at", desc=True).execute()
-        return res.data or []
+        query = self.client.table(TABLE).select(fields).eq("userid", user_id)
+        return self._paginate(query, limit, cursor, since).execute().data or []
+
+    def _paginate(self, query, limit: Optional[int], cursor: Optional[Tuple[str, int]], since: Optional[str]):
+        """
+        Order a select query newest first and apply the since filter and keyset
+        pagination on (created_at, id), each only when given.
+        """
+        if since is not None:
+            query = query.gte("created_at", since)
+
+        if cursor is not None:
+            created_at, last_id = cursor
+            # Quote the timestamp: it contains PostgREST-reserved characters (':' and '.')
+            query = query.or_(
+                f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{last_id})'
+            )
+
+        query = query.order("created_at", desc=True).order("id", desc=True)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
     def get_notification(self, notification_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -58,6 +82,38 @@ class SupabaseNotificationRepo:
         """
         return self.update_notification(notification_id, {"is_read": False})
 
+    def set_read_state(self, notification_id: int, is_read: bool) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Set is_read on a notification with a single conditional update.
+        Returns (notification, changed); notification is None if it does not exist.
+        Only a no-op (already in that state or missing) costs a second read.
+        """
+        res = self.client.table(TABLE).update({"is_read": is_read}).eq("id", notification_id).neq("is_read", is_read).execute()
+        if res.data:
+            return res.data[0], True
+        res = self.client.table(TABLE).select("*").eq("id", notification_id).execute()
+        return (res.data[0] if res.data else None), False
+
+    def mark_many_as_read(self, user_id: int, notification_ids: Optional[List[int]] = None) -> int:
+        """
+        Mark the user's unread notifications among notification_ids (all of them when
+        None) as read in one query. Returns how many changed.
+        """
+        query = self.client.table(TABLE).update(
+            {"is_read": True}, count=CountMethod.exact, returning=ReturnMethod.minimal
+        ).eq("userid", user_id).eq("is_read", False)
+        if notification_ids is not None:
+            query = query.in_("id", notification_ids)
+        return query.execute().count or 0
+
+    def delete_many(self, user_id: int, notification_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Delete the user's notifications among notification_ids in one query.
+        Returns the deleted rows.
+        """
+        res = self.client.table(TABLE).delete().eq("userid", user_id).in_("id", notification_ids).execute()
+        return res.data or []
+
     def get_unread_count(self, user_id: int) -> int:
         """
         Get the count of unread notifications for a user.
@@ -65,16 +121,17 @@ class SupabaseNotificationRepo:
         res = self.client.table(TABLE).select("id", count="exact").eq("userid", user_id).eq("is_read", False).execute()
         return res.count or 0
 
-    def find_unread_by_user(self, user_id: int) -> List[Dict[str, Any]]:
+    def find_unread_by_user(self, user_id: int, fields: str = "*", limit: Optional[int] = None,
+                            cursor: Optional[Tuple[str, int]] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        Find all unread notifications for a specific user, ordered by created_at descending.
+        Find unread notifications for a specific user, newest first, paginated like find_by_user.
         """
-        res = self.client.table(TABLE).select("*").eq("userid", user_id).eq("is_read", False).order("created_at", desc=True).execute()
-        return res.data or []
+        query = self.client.table(TABLE).select(fields).eq("userid", user_id).eq("is_read", False)
+        return self._paginate(query, limit, cursor, since).execute().data or []
 
-    def delete_notification(self, notification_id: int) -> bool:
+    def delete_notification(self, notification_id: int) -> Optional[Dict[str, Any]]:
         """
-        Delete a notification by its ID.
+        Delete a notification by its ID. Returns the deleted row, or None if it did not exist.
         """
         res = self.client.table(TABLE).delete().eq("id", notification_id).execute()
-        return len(res.data) > 0
\ No newline at end of file
+        return res.data[0] if res.data else None
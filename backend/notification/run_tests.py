@@ -4,6 +4,8 @@ Simple Test Runner - Notification Model Tests Only
 
 This runs only the notification model tests:
 - Notification Model tests (data validation and serialization)
+- Notification outbox tests (queueing, retries, dead letters)
+- Notification trigger tests (batched recipient resolution)
 """
 
 import os
@@ -19,7 +21,10 @@ def run_model_tests():
         env['PYTHONPATH'] = os.getcwd()
         
         result = subprocess.run([sys.executable, "-m", "unittest", 
-                               "test_notification_model", "-v"],
+                               "test_notification_model", "test_notification_outbox",
+                               "test_notification_triggers", "test_reminder_ledger",
+                               "test_reminder_engine", "test_scheduler_lease",
+                               "test_notification_inbox", "test_notification_hub", "-v"],
                               cwd="tests", capture_output=True, text=True, env=env)
         
         print("Model Test Results:")
@@ -0,0 +1,142 @@
+"""
+Push channel for new notifications.
+
+The frontend used to poll the unread count and the inbox every 30 seconds from
+every open page. Instead, each page keeps one WebSocket open to the hub, and
+create_notification pushes each new row to every connection of its user:
+
+- the hub runs its own asyncio loop on a background thread next to the Flask
+  server, so an idle connection costs a coroutine and its buffers rather than a
+  request thread; thousands of them are cheap
+- broadcast() writes to all of a user's connections without waiting on slow
+  clients, and keepalive pings close connections whose client went away
+- a client (re)connecting with ?since=<created_at> is first sent what it
+  missed, with one inbox query capped at REPLAY_LIMIT rows
+- publish() is a no-op until start() is called, so tests and scripts that
+  create notifications do not need a running hub
+
+Connect to ws://<host>:<port>/notifications/stream/<user_id>[?since=<ISO timestamp>].
+Messages are JSON: {"type": "notification", "data": { ... notification row ... }}
+
+Environment variables:
+    NOTIFICATION_STREAM_HOST  Interface the hub listens on (default 0.0.0.0)
+    NOTIFICATION_STREAM_PORT  Port the hub listens on (default 5016)
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from websockets.asyncio.server import ServerConnection, broadcast, serve
+from websockets.http11 import Request, Response
+
+from utils.parsing import parse_notification_list_query
+
+STREAM_HOST = os.getenv("NOTIFICATION_STREAM_HOST", "0.0.0.0")
+STREAM_PORT = int(os.getenv("NOTIFICATION_STREAM_PORT", "5016"))
+# Most notifications replayed to a reconnecting client
+REPLAY_LIMIT = 50
+
+STREAM_PATH = re.compile(r"^/notifications/stream/(\d+)$")
+
+
+class NotificationHub:
+    """Fan-out of new notifications to the WebSocket connections of each user."""
+
+    def __init__(self, host: str = STREAM_HOST, port: int = STREAM_PORT):
+        self.host = host
+        self.port = port
+        # (user_id, since) -> notifications created at or after since, newest first
+        self.replay: Optional[Callable[[int, str], List[Dict[str, Any]]]] = None
+        self._subscribers: Dict[int, Set[ServerConnection]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, replay: Optional[Callable[[int, str], List[Dict[str, Any]]]] = None) -> None:
+        """Start serving on a background thread; returns once the hub is listening."""
+        self.replay = replay
+        self._ready.clear()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),),
+                                        name="notification-hub", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self) -> None:
+        """Close every connection and stop the hub."""
+        loop, server = self._loop, self._server
+        if loop is None or server is None:
+            return
+        loop.call_soon_threadsafe(server.close)
+        self._thread.join()
+        self._loop = self._server = None
+
+    def publish(self, user_id: int, notification: Dict[str, Any]) -> None:
+        """Push a new notification to the user's connections. Safe to call from any thread."""
+        loop = self._loop
+        if loop is None:
+            return
+        message = json.dumps({"type": "notification", "data": notification}, default=str)
+        loop.call_soon_threadsafe(self._fan_out, int(user_id), message)
+
+    def connection_count(self) -> int:
+        """Open connections across all users"""
+        return sum(len(connections) for connections in self._subscribers.values())
+
+    def _fan_out(self, user_id: int, message: str) -> None:
+        broadcast(self._subscribers.get(user_id, ()), message)
+
+    async def _serve(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        try:
+            async with serve(self._handle, self.host, self.port, process_request=self._check_path) as server:
+                self._server = server
+                # Report the real port when asked to listen on port 0
+                self.port = server.sockets[0].getsockname()[1]
+                self._ready.set()
+                await server.wait_closed()
+        finally:
+            self._loop = None
+            self._ready.set()
+
+    @staticmethod
+    def _check_path(connection: ServerConnection, request: Request) -> Optional[Response]:
+        """Reject unknown paths and bad since values before the WebSocket handshake."""
+        parts = urlsplit(request.path)
+        if not STREAM_PATH.match(parts.path):
+            return connection.respond(HTTPStatus.NOT_FOUND, "Unknown notification stream\n")
+        try:
+            parse_notification_list_query({"since": parse_qs(parts.query).get("since", [""])[0]})
+        except ValueError as e:
+            return connection.respond(HTTPStatus.BAD_REQUEST, f"{e}\n")
+        return None
+
+    async def _handle(self, connection: ServerConnection) -> None:
+        parts = urlsplit(connection.request.path)
+        user_id = int(STREAM_PATH.match(parts.path).group(1))
+        since = parse_notification_list_query({"since": parse_qs(parts.query).get("since", [""])[0]})["since"]
+
+        # Subscribe before replaying so nothing created in between is missed;
+        # a row sent twice is deduplicated by id on the client
+        self._subscribers.setdefault(user_id, set()).add(connection)
+        try:
+            if since and self.replay:
+                missed = await asyncio.get_running_loop().run_in_executor(None, self.replay, user_id, since)
+                for notification in reversed(missed):
+                    await connection.send(json.dumps({"type": "notification", "data": notification}, default=str))
+            await connection.wait_closed()
+        finally:
+            connections = self._subscribers.get(user_id)
+            if connections is not None:
+                connections.discard(connection)
+                if not connections:
+                    del self._subscribers[user_id]
+
+
+# Shared by every NotificationService in the process; started by app.py
+hub = NotificationHub()
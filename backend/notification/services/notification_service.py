@@ -1,14 +1,19 @@
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List, Tuple
 import requests
 import os
 import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import certifi
 import sendgrid
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Email, To, Content
+from sendgrid.helpers.mail import Mail, Email, To, Content, Personalization, Substitution
 from dotenv import load_dotenv
 from models.notification import Notification
 from repo.supa_notification_repo import SupabaseNotificationRepo
+from services.notification_hub import NotificationHub, hub as _hub
+from utils.parsing import encode_notification_cursor
 
 # Load environment variables from .env file
 load_dotenv('/Users/yixli/Documents/GitHub/SPM/backend/.env')
@@ -17,9 +22,91 @@ load_dotenv('/Users/yixli/Documents/GitHub/SPM/backend/.env')
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# SendGrid API base URL; bench_email_delivery.py points it at a local stand-in
+SENDGRID_API_HOST = os.getenv("SENDGRID_API_HOST", "https://api.sendgrid.com")
+# SendGrid accepts at most 1000 personalizations per mail/send request
+SENDGRID_BATCH_SIZE = 1000
+# Bulk email chunks sent concurrently
+EMAIL_SEND_WORKERS = int(os.getenv("EMAIL_SEND_WORKERS", "4"))
+
+_sendgrid_client: Optional[SendGridAPIClient] = None
+_sendgrid_client_lock = threading.Lock()
+
+
+def get_sendgrid_client(api_key: str) -> SendGridAPIClient:
+    """
+    Process-wide SendGrid client, created on first use and rebuilt if the API key changes.
+    """
+    global _sendgrid_client
+    with _sendgrid_client_lock:
+        if _sendgrid_client is None or _sendgrid_client.api_key != api_key:
+            _sendgrid_client = SendGridAPIClient(api_key=api_key, host=SENDGRID_API_HOST)
+        return _sendgrid_client
+
+
+# Seconds a maintained unread count is trusted before it is re-seeded from an exact count
+UNREAD_COUNT_TTL = float(os.getenv("NOTIFICATION_UNREAD_COUNT_TTL", "300"))
+
+
+class UnreadCounter:
+    """
+    Per-user unread notification counts, kept up to date on insert, read and
+    delete so polling the count does not run an exact count query each time.
+
+    A user's count is seeded from `load` on first read and re-seeded after `ttl`
+    seconds, which bounds drift from writes made by other service processes.
+    """
+
+    def __init__(self, ttl: float = UNREAD_COUNT_TTL):
+        self.ttl = ttl
+        # {user_id: (expires_at, count)}
+        self._counts: Dict[int, Tuple[float, int]] = {}
+        # Bumped on every adjustment, so a seed racing with a write is not cached
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, load: Callable[[], int]) -> int:
+        """The user's unread count, seeding it with load() when missing or expired."""
+        with self._lock:
+            cached = self._counts.get(user_id)
+            if cached and cached[0] > time.monotonic():
+                return cached[1]
+            version = self._versions.get(user_id, 0)
+
+        count = load()
+        with self._lock:
+            if self._versions.get(user_id, 0) == version:
+                self._counts[user_id] = (time.monotonic() + self.ttl, count)
+        return count
+
+    def adjust(self, user_id: int, delta: int) -> None:
+        """Apply a change of `delta` unread notifications to the user's count."""
+        if not delta:
+            return
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            cached = self._counts.get(user_id)
+            if cached:
+                self._counts[user_id] = (cached[0], max(0, cached[1] + delta))
+
+    def reset(self, user_id: int, count: int = 0) -> None:
+        """Set the user's count outright, e.g. to 0 after marking everything read."""
+        with self._lock:
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._counts[user_id] = (time.monotonic() + self.ttl, count)
+
+
+# Shared by every NotificationService in the process (controller and trigger service)
+_unread_counter = UnreadCounter()
+
+
 class NotificationService:
-    def __init__(self, repo: Optional[SupabaseNotificationRepo] = None):
+    def __init__(self, repo: Optional[SupabaseNotificationRepo] = None,
+                 unread_counter: Optional[UnreadCounter] = None,
+                 hub: Optional[NotificationHub] = None):
         self.repo = repo or SupabaseNotificationRepo()
+        self.unread_counter = unread_counter or _unread_counter
+        self.hub = hub or _hub
 
     def create_notification(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -42,16 +129,33 @@ class NotificationService:
 
         # Insert into database
         created = self.repo.insert_notification(data)
+        if not created.get("is_read"):
+            self.unread_counter.adjust(created.get("userid"), 1)
+        # Push to the user's open pages instead of waiting for their next poll
+        self.hub.publish(created.get("userid"), created)
         return {"status": 201, "message": f"Notification created! Notification ID: {created.get('id')}", "data": created}
 
-    def get_notifications_by_user(self, user_id: int) -> Dict[str, Any]:
+    def get_notifications_by_user(self, user_id: int, fields: str = "*", limit: Optional[int] = None,
+                                  cursor: Optional[Tuple[str, int]] = None, since: Optional[str] = None) -> Dict[str, Any]:
         """
-        Get all notifications for a specific user.
+        Get notifications for a specific user, newest first.
+        Pass limit/cursor for keyset pagination, since to poll for new items and fields for projection.
         """
-        notifications = self.repo.find_by_user(user_id)
-        if not notifications:
+        notifications = self.repo.find_by_user(user_id, fields=fields, limit=limit, cursor=cursor, since=since)
+        # An empty later page or poll is not an error
+        if not notifications and cursor is None and since is None:
             return {"status": 404, "message": f"No notifications found for user ID {user_id}"}
-        return {"status": 200, "data": notifications}
+        return self._page(notifications, limit)
+
+    @staticmethod
+    def _page(notifications: List[Dict[str, Any]], limit: Optional[int]) -> Dict[str, Any]:
+        """Response for a page of notifications; next_cursor is None on the last page."""
+        result = {"status": 200, "data": notifications}
+        if limit is not None:
+            result["next_cursor"] = (
+                encode_notification_cursor(notifications[-1]) if len(notifications) == limit else None
+            )
+        return result
 
     def get_notification_by_id(self, notification_id: int) -> Dict[str, Any]:
         """
@@ -66,69 +170,100 @@ class NotificationService:
         """
         Mark a notification as read.
         """
-        try:
-            # Check if notification exists
-            existing_notification = self.repo.get_notification(notification_id)
-            if not existing_notification:
-                return {"status": 404, "message": f"Notification with ID {notification_id} not found"}
-            
-            updated_notification = self.repo.mark_as_read(notification_id)
-            return {"status": 200, "message": f"Notification {notification_id} marked as read", "data": updated_notification}
-        except Exception as e:
-            return {"status": 500, "message": f"Failed to mark notification {notification_id} as read: {str(e)}"}
+        return self._set_read_state(notification_id, True)
 
     def mark_notification_as_unread(self, notification_id: int) -> Dict[str, Any]:
         """
         Mark a notification as unread.
         """
+        return self._set_read_state(notification_id, False)
+
+    def _set_read_state(self, notification_id: int, is_read: bool) -> Dict[str, Any]:
+        """
+        Write is_read with one conditional update and keep the unread count in step.
+        """
+        state = "read" if is_read else "unread"
         try:
-            # Check if notification exists
-            existing_notification = self.repo.get_notification(notification_id)
-            if not existing_notification:
+            notification, changed = self.repo.set_read_state(notification_id, is_read)
+            if notification is None:
                 return {"status": 404, "message": f"Notification with ID {notification_id} not found"}
-            
-            updated_notification = self.repo.mark_as_unread(notification_id)
-            return {"status": 200, "message": f"Notification {notification_id} marked as unread", "data": updated_notification}
+            if changed:
+                self.unread_counter.adjust(notification.get("userid"), -1 if is_read else 1)
+            return {"status": 200, "message": f"Notification {notification_id} marked as {state}", "data": notification}
+        except Exception as e:
+            return {"status": 500, "message": f"Failed to mark notification {notification_id} as {state}: {str(e)}"}
+
+    def mark_notifications_as_read(self, user_id: int, notification_ids: List[int]) -> Dict[str, Any]:
+        """
+        Mark several of a user's notifications as read in one query.
+        """
+        try:
+            updated = self.repo.mark_many_as_read(user_id, notification_ids)
+            self.unread_counter.adjust(user_id, -updated)
+            return {"status": 200, "message": f"{updated} notification(s) marked as read", "data": {"updated": updated}}
+        except Exception as e:
+            return {"status": 500, "message": f"Failed to mark notifications as read for user {user_id}: {str(e)}"}
+
+    def mark_all_notifications_as_read(self, user_id: int) -> Dict[str, Any]:
+        """
+        Mark every unread notification of a user as read in one query.
+        """
+        try:
+            updated = self.repo.mark_many_as_read(user_id)
+            self.unread_counter.reset(user_id, 0)
+            return {"status": 200, "message": f"{updated} notification(s) marked as read", "data": {"updated": updated}}
         except Exception as e:
-            return {"status": 500, "message": f"Failed to mark notification {notification_id} as unread: {str(e)}"}
+            return {"status": 500, "message": f"Failed to mark all notifications as read for user {user_id}: {str(e)}"}
 
     def get_unread_count(self, user_id: int) -> Dict[str, Any]:
         """
-        Get the count of unread notifications for a user.
+        Get the count of unread notifications for a user from the maintained counter.
         """
         try:
-            count = self.repo.get_unread_count(user_id)
+            count = self.unread_counter.get(user_id, lambda: self.repo.get_unread_count(user_id))
             return {"status": 200, "data": {"unread_count": count}}
         except Exception as e:
             return {"status": 500, "message": f"Failed to get unread count for user {user_id}: {str(e)}"}
 
-    def get_unread_notifications(self, user_id: int) -> Dict[str, Any]:
+    def get_unread_notifications(self, user_id: int, fields: str = "*", limit: Optional[int] = None,
+                                 cursor: Optional[Tuple[str, int]] = None, since: Optional[str] = None) -> Dict[str, Any]:
         """
-        Get all unread notifications for a specific user.
+        Get unread notifications for a specific user, paginated like get_notifications_by_user.
         """
-        notifications = self.repo.find_unread_by_user(user_id)
-        if not notifications:
+        notifications = self.repo.find_unread_by_user(user_id, fields=fields, limit=limit, cursor=cursor, since=since)
+        if not notifications and cursor is None and since is None:
             return {"status": 404, "message": f"No unread notifications found for user ID {user_id}"}
-        return {"status": 200, "data": notifications}
+        return self._page(notifications, limit)
 
     def delete_notification(self, notification_id: int) -> Dict[str, Any]:
         """
         Delete a notification by its ID.
         """
         try:
-            # Check if notification exists
-            existing_notification = self.repo.get_notification(notification_id)
-            if not existing_notification:
+            deleted = self.repo.delete_notification(notification_id)
+            if deleted is None:
                 return {"status": 404, "message": f"Notification with ID {notification_id} not found"}
-            
-            success = self.repo.delete_notification(notification_id)
-            if success:
-                return {"status": 200, "message": f"Notification {notification_id} deleted successfully"}
-            else:
-                return {"status": 500, "message": f"Failed to delete notification {notification_id}"}
+            if not deleted.get("is_read"):
+                self.unread_counter.adjust(deleted.get("userid"), -1)
+            return {"status": 200, "message": f"Notification {notification_id} deleted successfully"}
         except Exception as e:
             return {"status": 500, "message": f"Failed to delete notification {notification_id}: {str(e)}"}
 
+    def delete_notifications(self, user_id: int, notification_ids: List[int]) -> Dict[str, Any]:
+        """
+        Delete several of a user's notifications in one query.
+        """
+        try:
+            deleted = self.repo.delete_many(user_id, notification_ids)
+            self.unread_counter.adjust(user_id, -sum(1 for row in deleted if not row.get("is_read")))
+            return {
+                "status": 200,
+                "message": f"{len(deleted)} notification(s) deleted",
+                "data": {"deleted": [row.get("id") for row in deleted]}
+            }
+        except Exception as e:
+            return {"status": 500, "message": f"Failed to delete notifications for user {user_id}: {str(e)}"}
+
     def send_email_notification(self, user_email: str, subject: str, message: str) -> Dict[str, Any]:
         """
         Send email notification using SendGrid API with proper integration.
@@ -152,8 +287,8 @@ class NotificationService:
             print(f"DEBUG: Using from email: {from_email}")
             print(f"DEBUG: API key (first 10 chars): {sendgrid_api_key[:10]}...")
             
-            # Create SendGrid client
-            sg = sendgrid.SendGridAPIClient(api_key=sendgrid_api_key)
+            # Reuse the shared SendGrid client
+            sg = get_sendgrid_client(sendgrid_api_key)
             
             # Create email components using the working format from your example
             from_email_obj = Email(from_email)
@@ -183,4 +318,67 @@ class NotificationService:
                 
         except Exception as e:
             print(f"DEBUG: Exception in send_email_notification: {str(e)}")
-            return {"status": 500, "message": f"Failed to send email notification: {str(e)}"}
\ No newline at end of file
+            return {"status": 500, "message": f"Failed to send email notification: {str(e)}"}
+
+    def send_bulk_email_notification(self, recipients: List[Dict[str, Any]], subject: str, message: str) -> Dict[str, Any]:
+        """
+        Send the same email to many recipients with one SendGrid request per
+        SENDGRID_BATCH_SIZE recipients (one personalization each), sending the
+        chunks concurrently.
+
+        Args:
+            recipients: [{"email": str, "substitutions": {tag: value}}]; each tag
+                        in subject/message is replaced per recipient
+            subject: Email subject
+            message: HTML content
+
+        Returns:
+            {"status": 200 | 207 | 500, "sent": int, "failed": [emails], "requests": int}
+        """
+        recipients = [r for r in recipients if r.get("email")]
+        if not recipients:
+            return {"status": 200, "message": "No email recipients", "sent": 0, "failed": [], "requests": 0}
+        
+        sendgrid_api_key = os.environ.get("SENDGRID_API_KEY")
+        if not sendgrid_api_key:
+            return {"status": 500, "message": "SendGrid API key not configured",
+                    "sent": 0, "failed": [r["email"] for r in recipients], "requests": 0}
+        from_email = os.environ.get("SENDGRID_FROM_EMAIL")
+        if not from_email:
+            return {"status": 500, "message": "SendGrid from email not configured",
+                    "sent": 0, "failed": [r["email"] for r in recipients], "requests": 0}
+        
+        sg = get_sendgrid_client(sendgrid_api_key)
+        chunks = [recipients[i:i + SENDGRID_BATCH_SIZE] for i in range(0, len(recipients), SENDGRID_BATCH_SIZE)]
+        
+        def send_chunk(chunk: List[Dict[str, Any]]) -> List[str]:
+            """Send one chunk; returns the emails that failed."""
+            mail = Mail(Email(from_email), subject=subject, html_content=Content("text/html", message))
+            for position, recipient in enumerate(chunk):
+                personalization = Personalization()
+                personalization.add_to(To(recipient["email"]))
+                for tag, value in (recipient.get("substitutions") or {}).items():
+                    personalization.add_substitution(Substitution(tag, str(value)))
+                # add_personalization inserts at index 0 by default; keep recipient order
+                mail.add_personalization(personalization, index=position)
+            try:
+                response = sg.client.mail.send.post(request_body=mail.get())
+                if response.status_code in [200, 201, 202]:
+                    return []
+                print(f"DEBUG: SendGrid bulk send returned HTTP {response.status_code}: {response.body}")
+            except Exception as e:
+                print(f"DEBUG: Exception in send_bulk_email_notification: {str(e)}")
+            return [recipient["email"] for recipient in chunk]
+        
+        workers = max(1, min(EMAIL_SEND_WORKERS, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            failed = [email for chunk_failed in pool.map(send_chunk, chunks) for email in chunk_failed]
+        
+        sent = len(recipients) - len(failed)
+        if not failed:
+            status, text = 200, f"Email sent to {sent} recipient(s)"
+        elif sent:
+            status, text = 207, f"Email sent to {sent} recipient(s), {len(failed)} failed"
+        else:
+            status, text = 500, f"Failed to send email to {len(failed)} recipient(s)"
+        return {"status": status, "message": text, "sent": sent, "failed": failed, "requests": len(chunks)}
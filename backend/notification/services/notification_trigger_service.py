@@ -1,36 +1,100 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import requests
+import os
+import threading
+import time
 from dotenv import load_dotenv
 from services.notification_service import NotificationService
 
+import service_client
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Seconds a resolved user (name, email, notification preferences) is reused across events
+USER_CACHE_TTL = float(os.getenv("NOTIFICATION_USER_CACHE_TTL", "30"))
+# Max userids per bulk lookup on the users service
+USER_BATCH_SIZE = 500
+# Substitution tag for the recipient's name in bulk emails
+EMAIL_NAME_TAG = "-user_name-"
+
 class NotificationTriggerService:
     """
     Service to handle notification triggers for various events like task assignments and updates.
     """
     
-    def __init__(self):
+    def __init__(self, user_cache_ttl: float = USER_CACHE_TTL):
         self.notification_service = NotificationService()
+        self.user_cache_ttl = user_cache_ttl
+        # {user_id: (expires_at, user details)}; only users that were found are cached
+        self._user_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+        self._user_cache_lock = threading.Lock()
     
     def get_user_details(self, user_id: int) -> Optional[Dict[str, Any]]:
         """
         Get user details including notification preferences from user microservice.
         """
+        return self.get_users_details([user_id]).get(user_id)
+    
+    def get_users_details(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Resolve many users at once: cached entries younger than user_cache_ttl are
+        reused and the rest are fetched with one bulk lookup on the users service.
+        Returns {user_id: details}; users that could not be found are absent.
+        """
+        wanted = [user_id for user_id in dict.fromkeys(user_ids) if user_id is not None]
+        now = time.monotonic()
+        found: Dict[int, Dict[str, Any]] = {}
+        with self._user_cache_lock:
+            for user_id in wanted:
+                cached = self._user_cache.get(user_id)
+                if cached and cached[0] > now:
+                    found[user_id] = cached[1]
+        
+        missing = [user_id for user_id in wanted if user_id not in found]
+        if missing:
+            fetched = self._fetch_users(missing)
+            expires_at = time.monotonic() + self.user_cache_ttl
+            with self._user_cache_lock:
+                for user_id, details in fetched.items():
+                    self._user_cache[user_id] = (expires_at, details)
+            found.update(fetched)
+        return found
+    
+    def _fetch_users(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Bulk GET /users?ids=... on the users service, falling back to one
+        GET /users/<id> per user if the bulk lookup is unavailable.
+        """
+        users: Dict[int, Dict[str, Any]] = {}
         try:
-            response = requests.get(f"http://127.0.0.1:5003/users/{user_id}")
-            if response.status_code == 200:
-                user_data = response.json()
-                return user_data.get("data")
-            return None
-        except requests.RequestException:
-            return None
+            for start in range(0, len(user_ids), USER_BATCH_SIZE):
+                chunk = user_ids[start:start + USER_BATCH_SIZE]
+                response = service_client.get("users", "/users", params={"ids": ",".join(str(i) for i in chunk)})
+                if response.status_code != 200:
+                    raise requests.RequestException(f"Bulk user lookup returned {response.status_code}")
+                for user in response.json().get("data", []):
+                    users[user.get("userid")] = user
+            return users
+        except (requests.RequestException, ValueError) as e:
+            print(f"Warning: Bulk user lookup failed, fetching users one by one: {e}")
+        
+        for user_id in user_ids:
+            if user_id in users:
+                continue
+            try:
+                response = service_client.get("users", f"/users/{user_id}")
+                if response.status_code == 200 and response.json().get("data"):
+                    users[user_id] = response.json()["data"]
+            except requests.RequestException:
+                continue
+        return users
     
     def send_notification_based_on_preferences(self, user_id: int, notification_content: str, 
                                              notification_type: str = "general", 
                                              related_task_id: Optional[int] = None,
-                                             plain_text_content: str = None) -> Dict[str, Any]:
+                                             plain_text_content: str = None,
+                                             user_details: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Send notification based on user's preferences (in-app, email, or both).
         
@@ -40,9 +104,11 @@ class NotificationTriggerService:
             notification_type: Type of notification
             related_task_id: ID of related task if applicable
             plain_text_content: Plain text content for in-app notification (if None, will strip HTML from notification_content)
+            user_details: Already resolved details of the user (skips the lookup)
         """
         # Get user details and preferences
-        user_details = self.get_user_details(user_id)
+        if user_details is None:
+            user_details = self.get_user_details(user_id)
         if not user_details:
             return {"status": 404, "message": f"User {user_id} not found"}
         
@@ -77,6 +143,81 @@ class NotificationTriggerService:
         
         return {"status": 200, "message": "Notifications sent based on user preferences", "results": results}
     
+    def send_notifications_based_on_preferences(self, user_ids: List[int], notification_content: str,
+                                                notification_type: str = "general",
+                                                related_task_id: Optional[int] = None,
+                                                plain_text_content: str = None,
+                                                users: Optional[Dict[int, Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Send the same notification to many users based on their preferences.
+        In-app notifications are created per user; every email recipient is sent
+        in one bulk SendGrid call, with the greeting personalized per recipient.
+        
+        Args:
+            user_ids: IDs of the users to notify
+            notification_content: HTML content for email notification
+            notification_type: Type of notification
+            related_task_id: ID of related task if applicable
+            plain_text_content: Plain text content for in-app notification (if None, will strip HTML from notification_content)
+            users: Already resolved {user_id: details} (skips the lookup)
+        
+        Returns:
+            [{"user_id": int, "result": {...}}] in the same shape as send_notification_based_on_preferences
+        """
+        if users is None:
+            users = self.get_users_details(user_ids)
+        in_app_text = plain_text_content if plain_text_content else self._strip_html(notification_content)
+        
+        results = []
+        email_results: Dict[str, List[Dict[str, Any]]] = {}
+        email_recipients = []
+        for user_id in user_ids:
+            user_details = users.get(user_id)
+            if not user_details:
+                results.append({"user_id": user_id, "result": {"status": 404, "message": f"User {user_id} not found"}})
+                continue
+            
+            preferences = user_details.get("notification_preferences", {"in_app": True, "email": True})
+            user_email = user_details.get("email")
+            user_results = []
+            
+            if preferences.get("in_app", True):
+                in_app_result = self.notification_service.create_notification({
+                    "userid": user_id,
+                    "notification": in_app_text,
+                    "notification_type": notification_type,
+                    "related_task_id": related_task_id
+                })
+                user_results.append({"type": "in_app", "result": in_app_result})
+            
+            if preferences.get("email", True) and user_email:
+                # Filled in once the bulk send has finished
+                email_results.setdefault(user_email, []).append(user_results)
+                email_recipients.append({
+                    "email": user_email,
+                    "substitutions": {EMAIL_NAME_TAG: user_details.get("name", "User")}
+                })
+            
+            results.append({"user_id": user_id, "result": {
+                "status": 200, "message": "Notifications sent based on user preferences", "results": user_results
+            }})
+        
+        if email_recipients:
+            # A user listed twice, or two users sharing an address, get one email
+            email_recipients = list({r["email"]: r for r in email_recipients}.values())
+            subject, email_content = self._create_email_content(notification_type, notification_content, EMAIL_NAME_TAG)
+            bulk_result = self.notification_service.send_bulk_email_notification(email_recipients, subject, email_content)
+            failed = set(bulk_result.get("failed", []))
+            for user_email, result_lists in email_results.items():
+                if user_email in failed:
+                    email_result = {"status": 500, "message": bulk_result.get("message", "Failed to send email")}
+                else:
+                    email_result = {"status": 200, "message": "Email sent successfully"}
+                for user_results in result_lists:
+                    user_results.append({"type": "email", "result": email_result})
+        
+        return results
+    
     def _strip_html(self, html_content: str) -> str:
         """
         Strip HTML tags and convert to plain text for in-app notifications.
@@ -198,7 +339,7 @@ class NotificationTriggerService:
         Get task details from the task microservice.
         """
         try:
-            response = requests.get(f"http://127.0.0.1:5002/tasks/{task_id}")
+            response = service_client.get("tasks", f"/tasks/{task_id}")
             if response.status_code == 200:
                 data = response.json()
                 return data.get("task") or data
@@ -211,12 +352,8 @@ class NotificationTriggerService:
         Get task details directly from Supabase task table.
         """
         try:
-            # Import here to avoid circular imports
-            from repo.supa_notification_repo import SupabaseNotificationRepo
-            repo = SupabaseNotificationRepo()
-            
-            # Query the task table directly
-            response = repo.client.table("task").select("*").eq("id", task_id).execute()
+            # Query the task table directly over the notification repo's shared client
+            response = self.notification_service.repo.client.table("task").select("*").eq("id", task_id).execute()
             
             if response.data and len(response.data) > 0:
                 return response.data[0]
@@ -225,17 +362,47 @@ class NotificationTriggerService:
             print(f"Error fetching task details from Supabase: {e}")
             return None
     
-    def notify_task_assignment(self, task_id: int, assigned_user_id: int, assigner_name: str = "System") -> Dict[str, Any]:
+    def notify_task_collaborator_addition(self, task_id: int, collaborator_ids: List[int], assigner_name: str = "System") -> List[Dict[str, Any]]:
+        """
+        Send task assignment notifications to several new collaborators, loading
+        the task once and resolving every referenced user in one lookup.
+        """
+        task_details = self._get_task_details_from_supabase(task_id)
+        
+        referenced = list(collaborator_ids)
+        if task_details:
+            referenced += [task_details.get("owner_id")] + (task_details.get("collaborators") or [])
+        users = self.get_users_details(referenced)
+        
+        results = []
+        for collaborator_id in collaborator_ids:
+            result = self.notify_task_assignment(task_id, collaborator_id, assigner_name,
+                                                 task_details=task_details, users=users)
+            results.append({"user_id": collaborator_id, "result": result})
+        return results
+    
+    def notify_task_assignment(self, task_id: int, assigned_user_id: int, assigner_name: str = "System",
+                               task_details: Optional[Dict[str, Any]] = None,
+                               users: Optional[Dict[int, Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Send notification when a task is assigned to a user as a collaborator.
+        task_details and users can be passed in when notifying several collaborators of the same task.
         """
         # Get task details from Supabase for better notification content
-        task_details = self._get_task_details_from_supabase(task_id)
+        if task_details is None:
+            task_details = self._get_task_details_from_supabase(task_id)
+        
+        # Resolve the owner, collaborators and recipient in one lookup
+        if users is None:
+            referenced = [assigned_user_id]
+            if task_details:
+                referenced += [task_details.get("owner_id")] + (task_details.get("collaborators") or [])
+            users = self.get_users_details(referenced)
         
         # Get task owner name for "Assigned by" field
         owner_name = assigner_name
         if task_details and task_details.get("owner_id"):
-            owner_details = self.get_user_details(task_details.get("owner_id"))
+            owner_details = users.get(task_details.get("owner_id"))
             if owner_details:
                 owner_name = owner_details.get("name", assigner_name)
         
@@ -259,7 +426,7 @@ class NotificationTriggerService:
             collaborators_info = []
             if collaborators:
                 for collab_id in collaborators:
-                    collab_details = self.get_user_details(collab_id)
+                    collab_details = users.get(collab_id)
                     if collab_details:
                         collaborators_info.append(collab_details.get("name", f"User {collab_id}"))
             
@@ -315,7 +482,8 @@ You can now view and collaborate on this task in your SPM dashboard."""
             notification_content, 
             "task_assigned", 
             None,  # Set to None to avoid foreign key constraint
-            plain_text
+            plain_text,
+            user_details=users.get(assigned_user_id)
         )
     
     def notify_task_ownership_transfer(self, task_id: int, new_owner_id: int, previous_owner_name: str = "System") -> Dict[str, Any]:
@@ -403,7 +571,9 @@ As the new owner, you are responsible for managing this task and can edit its de
         # Get subtask owner name for "Assigned by" field
         owner_name = assigner_name
         if subtask_details and subtask_details.get("owner_id"):
-            owner_details = self.get_user_details(subtask_details.get("owner_id"))
+            # Resolve the owner and the recipient together
+            users = self.get_users_details([subtask_details.get("owner_id"), assigned_user_id])
+            owner_details = users.get(subtask_details.get("owner_id"))
             if owner_details:
                 owner_name = owner_details.get("name", assigner_name)
         
@@ -460,6 +630,9 @@ As the new owner, you are responsible for managing this task and can edit its de
         
         task_assignments format: [{"task_id": int, "user_id": int, "is_subtask": bool, "parent_task_id": int}]
         """
+        # Warm the user cache for every recipient with one lookup
+        self.get_users_details([assignment.get("user_id") for assignment in task_assignments])
+        
         results = []
         for assignment in task_assignments:
             task_id = assignment.get("task_id")
@@ -476,13 +649,23 @@ As the new owner, you are responsible for managing this task and can edit its de
         
         return results
 
-    def notify_comment_mention(self, task_id: int, mentioned_user_id: int, commenter_name: str, 
-                             comment_content: str, task_name: str = None) -> Dict[str, Any]:
+    # Wording of the two comment notifications: (notification_type, title, intro, intro without task details)
+    _COMMENT_WORDING = {
+        "mention": ("comment_mention", "Comment Mention Summary",
+                    "You have been mentioned in a comment on:",
+                    "You have been mentioned in a comment on task (ID: {task_id}):"),
+        "collaborator": ("comment_collaborator", "New Comment Summary",
+                         "A new comment has been added to your task:",
+                         "A new comment has been added to task (ID: {task_id}):"),
+    }
+
+    def _comment_notification_content(self, kind: str, task_id: int, task_details: Optional[Dict[str, Any]],
+                                      commenter_name: str, comment_content: str) -> Tuple[str, str, str]:
         """
-        Send notification for comment mentions following the structured format of task assignments.
+        Build the structured comment notification for "mention" or "collaborator".
+        Returns (notification_type, email HTML, in-app plain text).
         """
-        # Get task details
-        task_details = self._get_task_details(task_id)
+        notification_type, title, intro, fallback_intro = self._COMMENT_WORDING[kind]
         
         if task_details:
             task_name = task_details.get("task_name", f"Task {task_id}")
@@ -501,8 +684,8 @@ As the new owner, you are responsible for managing this task and can edit its de
             
             # HTML content for email - following the structured format
             notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on:</p>
+            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>{title}</strong></h3>
+            <p style="color: #374151; margin-bottom: 12px;">{intro}</p>
             <ul style="color: #374151; margin-bottom: 16px;">
                 <li><strong>Task:</strong> {task_name}</li>
                 <li><strong>Task ID:</strong> {task_id}</li>
@@ -516,8 +699,8 @@ As the new owner, you are responsible for managing this task and can edit its de
             """
             
             # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on:
+            plain_text = f"""**{title}**
+{intro}
 
 Task: {task_name}
 Task ID: {task_id}
@@ -530,9 +713,10 @@ Comment: "{comment_content}"
 You can view and respond to this comment in your task."""
         else:
             # Fallback if task details not available
+            intro = fallback_intro.format(task_id=task_id)
             notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on task (ID: {task_id}):</p>
+            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>{title}</strong></h3>
+            <p style="color: #374151; margin-bottom: 12px;">{intro}</p>
             <ul style="color: #374151; margin-bottom: 16px;">
                 <li><strong>Commenter:</strong> {commenter_name}</li>
                 <li><strong>Comment:</strong> "{comment_content}"</li>
@@ -540,16 +724,26 @@ You can view and respond to this comment in your task."""
             <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
             """
             
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on task (ID: {task_id}):
+            plain_text = f"""**{title}**
+{intro}
 
 Commenter: {commenter_name}
 Comment: "{comment_content}"
 
 You can view and respond to this comment in your task."""
         
+        return notification_type, notification_content, plain_text
+
+    def notify_comment_mention(self, task_id: int, mentioned_user_id: int, commenter_name: str, 
+                             comment_content: str, task_name: str = None) -> Dict[str, Any]:
+        """
+        Send notification for comment mentions following the structured format of task assignments.
+        """
+        notification_type, notification_content, plain_text = self._comment_notification_content(
+            "mention", task_id, self._get_task_details(task_id), commenter_name, comment_content
+        )
         return self.send_notification_based_on_preferences(
-            mentioned_user_id, notification_content, "comment_mention", task_id, plain_text
+            mentioned_user_id, notification_content, notification_type, task_id, plain_text
         )
 
     def notify_comment_collaborator(self, task_id: int, collaborator_user_id: int, commenter_name: str, 
@@ -557,95 +751,59 @@ You can view and respond to this comment in your task."""
         """
         Send notification for comment collaborators following the structured format of task assignments.
         """
-        # Get task details
-        task_details = self._get_task_details(task_id)
-        
-        if task_details:
-            task_name = task_details.get("task_name", f"Task {task_id}")
-            description = task_details.get("description", "No description available")
-            due_date = task_details.get("due_date", "No due date set")
-            status = task_details.get("status", "Unknown")
-            
-            # Format due date for display
-            if due_date != "No due date set":
-                try:
-                    from datetime import datetime
-                    due_date_obj = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    due_date = due_date_obj.strftime('%Y-%m-%d')
-                except:
-                    pass
-            
-            # HTML content for email - following the structured format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to your task:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Task:</strong> {task_name}</li>
-                <li><strong>Task ID:</strong> {task_id}</li>
-                <li><strong>Description:</strong> {description}</li>
-                <li><strong>Status:</strong> {status}</li>
-                <li><strong>Due Date:</strong> {due_date}</li>
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to your task:
-
-Task: {task_name}
-Task ID: {task_id}
-Description: {description}
-Status: {status}
-Due Date: {due_date}
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        else:
-            # Fallback if task details not available
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to task (ID: {task_id}):</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to task (ID: {task_id}):
-
-Commenter: {commenter_name}
-Comment: "{comment_content}"
+        notification_type, notification_content, plain_text = self._comment_notification_content(
+            "collaborator", task_id, self._get_task_details(task_id), commenter_name, comment_content
+        )
+        return self.send_notification_based_on_preferences(
+            collaborator_user_id, notification_content, notification_type, task_id, plain_text
+        )
 
-You can view and respond to this comment in your task."""
+    def notify_comment_recipients(self, task_id: int, kind: str, user_ids: List[int], commenter_name: str,
+                                  comment_content: str, task_details: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Send one comment's notifications to all of its recipients at once: the
+        task is loaded at most once (not at all when the caller passes
+        task_details), users are resolved in one lookup and emails go out in
+        one bulk send.
         
-        return self.send_notification_based_on_preferences(
-            collaborator_user_id, notification_content, "comment_collaborator", task_id, plain_text
+        Args:
+            task_id: ID of the commented task
+            kind: "mention" for mentioned users, "collaborator" for task collaborators
+            user_ids: IDs of the users to notify
+            commenter_name: Name of the person who commented
+            comment_content: Content of the comment
+            task_details: task_name, description, status and due_date, if the caller already has them
+        """
+        if kind not in self._COMMENT_WORDING:
+            raise ValueError(f"kind must be one of {', '.join(self._COMMENT_WORDING)}")
+        if task_details is None:
+            task_details = self._get_task_details(task_id)
+        
+        notification_type, notification_content, plain_text = self._comment_notification_content(
+            kind, task_id, task_details, commenter_name, comment_content
+        )
+        return self.send_notifications_based_on_preferences(
+            list(dict.fromkeys(user_ids)), notification_content, notification_type, task_id, plain_text
         )
     
     def notify_project_collaborator_addition(self, project_id: int, collaborator_ids: List[int], project_name: str, adder_name: str = "System") -> List[Dict[str, Any]]:
         """
         Send notifications when collaborators are added to a project.
         """
-        results = []
-        
         # Get project details to get all collaborators
+        users: Dict[int, Dict[str, Any]] = {}
         try:
-            response = requests.get(f"http://127.0.0.1:5001/projects/{project_id}")
+            response = service_client.get("projects", f"/projects/{project_id}")
             if response.status_code == 200:
                 project_data = response.json().get("data", {})
                 all_collaborators = project_data.get("collaborators", [])
                 
-                # Get collaborator names
+                # Get collaborator names, resolving them and the recipients in one lookup
+                users = self.get_users_details(list(all_collaborators) + list(collaborator_ids))
                 collaborators_info = []
                 if all_collaborators:
                     for collab_id in all_collaborators:
-                        collab_details = self.get_user_details(collab_id)
+                        collab_details = users.get(collab_id)
                         if collab_details:
                             collaborators_info.append(collab_details.get("name", f"User {collab_id}"))
                 
@@ -655,23 +813,22 @@ You can view and respond to this comment in your task."""
         except:
             collaborators_text = "Unable to fetch"
         
-        for collaborator_id in collaborator_ids:
-            # HTML content for email - following the new format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Project Assignment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been added as a collaborator to:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Project:</strong> {project_name}</li>
-                <li><strong>Project ID:</strong> {project_id}</li>
-                <li><strong>Added by:</strong> {adder_name}</li>
-                <li><strong>Your Role:</strong> Collaborator</li>
-                <li><strong>All Collaborators:</strong> {collaborators_text}</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can now view and contribute to this project.</p>
-            """
-            
-            # Plain text content for in-app notification - following the new format
-            plain_text = f"""**Project Assignment Summary**
+        # HTML content for email - following the new format
+        notification_content = f"""
+        <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Project Assignment Summary</strong></h3>
+        <p style="color: #374151; margin-bottom: 12px;">You have been added as a collaborator to:</p>
+        <ul style="color: #374151; margin-bottom: 16px;">
+            <li><strong>Project:</strong> {project_name}</li>
+            <li><strong>Project ID:</strong> {project_id}</li>
+            <li><strong>Added by:</strong> {adder_name}</li>
+            <li><strong>Your Role:</strong> Collaborator</li>
+            <li><strong>All Collaborators:</strong> {collaborators_text}</li>
+        </ul>
+        <p style="color: #6b7280; font-size: 14px;">You can now view and contribute to this project.</p>
+        """
+        
+        # Plain text content for in-app notification - following the new format
+        plain_text = f"""**Project Assignment Summary**
 You have been added as a collaborator to:
 
 Project: {project_name}
@@ -681,395 +838,84 @@ Your Role: Collaborator
 All Collaborators: {collaborators_text}
 
 You can now view and contribute to this project."""
-            
-            result = self.send_notification_based_on_preferences(
-                collaborator_id,
-                notification_content,
-                "project_collaborator_added",
-                None,
-                plain_text
-            )
-            results.append({"user_id": collaborator_id, "result": result})
         
-        return results
+        return self.send_notifications_based_on_preferences(
+            collaborator_ids,
+            notification_content,
+            "project_collaborator_added",
+            None,
+            plain_text,
+            users=users or None
+        )
 
-    def notify_comment_mention(self, task_id: int, mentioned_user_id: int, commenter_name: str, 
-                             comment_content: str, task_name: str = None) -> Dict[str, Any]:
+    def notify_task_consolidated_update(self, task_id: int, user_ids: List[int], changes: List[Dict[str, Any]], updater_name: str = "System") -> List[Dict[str, Any]]:
         """
-        Send notification for comment mentions following the structured format of task assignments.
+        Send consolidated notification when multiple task fields are updated.
+        This creates one notification per user that includes all changes.
         """
-        # Get task details
-        task_details = self._get_task_details(task_id)
+        # Get task details from Supabase for better notification content
+        task_details = self._get_task_details_from_supabase(task_id)
+        task_name = task_details.get("task_name", f"Task {task_id}") if task_details else f"Task {task_id}"
         
-        if task_details:
-            task_name = task_details.get("task_name", f"Task {task_id}")
-            description = task_details.get("description", "No description available")
-            due_date = task_details.get("due_date", "No due date set")
-            status = task_details.get("status", "Unknown")
+        # Build change summary for email and in-app
+        changes_html = ""
+        changes_text = []
+        
+        for change in changes:
+            field_name = change.get("field_name", change.get("field", "Unknown"))
+            old_value = change.get("old_value", "Not set")
+            new_value = change.get("new_value", "Not set")
             
-            # Format due date for display
-            if due_date != "No due date set":
+            # Format values for display
+            if field_name == "Due Date" and old_value != "Not set":
                 try:
                     from datetime import datetime
-                    due_date_obj = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    due_date = due_date_obj.strftime('%Y-%m-%d')
+                    old_date = datetime.fromisoformat(old_value.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+                    new_date = datetime.fromisoformat(new_value.replace('Z', '+00:00')).strftime('%Y-%m-%d')
+                    old_value = old_date
+                    new_value = new_date
                 except:
                     pass
             
-            # HTML content for email - following the structured format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Task:</strong> {task_name}</li>
-                <li><strong>Task ID:</strong> {task_id}</li>
-                <li><strong>Description:</strong> {description}</li>
-                <li><strong>Status:</strong> {status}</li>
-                <li><strong>Due Date:</strong> {due_date}</li>
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
+            changes_html += f"""
+            <li><strong>{field_name}:</strong> {old_value} → {new_value}</li>
             """
-            
-            # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on:
+            changes_text.append(f"{field_name}: {old_value} → {new_value}")
+        
+        # HTML content for email - using your specified format with bold heading
+        notification_content = f"""
+        <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Task Update Summary</strong></h3>
+        <p style="color: #374151; margin-bottom: 12px;">Changes made to your task:</p>
+        <ul style="color: #374151; margin-bottom: 16px;">
+            <li><strong>Task:</strong> {task_name}</li>
+            <li><strong>Task ID:</strong> {task_id}</li>
+            {changes_html}
+        </ul>
+        <p style="color: #6b7280; font-size: 14px;">Please review the updated task details and take any necessary actions.</p>
+        """
+        
+        # Plain text content for in-app notification - using your specified format with bold heading
+        changes_summary = "\n".join(changes_text)
+        plain_text = f"""**Task Update Summary**
+Changes made to your task:
 
 Task: {task_name}
 Task ID: {task_id}
-Description: {description}
-Status: {status}
-Due Date: {due_date}
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        else:
-            # Fallback if task details not available
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on task (ID: {task_id}):</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on task (ID: {task_id}):
-
-Commenter: {commenter_name}
-Comment: "{comment_content}"
+{changes_summary}
 
-You can view and respond to this comment in your task."""
+Please review the updated task details and take any necessary actions."""
         
-        return self.send_notification_based_on_preferences(
-            mentioned_user_id, notification_content, "comment_mention", task_id, plain_text
+        return self.send_notifications_based_on_preferences(
+            user_ids,
+            notification_content,
+            "task_updated",
+            None,  # Set to None to avoid foreign key constraint issues
+            plain_text
         )
 
-    def notify_comment_collaborator(self, task_id: int, collaborator_user_id: int, commenter_name: str, 
-                                  comment_content: str, task_name: str = None) -> Dict[str, Any]:
-        """
-        Send notification for comment collaborators following the structured format of task assignments.
+    def notify_deadline_reminder(self, task_id: int, reminder_days: int) -> List[Dict[str, Any]]:
         """
-        # Get task details
-        task_details = self._get_task_details(task_id)
-        
-        if task_details:
-            task_name = task_details.get("task_name", f"Task {task_id}")
-            description = task_details.get("description", "No description available")
-            due_date = task_details.get("due_date", "No due date set")
-            status = task_details.get("status", "Unknown")
-            
-            # Format due date for display
-            if due_date != "No due date set":
-                try:
-                    from datetime import datetime
-                    due_date_obj = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    due_date = due_date_obj.strftime('%Y-%m-%d')
-                except:
-                    pass
-            
-            # HTML content for email - following the structured format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to your task:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Task:</strong> {task_name}</li>
-                <li><strong>Task ID:</strong> {task_id}</li>
-                <li><strong>Description:</strong> {description}</li>
-                <li><strong>Status:</strong> {status}</li>
-                <li><strong>Due Date:</strong> {due_date}</li>
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to your task:
-
-Task: {task_name}
-Task ID: {task_id}
-Description: {description}
-Status: {status}
-Due Date: {due_date}
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        else:
-            # Fallback if task details not available
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to task (ID: {task_id}):</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to task (ID: {task_id}):
-
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        
-        return self.send_notification_based_on_preferences(
-            collaborator_user_id, notification_content, "comment_collaborator", task_id, plain_text
-        )
-    
-    def notify_task_consolidated_update(self, task_id: int, user_ids: List[int], changes: List[Dict[str, Any]], updater_name: str = "System") -> List[Dict[str, Any]]:
-        """
-        Send consolidated notification when multiple task fields are updated.
-        This creates one notification per user that includes all changes.
-        """
-        # Get task details from Supabase for better notification content
-        task_details = self._get_task_details_from_supabase(task_id)
-        task_name = task_details.get("task_name", f"Task {task_id}") if task_details else f"Task {task_id}"
-        
-        # Build change summary for email and in-app
-        changes_html = ""
-        changes_text = []
-        
-        for change in changes:
-            field_name = change.get("field_name", change.get("field", "Unknown"))
-            old_value = change.get("old_value", "Not set")
-            new_value = change.get("new_value", "Not set")
-            
-            # Format values for display
-            if field_name == "Due Date" and old_value != "Not set":
-                try:
-                    from datetime import datetime
-                    old_date = datetime.fromisoformat(old_value.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                    new_date = datetime.fromisoformat(new_value.replace('Z', '+00:00')).strftime('%Y-%m-%d')
-                    old_value = old_date
-                    new_value = new_date
-                except:
-                    pass
-            
-            changes_html += f"""
-            <li><strong>{field_name}:</strong> {old_value} → {new_value}</li>
-            """
-            changes_text.append(f"{field_name}: {old_value} → {new_value}")
-        
-        # HTML content for email - using your specified format with bold heading
-        notification_content = f"""
-        <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Task Update Summary</strong></h3>
-        <p style="color: #374151; margin-bottom: 12px;">Changes made to your task:</p>
-        <ul style="color: #374151; margin-bottom: 16px;">
-            <li><strong>Task:</strong> {task_name}</li>
-            <li><strong>Task ID:</strong> {task_id}</li>
-            {changes_html}
-        </ul>
-        <p style="color: #6b7280; font-size: 14px;">Please review the updated task details and take any necessary actions.</p>
-        """
-        
-        # Plain text content for in-app notification - using your specified format with bold heading
-        changes_summary = "\n".join(changes_text)
-        plain_text = f"""**Task Update Summary**
-Changes made to your task:
-
-Task: {task_name}
-Task ID: {task_id}
-{changes_summary}
-
-Please review the updated task details and take any necessary actions."""
-        
-        results = []
-        for user_id in user_ids:
-            result = self.send_notification_based_on_preferences(
-                user_id,
-                notification_content,
-                "task_updated",
-                None,  # Set to None to avoid foreign key constraint issues
-                plain_text
-            )
-            results.append({"user_id": user_id, "result": result})
-        
-        return results
-
-    def notify_comment_mention(self, task_id: int, mentioned_user_id: int, commenter_name: str, 
-                             comment_content: str, task_name: str = None) -> Dict[str, Any]:
-        """
-        Send notification for comment mentions following the structured format of task assignments.
-        """
-        # Get task details
-        task_details = self._get_task_details(task_id)
-        
-        if task_details:
-            task_name = task_details.get("task_name", f"Task {task_id}")
-            description = task_details.get("description", "No description available")
-            due_date = task_details.get("due_date", "No due date set")
-            status = task_details.get("status", "Unknown")
-            
-            # Format due date for display
-            if due_date != "No due date set":
-                try:
-                    from datetime import datetime
-                    due_date_obj = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    due_date = due_date_obj.strftime('%Y-%m-%d')
-                except:
-                    pass
-            
-            # HTML content for email - following the structured format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Task:</strong> {task_name}</li>
-                <li><strong>Task ID:</strong> {task_id}</li>
-                <li><strong>Description:</strong> {description}</li>
-                <li><strong>Status:</strong> {status}</li>
-                <li><strong>Due Date:</strong> {due_date}</li>
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on:
-
-Task: {task_name}
-Task ID: {task_id}
-Description: {description}
-Status: {status}
-Due Date: {due_date}
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        else:
-            # Fallback if task details not available
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on task (ID: {task_id}):</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on task (ID: {task_id}):
-
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        
-        return self.send_notification_based_on_preferences(
-            mentioned_user_id, notification_content, "comment_mention", task_id, plain_text
-        )
-
-    def notify_comment_collaborator(self, task_id: int, collaborator_user_id: int, commenter_name: str, 
-                                  comment_content: str, task_name: str = None) -> Dict[str, Any]:
-        """
-        Send notification for comment collaborators following the structured format of task assignments.
-        """
-        # Get task details
-        task_details = self._get_task_details(task_id)
-        
-        if task_details:
-            task_name = task_details.get("task_name", f"Task {task_id}")
-            description = task_details.get("description", "No description available")
-            due_date = task_details.get("due_date", "No due date set")
-            status = task_details.get("status", "Unknown")
-            
-            # Format due date for display
-            if due_date != "No due date set":
-                try:
-                    from datetime import datetime
-                    due_date_obj = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    due_date = due_date_obj.strftime('%Y-%m-%d')
-                except:
-                    pass
-            
-            # HTML content for email - following the structured format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to your task:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Task:</strong> {task_name}</li>
-                <li><strong>Task ID:</strong> {task_id}</li>
-                <li><strong>Description:</strong> {description}</li>
-                <li><strong>Status:</strong> {status}</li>
-                <li><strong>Due Date:</strong> {due_date}</li>
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to your task:
-
-Task: {task_name}
-Task ID: {task_id}
-Description: {description}
-Status: {status}
-Due Date: {due_date}
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        else:
-            # Fallback if task details not available
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to task (ID: {task_id}):</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to task (ID: {task_id}):
-
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        
-        return self.send_notification_based_on_preferences(
-            collaborator_user_id, notification_content, "comment_collaborator", task_id, plain_text
-        )
-    
-    def notify_deadline_reminder(self, task_id: int, reminder_days: int) -> List[Dict[str, Any]]:
-        """
-        Send deadline reminder notifications to all task collaborators.
+        Send deadline reminder notifications to all task collaborators.
         
         Args:
             task_id: ID of the task with upcoming deadline
@@ -1170,169 +1016,11 @@ Days Remaining: {reminder_days} day{'s' if reminder_days != 1 else ''}
 
 Please review the task and take necessary actions to meet the deadline."""
         
-        # Send notifications to all collaborators
-        results = []
-        for collaborator_id in collaborators:
-            result = self.send_notification_based_on_preferences(
-                collaborator_id,
-                notification_content,
-                "due_date_reminder",
-                task_id,
-                plain_text
-            )
-            results.append({"user_id": collaborator_id, "result": result})
-        
-        return results
-
-    def notify_comment_mention(self, task_id: int, mentioned_user_id: int, commenter_name: str, 
-                             comment_content: str, task_name: str = None) -> Dict[str, Any]:
-        """
-        Send notification for comment mentions following the structured format of task assignments.
-        """
-        # Get task details
-        task_details = self._get_task_details(task_id)
-        
-        if task_details:
-            task_name = task_details.get("task_name", f"Task {task_id}")
-            description = task_details.get("description", "No description available")
-            due_date = task_details.get("due_date", "No due date set")
-            status = task_details.get("status", "Unknown")
-            
-            # Format due date for display
-            if due_date != "No due date set":
-                try:
-                    from datetime import datetime
-                    due_date_obj = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    due_date = due_date_obj.strftime('%Y-%m-%d')
-                except:
-                    pass
-            
-            # HTML content for email - following the structured format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Task:</strong> {task_name}</li>
-                <li><strong>Task ID:</strong> {task_id}</li>
-                <li><strong>Description:</strong> {description}</li>
-                <li><strong>Status:</strong> {status}</li>
-                <li><strong>Due Date:</strong> {due_date}</li>
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on:
-
-Task: {task_name}
-Task ID: {task_id}
-Description: {description}
-Status: {status}
-Due Date: {due_date}
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        else:
-            # Fallback if task details not available
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>Comment Mention Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">You have been mentioned in a comment on task (ID: {task_id}):</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            plain_text = f"""**Comment Mention Summary**
-You have been mentioned in a comment on task (ID: {task_id}):
-
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        
-        return self.send_notification_based_on_preferences(
-            mentioned_user_id, notification_content, "comment_mention", task_id, plain_text
-        )
-
-    def notify_comment_collaborator(self, task_id: int, collaborator_user_id: int, commenter_name: str, 
-                                  comment_content: str, task_name: str = None) -> Dict[str, Any]:
-        """
-        Send notification for comment collaborators following the structured format of task assignments.
-        """
-        # Get task details
-        task_details = self._get_task_details(task_id)
-        
-        if task_details:
-            task_name = task_details.get("task_name", f"Task {task_id}")
-            description = task_details.get("description", "No description available")
-            due_date = task_details.get("due_date", "No due date set")
-            status = task_details.get("status", "Unknown")
-            
-            # Format due date for display
-            if due_date != "No due date set":
-                try:
-                    from datetime import datetime
-                    due_date_obj = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    due_date = due_date_obj.strftime('%Y-%m-%d')
-                except:
-                    pass
-            
-            # HTML content for email - following the structured format
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to your task:</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Task:</strong> {task_name}</li>
-                <li><strong>Task ID:</strong> {task_id}</li>
-                <li><strong>Description:</strong> {description}</li>
-                <li><strong>Status:</strong> {status}</li>
-                <li><strong>Due Date:</strong> {due_date}</li>
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            # Plain text content for in-app notification - following the structured format
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to your task:
-
-Task: {task_name}
-Task ID: {task_id}
-Description: {description}
-Status: {status}
-Due Date: {due_date}
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        else:
-            # Fallback if task details not available
-            notification_content = f"""
-            <h3 style="color: #1f2937; margin-bottom: 16px;"><strong>New Comment Summary</strong></h3>
-            <p style="color: #374151; margin-bottom: 12px;">A new comment has been added to task (ID: {task_id}):</p>
-            <ul style="color: #374151; margin-bottom: 16px;">
-                <li><strong>Commenter:</strong> {commenter_name}</li>
-                <li><strong>Comment:</strong> "{comment_content}"</li>
-            </ul>
-            <p style="color: #6b7280; font-size: 14px;">You can view and respond to this comment in your task.</p>
-            """
-            
-            plain_text = f"""**New Comment Summary**
-A new comment has been added to task (ID: {task_id}):
-
-Commenter: {commenter_name}
-Comment: "{comment_content}"
-
-You can view and respond to this comment in your task."""
-        
-        return self.send_notification_based_on_preferences(
-            collaborator_user_id, notification_content, "comment_collaborator", task_id, plain_text
+        # Send notifications to all collaborators, emailed in one bulk send
+        return self.send_notifications_based_on_preferences(
+            collaborators,
+            notification_content,
+            "due_date_reminder",
+            task_id,
+            plain_text
         )
-
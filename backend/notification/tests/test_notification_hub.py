@@ -0,0 +1,81 @@
+import unittest
+import json
+import sys
+import os
+import time
+
+from websockets.exceptions import InvalidStatus
+from websockets.sync.client import connect
+
+# Add the parent directory to the path to import the service modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from services.notification_hub import NotificationHub
+
+
+class TestNotificationHub(unittest.TestCase):
+    """Test cases for the WebSocket notification push hub"""
+
+    def setUp(self):
+        """Start a hub on a free local port with an in-memory replay source"""
+        self.replayed = []
+        self.hub = NotificationHub(host="127.0.0.1", port=0)
+        self.hub.start(replay=self._replay)
+
+    def tearDown(self):
+        self.hub.stop()
+
+    def _replay(self, user_id, since):
+        self.replayed.append((user_id, since))
+        return [{"id": 2, "userid": user_id, "notification": "Newer"},
+                {"id": 1, "userid": user_id, "notification": "Older"}]
+
+    def _url(self, path):
+        return f"ws://127.0.0.1:{self.hub.port}{path}"
+
+    def _wait_for_connections(self, count):
+        for _ in range(200):
+            if self.hub.connection_count() == count:
+                return
+            time.sleep(0.01)
+        self.fail(f"expected {count} connection(s), hub has {self.hub.connection_count()}")
+
+    def test_published_notification_reaches_only_its_user(self):
+        """Test every connection of the user gets the push and other users get nothing"""
+        with connect(self._url("/notifications/stream/7")) as first, \
+                connect(self._url("/notifications/stream/7")) as second, \
+                connect(self._url("/notifications/stream/8")) as other:
+            self._wait_for_connections(3)
+
+            self.hub.publish(7, {"id": 5, "userid": 7, "notification": "Hello"})
+
+            for connection in (first, second):
+                message = json.loads(connection.recv(timeout=2))
+                self.assertEqual(message, {"type": "notification",
+                                           "data": {"id": 5, "userid": 7, "notification": "Hello"}})
+            with self.assertRaises(TimeoutError):
+                other.recv(timeout=0.2)
+
+        self._wait_for_connections(0)
+
+    def test_reconnect_replays_missed_notifications_oldest_first(self):
+        """Test a client connecting with since first receives what it missed"""
+        with connect(self._url("/notifications/stream/7?since=2026-10-18T09:00:00Z")) as connection:
+            ids = [json.loads(connection.recv(timeout=2))["data"]["id"] for _ in range(2)]
+
+        self.assertEqual(ids, [1, 2])
+        self.assertEqual(self.replayed, [(7, "2026-10-18T09:00:00+00:00")])
+
+    def test_bad_requests_are_rejected_before_the_handshake(self):
+        """Test unknown paths and invalid since values get an HTTP error"""
+        for path, status in (("/notifications/stream/abc", 404), ("/notifications/stream/7?since=soon", 400)):
+            with self.assertRaises(InvalidStatus) as raised:
+                connect(self._url(path))
+            self.assertEqual(raised.exception.response.status_code, status)
+
+    def test_publish_without_a_running_hub_is_a_no_op(self):
+        """Test services can publish when no hub was started"""
+        NotificationHub().publish(7, {"id": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
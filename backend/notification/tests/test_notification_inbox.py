@@ -0,0 +1,196 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add the parent directory to the path to import the service modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.parsing import (
+    decode_notification_cursor, encode_notification_cursor, parse_notification_ids,
+    parse_notification_list_query
+)
+from repo.supa_notification_repo import SupabaseNotificationRepo
+from services.notification_service import NotificationService, UnreadCounter
+
+
+def _notification(notification_id, created_at):
+    return {"id": notification_id, "userid": 7, "notification": f"Note {notification_id}",
+            "created_at": created_at, "is_read": False}
+
+
+class TestInboxQueryParsing(unittest.TestCase):
+    """Test cases for the inbox query parameters"""
+
+    def test_defaults_return_everything(self):
+        """Test no parameters means the full, unprojected list"""
+        self.assertEqual(parse_notification_list_query({}),
+                         {"fields": "*", "limit": None, "cursor": None, "since": None})
+
+    def test_fields_always_include_the_cursor_columns(self):
+        """Test projection keeps id and created_at and rejects unknown columns"""
+        query = parse_notification_list_query({"fields": "notification,is_read"})
+        self.assertEqual(query["fields"], "id,created_at,notification,is_read")
+
+        with self.assertRaises(ValueError):
+            parse_notification_list_query({"fields": "password"})
+
+    def test_limit_and_since_are_validated(self):
+        """Test limit bounds and since normalization to an aware timestamp"""
+        for bad in ({"limit": "0"}, {"limit": "201"}, {"limit": "ten"}, {"since": "yesterday"}):
+            with self.assertRaises(ValueError):
+                parse_notification_list_query(bad)
+
+        query = parse_notification_list_query({"limit": "20", "since": "2026-10-18T09:00:00"})
+        self.assertEqual(query["limit"], 20)
+        self.assertEqual(query["since"], "2026-10-18T09:00:00+00:00")
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the (created_at, id) it was built from"""
+        cursor = encode_notification_cursor(_notification(42, "2026-10-18T09:00:00.123456+00:00"))
+
+        self.assertEqual(decode_notification_cursor(cursor), ("2026-10-18T09:00:00.123456+00:00", 42))
+        with self.assertRaises(ValueError):
+            parse_notification_list_query({"cursor": "not-a-cursor"})
+
+
+class TestInboxPagination(unittest.TestCase):
+    """Test cases for paginated inbox reads"""
+
+    def setUp(self):
+        self.repo = MagicMock()
+        self.service = NotificationService(repo=self.repo)
+
+    def test_full_page_has_next_cursor(self):
+        """Test a page as long as the limit points at its last row"""
+        page = [_notification(3, "2026-10-18T10:00:00+00:00"), _notification(2, "2026-10-18T09:00:00+00:00")]
+        self.repo.find_by_user.return_value = page
+
+        result = self.service.get_notifications_by_user(7, limit=2)
+
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(decode_notification_cursor(result["next_cursor"]), ("2026-10-18T09:00:00+00:00", 2))
+
+    def test_last_page_and_empty_poll(self):
+        """Test a short page ends the list and an empty poll is not a 404"""
+        self.repo.find_by_user.return_value = [_notification(1, "2026-10-18T08:00:00+00:00")]
+        self.assertIsNone(self.service.get_notifications_by_user(7, limit=2)["next_cursor"])
+
+        self.repo.find_by_user.return_value = []
+        self.assertEqual(self.service.get_notifications_by_user(7, since="2026-10-18T10:00:00+00:00")["status"], 200)
+        self.assertEqual(self.service.get_notifications_by_user(7)["status"], 404)
+
+    def test_unpaginated_response_is_unchanged(self):
+        """Test omitting limit returns the plain list without a cursor"""
+        self.repo.find_unread_by_user.return_value = [_notification(1, "2026-10-18T08:00:00+00:00")]
+
+        result = self.service.get_unread_notifications(7)
+
+        self.assertEqual(set(result), {"status", "data"})
+
+    @patch("repo.supa_notification_repo.supabase_client.get_client")
+    def test_repo_builds_keyset_query(self, mock_get_client):
+        """Test the repo filters after the cursor, newest first, with the projection"""
+        from supabase import create_client
+        mock_get_client.return_value = create_client("http://x.supabase.co", "eyJhbGciOiJIUzI1NiJ9.e30.x")
+        repo = SupabaseNotificationRepo()
+
+        query = repo._paginate(
+            repo.client.table("notification").select("id,created_at").eq("userid", 7),
+            20, ("2026-10-18T09:00:00+00:00", 42), "2026-10-01T00:00:00+00:00"
+        )
+        params = query.request.params
+
+        self.assertEqual(params["select"], "id,created_at")
+        self.assertEqual(params["created_at"], "gte.2026-10-01T00:00:00+00:00")
+        self.assertEqual(params["or"], '(created_at.lt."2026-10-18T09:00:00+00:00",'
+                                       'and(created_at.eq."2026-10-18T09:00:00+00:00",id.lt.42))')
+        self.assertEqual(params["order"], "created_at.desc,id.desc")
+        self.assertEqual(params["limit"], "20")
+
+
+class TestBulkOperationsAndUnreadCounter(unittest.TestCase):
+    """Test cases for bulk inbox writes and the maintained unread count"""
+
+    def setUp(self):
+        self.repo = MagicMock()
+        self.repo.get_unread_count.return_value = 5
+        self.service = NotificationService(repo=self.repo, unread_counter=UnreadCounter(ttl=60))
+
+    def _unread_count(self):
+        return self.service.get_unread_count(7)["data"]["unread_count"]
+
+    def test_count_is_seeded_once_then_maintained(self):
+        """Test polling reads the exact count once and then follows inserts"""
+        self.assertEqual(self._unread_count(), 5)
+        self.repo.insert_notification.return_value = {"id": 9, "userid": 7, "is_read": False}
+        self.service.create_notification({"userid": 7, "notification": "Hello"})
+
+        self.assertEqual(self._unread_count(), 6)
+        self.repo.get_unread_count.assert_called_once_with(7)
+
+    def test_single_read_is_one_write(self):
+        """Test marking read skips the existence check and only counts real changes"""
+        self._unread_count()
+        self.repo.set_read_state.return_value = ({"id": 1, "userid": 7, "is_read": True}, True)
+        self.assertEqual(self.service.mark_notification_as_read(1)["status"], 200)
+        self.repo.set_read_state.return_value = ({"id": 1, "userid": 7, "is_read": True}, False)
+        self.service.mark_notification_as_read(1)
+
+        self.assertEqual(self._unread_count(), 4)
+        self.repo.get_notification.assert_not_called()
+
+        self.repo.set_read_state.return_value = (None, False)
+        self.assertEqual(self.service.mark_notification_as_read(99)["status"], 404)
+
+    def test_bulk_read_and_delete(self):
+        """Test bulk writes adjust the count by what actually changed"""
+        self._unread_count()
+        self.repo.mark_many_as_read.return_value = 2
+        self.assertEqual(self.service.mark_notifications_as_read(7, [1, 2, 3])["data"], {"updated": 2})
+
+        self.repo.delete_many.return_value = [{"id": 4, "is_read": False}, {"id": 5, "is_read": True}]
+        self.assertEqual(self.service.delete_notifications(7, [4, 5])["data"], {"deleted": [4, 5]})
+        self.assertEqual(self._unread_count(), 2)
+
+        self.service.mark_all_notifications_as_read(7)
+        self.repo.mark_many_as_read.assert_called_with(7)
+        self.assertEqual(self._unread_count(), 0)
+
+    def test_seed_racing_a_write_is_not_cached(self):
+        """Test a count loaded while a write lands is served once but not kept"""
+        counter = UnreadCounter(ttl=60)
+
+        def load():
+            counter.adjust(7, 1)
+            return 5
+
+        self.assertEqual(counter.get(7, load), 5)
+        self.assertEqual(counter.get(7, lambda: 6), 6)
+        self.assertEqual(counter.get(7, lambda: 0), 6)
+
+    def test_ids_are_validated(self):
+        """Test bulk ids accept lists or comma strings and reject bad input"""
+        self.assertEqual(parse_notification_ids({"ids": [3, "1", 3]}), [3, 1])
+        self.assertEqual(parse_notification_ids({"ids": "1, 2"}), [1, 2])
+        for bad in ({}, {"ids": []}, {"ids": ["x"]}, {"ids": list(range(501))}):
+            with self.assertRaises(ValueError):
+                parse_notification_ids(bad)
+
+    @patch("repo.supa_notification_repo.supabase_client.get_client")
+    def test_mark_all_is_a_single_counted_update(self, mock_get_client):
+        """Test mark-all-read only touches the user's unread rows and asks for a count"""
+        mock_get_client.return_value = MagicMock()
+        repo = SupabaseNotificationRepo()
+        table = repo.client.table.return_value
+        update = table.update.return_value.eq.return_value.eq.return_value
+        update.execute.return_value.count = 3
+
+        self.assertEqual(repo.mark_many_as_read(7), 3)
+        table.update.return_value.eq.assert_called_once_with("userid", 7)
+        table.update.return_value.eq.return_value.eq.assert_called_once_with("is_read", False)
+        update.in_.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
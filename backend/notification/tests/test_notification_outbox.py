@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+import tempfile
+import importlib
+
+# Add the backend directory to the path to import the shared outbox module
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import notification_outbox
+from notification_outbox import NotificationOutbox
+
+TRIGGER_PATH = "/notifications/triggers/task-collaborator-addition"
+
+
+def _response(status_code):
+    response = Mock(status_code=status_code)
+    response.text = "error body"
+    return response
+
+
+class TestNotificationOutbox(unittest.TestCase):
+    """Test cases for the SQLite notification outbox"""
+
+    def setUp(self):
+        """Create an outbox in a throwaway file with no retry delay"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "outbox.db")
+        self.outbox = NotificationOutbox(path=self.path, max_attempts=3, retry_base=0)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @patch('service_client.post')
+    def test_enqueue_does_not_send(self, mock_post):
+        """Test enqueue only records the trigger"""
+        self.outbox.enqueue(TRIGGER_PATH, {"task_id": 1, "collaborator_ids": [2]})
+
+        mock_post.assert_not_called()
+        self.assertEqual(self.outbox.stats()["pending"], 1)
+
+    @patch('service_client.post')
+    def test_dispatch_delivers_and_removes(self, mock_post):
+        """Test a delivered trigger is posted with its payload and removed"""
+        mock_post.return_value = _response(201)
+        self.outbox.enqueue(TRIGGER_PATH, {"task_id": 1, "collaborator_ids": [2]})
+
+        attempted = self.outbox.dispatch_pending()
+
+        self.assertEqual(attempted, 1)
+        mock_post.assert_called_once_with("notification", TRIGGER_PATH, json={"task_id": 1, "collaborator_ids": [2]})
+        self.assertEqual(self.outbox.stats(), {"pending": 0, "dead": 0})
+
+    @patch('service_client.post')
+    def test_server_errors_retry_then_dead_letter(self, mock_post):
+        """Test 5xx and connection errors are retried until max_attempts, then dead-lettered"""
+        mock_post.side_effect = [_response(503), Exception("connection refused"), _response(500)]
+        self.outbox.enqueue(TRIGGER_PATH, {"task_id": 1})
+
+        for _ in range(3):
+            self.outbox.dispatch_pending()
+
+        self.assertEqual(mock_post.call_count, 3)
+        dead = self.outbox.dead_letters()
+        self.assertEqual(len(dead), 1)
+        self.assertEqual(dead[0]["attempts"], 3)
+        self.assertEqual(dead[0]["payload"], {"task_id": 1})
+        self.assertIn("HTTP 500", dead[0]["last_error"])
+
+    @patch('service_client.post')
+    def test_client_error_dead_letters_immediately(self, mock_post):
+        """Test a 4xx response is not retried"""
+        mock_post.return_value = _response(400)
+        self.outbox.enqueue(TRIGGER_PATH, {"task_id": 1})
+
+        self.outbox.dispatch_pending()
+        self.outbox.dispatch_pending()
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(self.outbox.stats()["dead"], 1)
+
+    @patch('service_client.post')
+    def test_requeue_dead(self, mock_post):
+        """Test dead letters can be requeued and delivered"""
+        mock_post.side_effect = [_response(400), _response(200)]
+        self.outbox.enqueue(TRIGGER_PATH, {"task_id": 1})
+        self.outbox.dispatch_pending()
+
+        self.assertEqual(self.outbox.requeue_dead(), 1)
+        self.outbox.dispatch_pending()
+
+        self.assertEqual(self.outbox.stats(), {"pending": 0, "dead": 0})
+
+    @patch('service_client.post')
+    def test_claimed_rows_are_not_sent_twice(self, mock_post):
+        """Test a second dispatcher on the same file skips rows already claimed"""
+        other = NotificationOutbox(path=self.path)
+        self.outbox.enqueue(TRIGGER_PATH, {"task_id": 1})
+
+        claimed = self.outbox._claim_due(10)
+
+        self.assertEqual(len(claimed), 1)
+        self.assertEqual(other.dispatch_pending(), 0)
+        mock_post.assert_not_called()
+
+    def test_default_path_does_not_depend_on_the_working_directory(self):
+        """Test the default outbox file sits next to the module, wherever the service was started"""
+        with patch.dict(os.environ), tempfile.TemporaryDirectory() as elsewhere:
+            os.environ.pop("NOTIFICATION_OUTBOX_PATH", None)
+            cwd = os.getcwd()
+            os.chdir(elsewhere)
+            try:
+                path = importlib.reload(notification_outbox).OUTBOX_PATH
+            finally:
+                os.chdir(cwd)
+                importlib.reload(notification_outbox)
+
+        self.assertEqual(path, os.path.join(os.path.dirname(os.path.abspath(notification_outbox.__file__)),
+                                            "notification_outbox.db"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+
+# Add the parent directory to the path to import the services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+import requests
+from services.notification_service import NotificationService
+from services.notification_trigger_service import NotificationTriggerService
+
+
+def _users_response(user_ids):
+    response = Mock(status_code=200)
+    response.json.return_value = {"data": [
+        {"userid": user_id, "name": f"User {user_id}", "email": f"user{user_id}@example.com",
+         "notification_preferences": {"in_app": True, "email": False}}
+        for user_id in user_ids
+    ]}
+    return response
+
+
+def _fake_users_get(service, path, params=None, **kwargs):
+    """Stand-in for the users service bulk lookup (GET /users?ids=...)"""
+    return _users_response(int(i) for i in params["ids"].split(","))
+
+
+def _fake_users_get_with_email(service, path, params=None, **kwargs):
+    """Bulk lookup where every user also wants email notifications"""
+    response = _fake_users_get(service, path, params)
+    for user in response.json.return_value["data"]:
+        user["notification_preferences"]["email"] = True
+    return response
+
+
+class TestNotificationTriggerUserResolution(unittest.TestCase):
+    """Test cases for batched recipient resolution in NotificationTriggerService"""
+
+    def setUp(self):
+        """Trigger service with a mocked notification service and task lookup"""
+        with patch('services.notification_trigger_service.NotificationService'):
+            self.service = NotificationTriggerService(user_cache_ttl=30)
+        self.service.notification_service.create_notification.return_value = {"status": 201}
+        self.collaborators = list(range(100, 115))
+        self.service._get_task_details_from_supabase = Mock(return_value={
+            "id": 1, "task_name": "Launch", "owner_id": 1, "collaborators": self.collaborators,
+            "status": "Ongoing", "due_date": "2026-10-20T00:00:00Z"
+        })
+
+    @patch('service_client.get', side_effect=_fake_users_get)
+    def test_collaborator_addition_resolves_users_once(self, mock_get):
+        """Test a 15-collaborator event loads the task once and makes one users call"""
+        results = self.service.notify_task_collaborator_addition(1, self.collaborators, "Creator")
+
+        self.assertEqual(len(results), 15)
+        self.assertTrue(all(r["result"]["status"] == 200 for r in results))
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(mock_get.call_args.args[1], "/users")
+        self.assertEqual(self.service._get_task_details_from_supabase.call_count, 1)
+
+    @patch('service_client.get', side_effect=_fake_users_get)
+    def test_users_are_cached_between_events(self, mock_get):
+        """Test a second event within the TTL reuses the resolved users"""
+        self.service.notify_deadline_reminder(1, 3)
+        self.service.notify_deadline_reminder(1, 1)
+
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('service_client.get', side_effect=_fake_users_get)
+    def test_expired_cache_entries_are_refetched(self, mock_get):
+        """Test entries older than the TTL are looked up again"""
+        self.service.user_cache_ttl = 0
+        self.service.get_users_details([1, 2])
+        self.service.get_users_details([1, 2])
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('service_client.get')
+    def test_falls_back_to_single_lookups(self, mock_get):
+        """Test users are fetched one by one when the bulk lookup fails"""
+        single = Mock(status_code=200)
+        single.json.return_value = {"data": {"userid": 7, "name": "Seven"}}
+        mock_get.side_effect = [requests.ConnectionError("bulk unavailable"), single]
+
+        users = self.service.get_users_details([7])
+
+        self.assertEqual(users, {7: {"userid": 7, "name": "Seven"}})
+        self.assertEqual(mock_get.call_args.args[1], "/users/7")
+
+    @patch('service_client.get', side_effect=_fake_users_get)
+    def test_missing_user_is_reported(self, mock_get):
+        """Test a recipient unknown to the users service still yields a 404 result"""
+        mock_get.side_effect = lambda service, path, params=None, **kwargs: _users_response([])
+
+        result = self.service.notify_task_assignment(1, 999, "Creator")
+
+        self.assertEqual(result["status"], 404)
+
+    @patch('service_client.get', side_effect=_fake_users_get_with_email)
+    def test_deadline_reminder_sends_one_bulk_email(self, mock_get):
+        """Test every recipient of a reminder is emailed in one bulk send with their own name"""
+        self.service.notification_service.send_bulk_email_notification.return_value = {
+            "status": 207, "message": "1 failed", "sent": 15, "failed": ["user100@example.com"], "requests": 1
+        }
+
+        results = self.service.notify_deadline_reminder(1, 3)
+
+        bulk = self.service.notification_service.send_bulk_email_notification
+        bulk.assert_called_once()
+        self.service.notification_service.send_email_notification.assert_not_called()
+        recipients, subject, html = bulk.call_args.args
+        self.assertEqual(len(recipients), 16)  # owner + 15 collaborators
+        self.assertEqual(recipients[1], {"email": "user100@example.com", "substitutions": {"-user_name-": "User 100"}})
+        self.assertIn("-user_name-", html)
+        self.assertEqual(self.service.notification_service.create_notification.call_count, 16)
+        email_status = {r["user_id"]: r["result"]["results"][1]["result"]["status"] for r in results}
+        self.assertEqual(email_status[100], 500)
+        self.assertEqual(email_status[101], 200)
+
+
+    @patch('service_client.get', side_effect=_fake_users_get)
+    def test_comment_batch_uses_the_callers_task_details(self, mock_get):
+        """Test one comment's recipients share one users call and no task fetch"""
+        self.service._get_task_details = Mock()
+
+        results = self.service.notify_comment_recipients(
+            1, "mention", [100, 101, 100], "Alice", "Please check",
+            {"task_name": "Launch", "status": "Ongoing", "due_date": "2026-10-20T00:00:00Z"}
+        )
+
+        self.assertEqual([r["user_id"] for r in results], [100, 101])
+        self.assertEqual(mock_get.call_count, 1)
+        self.service._get_task_details.assert_not_called()
+        created = self.service.notification_service.create_notification.call_args.args[0]
+        self.assertEqual(created["notification_type"], "comment_mention")
+        self.assertIn("Task: Launch", created["notification"])
+        self.assertIn("Due Date: 2026-10-20", created["notification"])
+        with self.assertRaises(ValueError):
+            self.service.notify_comment_recipients(1, "reply", [100], "Alice", "Hi")
+
+
+class TestBulkEmailDelivery(unittest.TestCase):
+    """Test cases for NotificationService.send_bulk_email_notification"""
+
+    def setUp(self):
+        self.service = NotificationService(repo=Mock())
+        self.recipients = [{"email": f"user{i}@example.com", "substitutions": {"-user_name-": f"User {i}"}}
+                           for i in range(1500)]
+        self.env = patch.dict(os.environ, {"SENDGRID_API_KEY": "SG.test", "SENDGRID_FROM_EMAIL": "spm@example.com"})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+
+    @patch('services.notification_service.get_sendgrid_client')
+    def test_recipients_are_chunked_into_personalizations(self, mock_client):
+        """Test 1500 recipients go out as two requests of at most 1000 personalizations"""
+        post = mock_client.return_value.client.mail.send.post
+        post.return_value = Mock(status_code=202)
+
+        result = self.service.send_bulk_email_notification(self.recipients, "Subject", "Dear -user_name-")
+
+        self.assertEqual(result["status"], 200)
+        self.assertEqual(result["sent"], 1500)
+        self.assertEqual(result["requests"], 2)
+        bodies = [c.kwargs["request_body"] for c in post.call_args_list]
+        self.assertEqual(sorted(len(b["personalizations"]) for b in bodies), [500, 1000])
+        first = next(b for b in bodies if len(b["personalizations"]) == 1000)["personalizations"][0]
+        self.assertEqual(first, {"to": [{"email": "user0@example.com"}], "substitutions": {"-user_name-": "User 0"}})
+        mock_client.assert_called_with("SG.test")
+
+    @patch('services.notification_service.get_sendgrid_client')
+    def test_failed_chunk_is_reported(self, mock_client):
+        """Test recipients of a rejected chunk are listed as failed"""
+        def post(request_body):
+            first = request_body["personalizations"][0]["to"][0]["email"]
+            return Mock(status_code=202 if first == "user0@example.com" else 500, body="error")
+        mock_client.return_value.client.mail.send.post.side_effect = post
+
+        result = self.service.send_bulk_email_notification(self.recipients, "Subject", "Body")
+
+        self.assertEqual(result["status"], 207)
+        self.assertEqual(result["sent"], 1000)
+        self.assertEqual(len(result["failed"]), 500)
+
+    @patch('services.notification_service.get_sendgrid_client')
+    def test_missing_configuration(self, mock_client):
+        """Test nothing is sent without an API key"""
+        with patch.dict(os.environ, {"SENDGRID_API_KEY": ""}):
+            result = self.service.send_bulk_email_notification(self.recipients[:2], "Subject", "Body")
+
+        self.assertEqual(result["status"], 500)
+        self.assertEqual(len(result["failed"]), 2)
+        mock_client.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
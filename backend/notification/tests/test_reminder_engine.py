@@ -0,0 +1,151 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+
+# Add the parent directory to the path to import the scheduler utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.reminder_engine import ReminderEngine
+
+START = datetime(2026, 10, 18, 8, 0, tzinfo=timezone.utc)
+
+
+def _reminder(task_id, due_date, reminder_days):
+    due = datetime.fromisoformat(due_date)
+    return {"task_id": task_id, "task_name": f"Task {task_id}", "due_date": due_date,
+            "reminder_days": reminder_days, "remind_at": (due - timedelta(days=reminder_days)).isoformat()}
+
+
+class TestReminderEngine(unittest.TestCase):
+    """Test cases for the precise-time reminder engine"""
+
+    def setUp(self):
+        """Engine over an in-memory task list with a controllable clock"""
+        self.clock = START
+        self.reminders = [
+            _reminder(1, "2026-10-21T08:30:00+00:00", 3),
+            _reminder(2, "2026-10-19T08:10:00+00:00", 1),
+        ]
+        self.sent = set()
+        self.dispatched = []
+        self.windows = []
+
+        def fetch_window(start, end):
+            self.windows.append((start, end))
+            return [r for r in self.reminders
+                    if start <= datetime.fromisoformat(r["remind_at"]) < end]
+
+        def dispatch(key):
+            self.dispatched.append(key)
+            self.sent.add(key)
+            return {"outcome": "sent"}
+
+        self.engine = ReminderEngine(
+            fetch_window=fetch_window,
+            dispatch=dispatch,
+            already_sent=lambda keys: {key for key in keys if key in self.sent},
+            horizon=timedelta(hours=1),
+            now=lambda: self.clock,
+        )
+
+    def test_reminders_fire_at_their_instant(self):
+        """Test each reminder is dispatched once its own instant has passed, not before"""
+        self.assertEqual(self.engine.refresh(), 2)
+        self.assertEqual(self.engine.next_instant(), START + timedelta(minutes=10))
+
+        self.assertEqual(self.engine.fire_due(), 0)
+        self.clock = START + timedelta(minutes=10)
+        self.assertEqual(self.engine.fire_due(), 1)
+        self.assertEqual(self.dispatched, [(2, 1, "2026-10-19")])
+
+        self.clock = START + timedelta(minutes=30)
+        self.engine.fire_due()
+        self.assertEqual(self.dispatched[-1], (1, 3, "2026-10-21"))
+        self.assertIsNone(self.engine.next_instant())
+
+    def test_refresh_loads_only_the_window(self):
+        """Test a refresh reads from now - catch_up (the largest interval) to now + horizon"""
+        self.engine.refresh()
+
+        self.assertEqual(self.windows, [(START - timedelta(days=7), START + timedelta(hours=1))])
+
+    def test_due_date_edit_is_picked_up_on_refresh(self):
+        """Test moving a due date reschedules its reminder and drops the old instant"""
+        self.engine.refresh()
+        self.reminders[1] = _reminder(2, "2026-10-19T08:50:00+00:00", 1)
+
+        self.engine.refresh()
+        self.clock = START + timedelta(minutes=30)
+        self.engine.fire_due()
+        self.assertNotIn((2, 1, "2026-10-19"), self.dispatched)
+
+        self.clock = START + timedelta(minutes=50)
+        self.engine.fire_due()
+        self.assertIn((2, 1, "2026-10-19"), self.dispatched)
+        self.assertEqual(len(self.dispatched), 2)
+
+    def test_sent_and_missed_reminders(self):
+        """Test sent reminders are not rescheduled and ones missed earlier today fire at once"""
+        self.reminders.append(_reminder(3, "2026-10-25T06:00:00+00:00", 7))
+        self.sent.add((1, 3, "2026-10-21"))
+
+        self.engine.refresh()
+        self.engine.fire_due()
+
+        self.assertEqual(self.dispatched, [(3, 7, "2026-10-25")])
+
+    def test_reminders_missed_before_midnight_fire_on_startup(self):
+        """Test reminders from before the current UTC day still fire unless their task is already due"""
+        self.reminders = [
+            _reminder(4, "2026-10-18T23:00:00+00:00", 1),  # remind at 2026-10-17 23:00
+            _reminder(5, "2026-10-18T07:00:00+00:00", 1),  # already due
+            _reminder(6, "2026-10-11T06:00:00+00:00", 7),  # older than catch_up
+        ]
+
+        self.assertEqual(self.engine.refresh(), 1)
+        self.engine.fire_due()
+
+        self.assertEqual(self.dispatched, [(4, 1, "2026-10-18")])
+
+    def test_failed_send_is_retried_on_the_next_refresh(self):
+        """Test a reminder released after a failed send is scheduled again, even after midnight"""
+        outcomes = iter(["failed", "sent"])
+
+        def dispatch(key):
+            outcome = next(outcomes)
+            self.dispatched.append(key)
+            if outcome == "sent":
+                self.sent.add(key)
+            return {"outcome": outcome}
+
+        self.engine.dispatch = dispatch
+        self.reminders = [_reminder(4, "2026-10-19T07:00:00+00:00", 1)]  # remind at 2026-10-18 07:00
+        self.engine.refresh()
+        self.engine.fire_due()
+
+        self.clock = datetime(2026, 10, 19, 0, 5, tzinfo=timezone.utc)
+        self.engine.refresh()
+        self.engine.fire_due()
+
+        self.assertEqual(self.dispatched, [(4, 1, "2026-10-19")] * 2)
+        self.assertEqual(self.engine.stats["failed"], 1)
+        self.assertEqual(self.engine.stats["sent"], 1)
+
+    def test_changed_task_is_not_reminded_at_its_old_time(self):
+        """Test the batch re-check before firing drops reminders whose task changed"""
+        self.engine.fetch_tasks = lambda ids: {
+            1: {"id": 1, "due_date": "2026-10-21T08:30:00+00:00", "status": "Completed", "reminder_intervals": [3]},
+            2: {"id": 2, "due_date": "2026-10-19T08:10:00+00:00", "status": "Ongoing", "reminder_intervals": None},
+        }
+        self.engine.refresh()
+        self.clock = START + timedelta(minutes=30)
+
+        self.assertEqual(self.engine.fire_due(), 1)
+        self.assertEqual(self.dispatched, [(2, 1, "2026-10-19")])
+        self.assertEqual(self.engine.stats["dropped_stale"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
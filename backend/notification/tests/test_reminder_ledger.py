@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+from datetime import date
+
+# Add the parent directory to the path to import the scheduler utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils import reminder_ledger
+from utils.reminder_ledger import ReminderLedger, reminder_key
+
+
+class TestReminderLedger(unittest.TestCase):
+    """Test cases for the deadline reminder ledger"""
+
+    def setUp(self):
+        """Create a ledger on a mocked Supabase client"""
+        self.client = MagicMock()
+        self.ledger = ReminderLedger(client=self.client)
+
+    def test_reminder_key_keeps_only_the_due_day(self):
+        """Test timestamps with and without a timezone normalize to the same key"""
+        self.assertEqual(reminder_key(1, 3, "2026-10-20T09:30:00Z"), (1, 3, "2026-10-20"))
+        self.assertEqual(reminder_key("1", "3", "2026-10-20T09:30:00+08:00"), (1, 3, "2026-10-20"))
+        self.assertEqual(reminder_key(1, 3, date(2026, 10, 20)), (1, 3, "2026-10-20"))
+
+    def test_claim_is_decided_by_the_database(self):
+        """Test claim() is one claim_reminder call and returns whether the database granted it"""
+        key = reminder_key(1, 3, "2026-10-20")
+        self.client.rpc.return_value.execute.return_value.data = True
+
+        self.assertTrue(self.ledger.claim(key))
+        self.client.rpc.assert_called_once_with("claim_reminder", {
+            "p_task_id": 1, "p_reminder_days": 3, "p_due_date": "2026-10-20",
+            "p_claim_lease_seconds": reminder_ledger.CLAIM_LEASE,
+        })
+
+        self.client.rpc.return_value.execute.return_value.data = False
+        self.assertFalse(self.ledger.claim(key))
+
+    def test_already_sent_checks_many_keys_at_once(self):
+        """Test the bulk lookup sends the keys in chunks and returns the keys the database matched"""
+        keys = [reminder_key(task_id, 1, "2026-10-20") for task_id in range(1000)]
+        self.client.rpc.return_value.execute.side_effect = [
+            MagicMock(data=[{"task_id": 0, "reminder_days": 1, "due_date": "2026-10-20"}]),
+            MagicMock(data=[{"task_id": 999, "reminder_days": 1, "due_date": "2026-10-20"}]),
+        ]
+
+        with patch.object(reminder_ledger, "QUERY_CHUNK_SIZE", 500):
+            sent = self.ledger.already_sent(keys + keys[:10])
+
+        self.assertEqual(sent, {keys[0], keys[999]})
+        self.assertEqual(self.client.rpc.call_count, 2)
+        name, params = self.client.rpc.call_args_list[1][0]
+        self.assertEqual(name, "reminders_already_sent")
+        self.assertEqual(params["p_task_ids"], list(range(500, 1000)))
+        self.assertEqual(params["p_due_dates"], ["2026-10-20"] * 500)
+
+    def test_claim_lease_is_passed_to_the_database(self):
+        """Test claim expiry is left to the database clock, with the ledger's lease length"""
+        ledger = ReminderLedger(client=self.client, claim_lease=0)
+        self.client.rpc.return_value.execute.return_value.data = []
+
+        ledger.already_sent([reminder_key(1, 3, "2026-10-20")])
+
+        self.assertEqual(self.client.rpc.call_args[0][1]["p_claim_lease_seconds"], 0)
+
+    def test_mark_sent_and_release_match_the_whole_key(self):
+        """Test confirming and releasing only touch the row of that key"""
+        key = reminder_key(1, 3, "2026-10-20")
+        table = self.client.table.return_value
+
+        self.ledger.mark_sent(key)
+        table.update.assert_called_once_with({"status": "sent"})
+        table.update.return_value.eq.assert_called_once_with("task_id", 1)
+
+        self.ledger.release(key)
+        deleted = table.delete.return_value
+        deleted.eq.assert_called_once_with("task_id", 1)
+        deleted.eq.return_value.eq.assert_called_once_with("reminder_days", 3)
+        deleted.eq.return_value.eq.return_value.eq.assert_called_once_with("due_date", "2026-10-20")
+        self.client.table.assert_called_with("reminder_ledger")
+
+    def test_prune_drops_past_due_dates(self):
+        """Test prune deletes entries due before the cut-off and counts them"""
+        deleted = self.client.table.return_value.delete.return_value.lt
+        deleted.return_value.execute.return_value.data = [{"task_id": 1}]
+
+        removed = self.ledger.prune(before=date(2026, 10, 18))
+
+        self.assertEqual(removed, 1)
+        deleted.assert_called_once_with("due_date", "2026-10-18")
+
+    def test_unfinished_run_resumes_from_checkpoint(self):
+        """Test a second run on the same day resumes only if the first did not finish"""
+        runs = self.client.table.return_value
+        selected = runs.select.return_value.eq.return_value.execute.return_value
+
+        selected.data = [{"checkpoint_task_id": 42, "finished_at": None}]
+        self.assertEqual(self.ledger.start_run(date(2026, 10, 18), "shards-1-of-2"), 42)
+        runs.select.return_value.eq.assert_called_with("run_date", "2026-10-18#shards-1-of-2")
+        runs.upsert.assert_not_called()
+
+        selected.data = [{"checkpoint_task_id": 42, "finished_at": "2026-10-18T09:05:00+00:00"}]
+        self.assertIsNone(self.ledger.start_run(date(2026, 10, 18)))
+        upserted = runs.upsert.call_args[0][0]
+        self.assertEqual(upserted["run_date"], "2026-10-18")
+        self.assertIsNone(upserted["checkpoint_task_id"])
+        self.assertIsNone(upserted["finished_at"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add the parent directory to the path to import the scheduler utilities
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.reminder_ledger import ReminderLedger
+from utils.scheduler_lease import ShardLeases, shard_of
+
+
+class _LeaseTable:
+    """In-memory stand-in for the lease rows the replicas share, expiring on a fake clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.rows = {}
+
+    def acquire_lease(self, name, holder, ttl):
+        current = self.rows.get(name)
+        if current and current[0] != holder and current[1] > self.now:
+            return False
+        self.rows[name] = (holder, self.now + ttl)
+        return True
+
+    def release_lease(self, name, holder):
+        if self.rows.get(name, (None,))[0] == holder:
+            del self.rows[name]
+
+
+class TestSchedulerLease(unittest.TestCase):
+    """Test cases for scheduler replica leases and sharding"""
+
+    def setUp(self):
+        """Share one lease table between every replica"""
+        self.ledger = _LeaseTable()
+
+    def test_lease_is_taken_by_the_database(self):
+        """Test acquiring is one acquire_scheduler_lease call, with expiry left to the database clock"""
+        client = MagicMock()
+        client.rpc.return_value.execute.return_value.data = True
+        ledger = ReminderLedger(client=client)
+
+        self.assertTrue(ledger.acquire_lease("leader", "a", ttl=60))
+        client.rpc.assert_called_once_with("acquire_scheduler_lease",
+                                           {"p_name": "leader", "p_holder": "a", "p_ttl_seconds": 60})
+
+        client.rpc.return_value.execute.return_value.data = False
+        self.assertFalse(ledger.acquire_lease("leader", "b", ttl=60))
+
+    def test_release_and_holders(self):
+        """Test release only deletes the holder's own row, and holders come from the unexpired-lease view"""
+        client = MagicMock()
+        ledger = ReminderLedger(client=client)
+        client.table.return_value.select.return_value.order.return_value.execute.return_value.data = [
+            {"name": "leader", "holder": "b"}
+        ]
+
+        ledger.release_lease("leader", "a")
+        deleted = client.table.return_value.delete.return_value
+        deleted.eq.assert_called_once_with("name", "leader")
+        deleted.eq.return_value.eq.assert_called_once_with("holder", "a")
+
+        self.assertEqual(ledger.lease_holders(), {"leader": "b"})
+        client.table.assert_called_with("active_scheduler_leases")
+
+    def test_single_shard_elects_one_leader(self):
+        """Test with one shard the first replica sends everything and the second stands by"""
+        first = ShardLeases(self.ledger, shards=1, holder="a")
+        second = ShardLeases(self.ledger, shards=1, holder="b")
+
+        self.assertEqual(first.renew(), {0})
+        self.assertEqual(second.renew(), set())
+        self.assertTrue(all(first.owns(task_id) for task_id in range(100)))
+        self.assertFalse(any(second.owns(task_id) for task_id in range(100)))
+
+        first.stop()
+        self.assertEqual(second.renew(), {0})
+
+    def test_replica_that_stops_renewing_loses_its_shards(self):
+        """Test a replica's shards pass to another once its leases expire"""
+        first = ShardLeases(self.ledger, shards=2, max_shards=2, holder="a", ttl=60)
+        second = ShardLeases(self.ledger, shards=2, max_shards=2, holder="b", ttl=60)
+        first.renew()
+
+        self.assertEqual(second.renew(), set())
+        self.ledger.now += 61
+        self.assertEqual(second.renew(), {0, 1})
+
+    def test_shards_split_between_replicas(self):
+        """Test capped replicas divide the shards so every task has exactly one owner"""
+        replicas = [ShardLeases(self.ledger, shards=4, max_shards=2, holder=name) for name in ("a", "b")]
+        for replica in replicas:
+            replica.renew()
+
+        self.assertEqual(replicas[0].owned | replicas[1].owned, {0, 1, 2, 3})
+        self.assertEqual(replicas[0].owned & replicas[1].owned, set())
+        for task_id in range(200):
+            self.assertEqual(sum(replica.owns(task_id) for replica in replicas), 1)
+        self.assertRegex(replicas[0].scope(), r"^shards-\d,\d-of-4$")
+
+    def test_shard_of_is_stable_and_in_range(self):
+        """Test task ids map to a fixed shard within range and spread over all shards"""
+        shards = [shard_of(task_id, 8) for task_id in range(1000)]
+
+        self.assertEqual(shards, [shard_of(task_id, 8) for task_id in range(1000)])
+        self.assertEqual(set(shards), set(range(8)))
+        self.assertEqual({shard_of(task_id, 1) for task_id in range(1000)}, {0})
+
+
+if __name__ == '__main__':
+    unittest.main()
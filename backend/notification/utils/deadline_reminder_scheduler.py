@@ -9,22 +9,43 @@ Features:
 - Sends reminders at customizable intervals (default: 7, 3, 1 days before due date)
 - Respects user notification preferences (in-app/email)
 - Skips completed tasks
-- Tracks sent reminders to avoid duplicates
-- Runs daily at 9:00 AM (configurable)
+- Tracks sent reminders in a ledger (utils/reminder_ledger.py) to avoid duplicates
+- Dispatches reminders on a bounded worker pool; a crashed run resumes from its checkpoint
+- Logs per-run metrics (throughput, p95 dispatch latency, failures)
+- Precise mode (default): fires each reminder at its own instant, due date minus
+  the interval, through utils/reminder_engine.py
+- Several replicas can run side by side: shard leases (utils/scheduler_lease.py)
+  elect one sender per task-id hash range
+- Daily mode: sends all of the day's reminders at 9:00 AM (configurable)
+
+Usage:
+    python utils/deadline_reminder_scheduler.py                # precise-time engine
+    python utils/deadline_reminder_scheduler.py --mode daily   # one sweep per day at SCHEDULER_TIME
+    python utils/deadline_reminder_scheduler.py --dry-run      # select today's reminders once, send nothing
 """
 
 import os
 import sys
+import time
+import argparse
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
 import logging
+import threading
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import service_client
+from utils.reminder_engine import ReminderEngine
+from utils.reminder_ledger import ReminderLedger, reminder_key
+from utils.scheduler_lease import ShardLeases
 
 # Load environment variables
 load_dotenv()
@@ -41,115 +62,106 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Configuration
-NOTIFICATION_API_URL = os.getenv("NOTIFICATION_API_URL", "http://localhost:5006")
-TASKS_API_URL = os.getenv("TASKS_API_URL", "http://localhost:5002")
+# NOTIFICATION_API_URL is the older name of service_client's NOTIFICATION_SERVICE_URL
+if os.getenv("NOTIFICATION_API_URL"):
+    os.environ.setdefault("NOTIFICATION_SERVICE_URL", os.environ["NOTIFICATION_API_URL"])
+NOTIFICATION_API_URL = service_client.base_url("notification")
 SCHEDULER_TIME = os.getenv("SCHEDULER_TIME", "09:00")  # Default: 9:00 AM
+REMINDER_MAX_DAYS_AHEAD = int(os.getenv("REMINDER_MAX_DAYS_AHEAD", "7"))  # Largest reminder interval honoured
+REMINDER_WORKERS = int(os.getenv("REMINDER_WORKERS", "8"))  # Reminders dispatched concurrently
+REMINDER_MODE = os.getenv("REMINDER_MODE", "precise")  # "precise" (reminder engine) or "daily" (one sweep)
+TASK_BATCH_SIZE = 500  # Max ids per GET /tasks/batch
+CHECKPOINT_EVERY = 50  # Processed reminders between checkpoint writes
 
 
-def get_tasks_with_upcoming_deadlines(max_days_ahead: int = 7) -> List[Dict[str, Any]]:
+def get_due_reminders(today, max_days_ahead: int = REMINDER_MAX_DAYS_AHEAD) -> List[Dict[str, Any]]:
     """
-    Query tasks microservice for tasks with upcoming deadlines.
+    Query tasks microservice for the reminders due today. The tasks service
+    matches due dates against each task's reminder_intervals, so only
+    (task, interval) pairs that need a reminder are returned.
     
     Args:
-        max_days_ahead: Maximum number of days to look ahead for deadlines
+        today: Date the reminders are for
+        max_days_ahead: Largest reminder interval to consider
     
     Returns:
-        List of tasks with due dates in the next max_days_ahead days
+        List of {"task_id", "task_name", "due_date", "reminder_days"}
     """
     try:
-        # Calculate date range for logging
-        today = datetime.now().date()
-        end_date = today + timedelta(days=max_days_ahead)
-        
-        logger.info(f"Querying tasks with due dates between {today} and {end_date}")
-        
-        # Call the tasks microservice endpoint
-        tasks_api_url = f"{TASKS_API_URL}/tasks/upcoming-deadlines"
-        params = {"max_days_ahead": max_days_ahead}
-        
-        response = requests.get(tasks_api_url, params=params, timeout=10)
+        response = service_client.get(
+            "tasks", "/tasks/due-reminders",
+            params={"date": today.isoformat(), "max_days_ahead": max_days_ahead},
+            timeout=30
+        )
         
         if response.status_code == 200:
-            result = response.json()
-            tasks = result.get("data", [])
-            logger.info(f"Found {len(tasks)} tasks with upcoming deadlines")
-            return tasks
+            reminders = response.json().get("data", [])
+            logger.info(f"Found {len(reminders)} reminders due on {today}")
+            return reminders
         elif response.status_code == 404:
-            # No tasks found - this is not an error
-            logger.info("No tasks with upcoming deadlines found")
+            # Nothing due - this is not an error
+            logger.info(f"No reminders due on {today}")
             return []
         else:
             logger.error(f"Tasks API returned status {response.status_code}: {response.text}")
             return []
             
     except requests.exceptions.RequestException as e:
-        logger.error(f"Request error fetching tasks: {str(e)}")
+        logger.error(f"Request error fetching due reminders: {str(e)}")
         return []
     except Exception as e:
-        logger.error(f"Error fetching tasks: {str(e)}")
+        logger.error(f"Error fetching due reminders: {str(e)}")
         return []
 
 
-def calculate_days_until_due(due_date_str: str) -> int:
+def get_reminders_between(start: datetime, end: datetime,
+                          max_days_ahead: int = REMINDER_MAX_DAYS_AHEAD) -> List[Dict[str, Any]]:
     """
-    Calculate the number of days until a task is due.
-    
-    Args:
-        due_date_str: ISO format date string
+    Query tasks microservice for the reminders whose instant (due date minus
+    interval) falls in [start, end).
     
     Returns:
-        Number of days until due date (0 if due today, negative if overdue)
+        List of {"task_id", "task_name", "due_date", "reminder_days", "remind_at"}
+    
+    Raises:
+        requests.RequestException / RuntimeError if the tasks service cannot answer,
+        so the engine keeps its current schedule instead of emptying it
     """
-    try:
-        due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00')).date()
-        today = datetime.now().date()
-        delta = (due_date - today).days
-        return delta
-    except Exception as e:
-        logger.error(f"Error parsing due date {due_date_str}: {str(e)}")
-        return -999  # Return invalid value on error
+    response = service_client.get(
+        "tasks", "/tasks/due-reminders",
+        params={"from": start.isoformat(), "to": end.isoformat(), "max_days_ahead": max_days_ahead},
+        timeout=30
+    )
+    if response.status_code == 404:
+        return []
+    if response.status_code != 200:
+        raise RuntimeError(f"Tasks API returned status {response.status_code}: {response.text}")
+    return response.json().get("data", [])
 
 
-def check_if_reminder_already_sent(task_id: int, reminder_days: int) -> bool:
+def get_tasks_by_ids(task_ids: List[int]) -> Dict[int, Dict[str, Any]]:
     """
-    Check if a reminder has already been sent for this task and interval.
-    
-    Args:
-        task_id: ID of the task
-        reminder_days: Reminder interval (e.g., 7, 3, 1)
+    Fetch the reminder-relevant columns of many tasks through GET /tasks/batch.
     
     Returns:
-        True if reminder was already sent today, False otherwise
+        {task_id: task}; tasks that no longer exist are absent
     """
-    try:
-        today = datetime.now().date().isoformat()
-        
-        # Check if there's a notification of type 'due_date_reminder' created today
-        # that contains this task_id and reminder_days info
-        # Use the notification API to get notifications for the task
-        response = requests.get(f"{NOTIFICATION_API_URL}/notifications/task/{task_id}", timeout=5)
-        
-        if response.status_code == 200:
-            notifications = response.json().get("data", [])
-            
-            # Check if any notification contains the specific reminder_days in the content
-            for notification in notifications:
-                notification_type = notification.get("notification_type", "")
-                created_at = notification.get("created_at", "")
-                notification_text = notification.get("notification", "")
-                
-                # Check if it's a due_date_reminder created today with the right reminder_days
-                if (notification_type == "due_date_reminder" and 
-                    created_at.startswith(today) and 
-                    f"{reminder_days} day" in notification_text):
-                    logger.info(f"Reminder already sent for task {task_id} ({reminder_days} days)")
-                    return True
-        
-        return False
-    except Exception as e:
-        logger.error(f"Error checking reminder status: {str(e)}")
-        # On error, assume not sent to avoid missing reminders
-        return False
+    tasks = {}
+    for start in range(0, len(task_ids), TASK_BATCH_SIZE):
+        chunk = task_ids[start:start + TASK_BATCH_SIZE]
+        response = service_client.get(
+            "tasks", "/tasks/batch",
+            params={"ids": ",".join(str(task_id) for task_id in chunk),
+                    "fields": "due_date,status,reminder_intervals"},
+            timeout=30
+        )
+        if response.status_code == 404:
+            continue
+        if response.status_code not in (200, 207):
+            raise RuntimeError(f"Tasks API returned status {response.status_code}: {response.text}")
+        for task in response.json().get("data", {}).get("tasks", []):
+            tasks[task["id"]] = task
+    return tasks
 
 
 def send_deadline_reminder(task_id: int, reminder_days: int) -> bool:
@@ -164,7 +176,6 @@ def send_deadline_reminder(task_id: int, reminder_days: int) -> bool:
         True if notification sent successfully, False otherwise
     """
     try:
-        url = f"{NOTIFICATION_API_URL}/notifications/triggers/deadline-reminder"
         payload = {
             "task_id": task_id,
             "reminder_days": reminder_days
@@ -172,7 +183,8 @@ def send_deadline_reminder(task_id: int, reminder_days: int) -> bool:
         
         logger.info(f"Sending reminder for task {task_id} ({reminder_days} days before due)")
         
-        response = requests.post(url, json=payload, timeout=10)
+        response = service_client.post("notification", "/notifications/triggers/deadline-reminder",
+                                       json=payload, timeout=10)
         
         if response.status_code == 200:
             result = response.json()
@@ -189,83 +201,200 @@ def send_deadline_reminder(task_id: int, reminder_days: int) -> bool:
         return False
 
 
-def process_deadline_reminders():
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of `values` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, int(round(len(ordered) * percentile / 100)) - 1)]
+
+
+def _dispatch_reminder(ledger: ReminderLedger, key) -> Dict[str, Any]:
+    """
+    Claim, send and confirm one reminder. Returns its outcome ("sent", "skipped"
+    or "failed") and how long the send took.
+    """
+    task_id, reminder_days, _ = key
+    # claim() guards against a run that overlaps this one
+    if not ledger.claim(key):
+        logger.info(f"Skipping: Reminder already sent for task {task_id} ({reminder_days} days)")
+        return {"outcome": "skipped", "latency": 0.0}
+    
+    start = time.perf_counter()
+    sent = send_deadline_reminder(task_id, reminder_days)
+    latency = time.perf_counter() - start
+    if sent:
+        ledger.mark_sent(key)
+        return {"outcome": "sent", "latency": latency}
+    
+    # Released so it can be claimed again (see ReminderLedger.release for who retries it)
+    ledger.release(key)
+    return {"outcome": "failed", "latency": latency}
+
+
+def process_deadline_reminders(dry_run: bool = False, workers: int = REMINDER_WORKERS,
+                               leases: Optional[ShardLeases] = None) -> Dict[str, Any]:
     """
     Main function to process all deadline reminders.
     This function is called by the scheduler.
+    
+    Reminders are dispatched on a pool of `workers` threads. Progress is
+    checkpointed in the ledger as the highest task id below which every reminder
+    has been processed; if the process dies, the next run on the same day
+    resumes after it.
+    
+    With `leases`, only the tasks in the shards this replica holds are
+    processed, and a replica holding no shard stands by.
+    
+    Args:
+        dry_run: Select today's reminders and check the ledger, but claim and send nothing
+        workers: Reminders dispatched concurrently
+        leases: Shard leases of this replica (default: handle every task)
+    
+    Returns:
+        Run metrics (also logged and, for real runs, stored with the run in the ledger)
     """
     logger.info("=" * 80)
-    logger.info("Starting deadline reminder processing")
+    logger.info(f"Starting deadline reminder processing{' (dry run)' if dry_run else ''}")
     logger.info("=" * 80)
     
     try:
-        # Get all tasks with upcoming deadlines
-        tasks = get_tasks_with_upcoming_deadlines(max_days_ahead=7)
+        run_start = time.perf_counter()
+        today = datetime.now().date()
+        service_client.reserve_connections(workers)
         
-        if not tasks:
-            logger.info("No tasks with upcoming deadlines found")
-            return
+        scope = ""
+        if leases is not None:
+            if not leases.renew():
+                logger.info("Standing by: another scheduler replica holds every shard")
+                return {"run_date": today.isoformat(), "standby": True}
+            scope = leases.scope()
         
-        sent_count = 0
-        skipped_count = 0
-        error_count = 0
+        # Get the (task, interval) pairs due today, selected by the tasks service
+        reminders = get_due_reminders(today)
+        if leases is not None:
+            reminders = [r for r in reminders if leases.owns(r["task_id"])]
         
-        # Process each task
-        for task in tasks:
-            task_id = task.get("id")
-            task_name = task.get("task_name", "Unknown")
-            due_date = task.get("due_date")
-            reminder_intervals = task.get("reminder_intervals", [7, 3, 1])
-            
-            if not due_date:
-                logger.warning(f"Task {task_id} has no due date, skipping")
-                skipped_count += 1
-                continue
-            
-            # Calculate days until due
-            days_until_due = calculate_days_until_due(due_date)
-            
-            if days_until_due < 0:
-                logger.warning(f"Task {task_id} is overdue ({abs(days_until_due)} days), skipping")
-                skipped_count += 1
-                continue
-            
-            logger.info(f"Processing task {task_id} ('{task_name}'): {days_until_due} days until due")
+        # Checkpoints are task ids, so process in task id order
+        candidates = sorted(
+            {reminder_key(r["task_id"], r["reminder_days"], r["due_date"]) for r in reminders}
+        )
+        
+        ledger = leases.ledger if leases is not None else ReminderLedger()
+        resumed_from = None if dry_run else ledger.start_run(today, scope)
+        if resumed_from is not None:
+            logger.info(f"Resuming today's unfinished run after task {resumed_from}")
+            candidates = [key for key in candidates if key[0] > resumed_from]
+        
+        # One ledger lookup for the whole run
+        already_sent = ledger.already_sent(candidates)
+        pending = [key for key in candidates if key not in already_sent]
+        selection_seconds = time.perf_counter() - run_start
+        
+        metrics = {
+            "run_date": today.isoformat(),
+            "dry_run": dry_run,
+            "shards": scope or "all",
+            "candidates": len(candidates),
+            "resumed_from_task": resumed_from,
+            "selection_seconds": round(selection_seconds, 3),
+            "to_send": len(pending),
+            "sent": 0,
+            "skipped": len(already_sent),
+            "failed": 0,
+        }
+        latencies: List[float] = []
+        
+        if not dry_run and pending:
+            position = {key: index for index, key in enumerate(pending)}
+            done = [False] * len(pending)
+            watermark = 0  # pending[:watermark] are all processed
+            processed_since_checkpoint = 0
             
-            # Check if we should send a reminder for any interval
-            for reminder_days in reminder_intervals:
-                if days_until_due == reminder_days:
-                    # Check if reminder already sent today
-                    if check_if_reminder_already_sent(task_id, reminder_days):
-                        logger.info(f"Skipping: Reminder already sent for task {task_id} ({reminder_days} days)")
-                        skipped_count += 1
-                        continue
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                futures = {pool.submit(_dispatch_reminder, ledger, key): key for key in pending}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Error dispatching reminder for task {key[0]}: {str(e)}")
+                        result = {"outcome": "failed", "latency": 0.0}
+                    metrics[result["outcome"]] += 1
+                    if result["outcome"] != "skipped":
+                        latencies.append(result["latency"])
                     
-                    # Send the reminder
-                    if send_deadline_reminder(task_id, reminder_days):
-                        sent_count += 1
-                    else:
-                        error_count += 1
+                    done[position[key]] = True
+                    while watermark < len(pending) and done[watermark]:
+                        watermark += 1
+                    processed_since_checkpoint += 1
+                    if processed_since_checkpoint >= CHECKPOINT_EVERY and watermark:
+                        ledger.save_checkpoint(today, pending[watermark - 1][0], scope)
+                        processed_since_checkpoint = 0
+        
+        elapsed = time.perf_counter() - run_start
+        metrics.update({
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_per_second": round(metrics["sent"] / elapsed, 2) if elapsed else 0.0,
+            "dispatch_p50_ms": round(_percentile(latencies, 50) * 1000, 1),
+            "dispatch_p95_ms": round(_percentile(latencies, 95) * 1000, 1),
+        })
+        
+        if not dry_run:
+            ledger.finish_run(today, metrics, scope)
+            # Entries for past due dates can never match again
+            ledger.prune()
         
         logger.info("=" * 80)
-        logger.info(f"Deadline reminder processing complete")
-        logger.info(f"Reminders sent: {sent_count}")
-        logger.info(f"Reminders skipped: {skipped_count}")
-        logger.info(f"Errors: {error_count}")
+        logger.info(f"Deadline reminder processing complete{' (dry run, nothing sent)' if dry_run else ''}")
+        logger.info(f"Candidates: {metrics['candidates']} (selected in {metrics['selection_seconds']}s), "
+                    f"to send: {metrics['to_send']}")
+        logger.info(f"Reminders sent: {metrics['sent']}")
+        logger.info(f"Reminders skipped: {metrics['skipped']}")
+        logger.info(f"Errors: {metrics['failed']}")
+        logger.info(f"Throughput: {metrics['throughput_per_second']}/s, dispatch p50 {metrics['dispatch_p50_ms']} ms, "
+                    f"p95 {metrics['dispatch_p95_ms']} ms, total {metrics['elapsed_seconds']}s")
         logger.info("=" * 80)
+        return metrics
         
     except Exception as e:
         logger.error(f"Fatal error in deadline reminder processing: {str(e)}")
         raise
 
 
+def start_reminder_engine(workers: int = REMINDER_WORKERS, leases: Optional[ShardLeases] = None) -> ReminderEngine:
+    """
+    Start the precise-time reminder engine on a background thread.
+    
+    Args:
+        workers: Reminders dispatched concurrently
+        leases: Shard leases of this replica; the engine only fires reminders of held shards
+    
+    Returns:
+        The running engine; call stop() to end it
+    """
+    ledger = leases.ledger if leases is not None else ReminderLedger()
+    service_client.reserve_connections(workers)
+    engine = ReminderEngine(
+        fetch_window=get_reminders_between,
+        dispatch=lambda key: _dispatch_reminder(ledger, key),
+        already_sent=ledger.already_sent,
+        fetch_tasks=get_tasks_by_ids,
+        catch_up=timedelta(days=REMINDER_MAX_DAYS_AHEAD),
+        workers=workers,
+        task_filter=leases.owns if leases is not None else None
+    )
+    threading.Thread(target=engine.run_forever, name="reminder-engine", daemon=True).start()
+    return engine
+
+
 def test_scheduler_connection():
     """Test connection to notification API and tasks API before starting scheduler."""
     logger.info("Testing connections...")
     
     # Test tasks API connection
     try:
-        response = requests.get(f"{TASKS_API_URL}/tasks/upcoming-deadlines", timeout=5)
+        response = service_client.get("tasks", "/tasks/due-reminders", timeout=5)
         if response.status_code in [200, 404]:  # 404 is OK (no tasks found)
             logger.info(f"Tasks API connection successful (status: {response.status_code})")
         else:
@@ -278,7 +407,7 @@ def test_scheduler_connection():
     
     # Test notification API connection
     try:
-        response = requests.get(f"{NOTIFICATION_API_URL}/notifications/user/1", timeout=5)
+        response = service_client.get("notification", "/notifications/user/1", timeout=5)
         logger.info(f"Notification API connection successful (status: {response.status_code})")
     except Exception as e:
         logger.error(f"Notification API connection failed: {str(e)}")
@@ -290,9 +419,21 @@ def test_scheduler_connection():
 
 def main():
     """Main function to start the scheduler."""
+    parser = argparse.ArgumentParser(description="Deadline reminder scheduler")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="select today's reminders once and report the metrics without sending anything")
+    parser.add_argument("--workers", type=int, default=REMINDER_WORKERS, help="reminders dispatched concurrently")
+    parser.add_argument("--mode", choices=["precise", "daily"], default=REMINDER_MODE,
+                        help="fire each reminder at its own time, or sweep once a day at SCHEDULER_TIME")
+    args = parser.parse_args()
+    
+    if args.dry_run:
+        process_deadline_reminders(dry_run=True, workers=args.workers)
+        return
+    
     logger.info("Deadline Reminder Scheduler Starting...")
     logger.info(f"Notification API URL: {NOTIFICATION_API_URL}")
-    logger.info(f"Scheduled to run daily at: {SCHEDULER_TIME}")
+    logger.info(f"Mode: {args.mode}")
     
     # Test connections
     if not test_scheduler_connection():
@@ -309,29 +450,55 @@ def main():
         logger.error(f"Invalid SCHEDULER_TIME format: {SCHEDULER_TIME}. Using default 09:00")
         hour, minute = 9, 0
     
-    # Schedule the job to run daily at specified time
-    scheduler.add_job(
-        process_deadline_reminders,
-        trigger=CronTrigger(hour=hour, minute=minute),
-        id='deadline_reminder_job',
-        name='Process Deadline Reminders',
-        replace_existing=True
-    )
+    # Shard leases: with one shard, only the replica holding it sends reminders
+    leases = ShardLeases(ReminderLedger())
+    owned = leases.start()
+    logger.info(f"Scheduler {leases.holder} holds shards {sorted(owned)} of {leases.shards}"
+                f"{'' if owned else ' (standing by)'}")
     
-    logger.info(f"Scheduler configured successfully")
-    logger.info(f"Next run scheduled for: {scheduler.get_jobs()[0].next_run_time}")
-    logger.info("Press Ctrl+C to exit")
+    engine = None
+    if args.mode == "precise":
+        # The engine fires reminders on its own thread; the scheduler only prunes the ledger
+        engine = start_reminder_engine(workers=args.workers, leases=leases)
+        scheduler.add_job(
+            lambda: leases.ledger.prune(),
+            trigger=CronTrigger(hour=hour, minute=minute),
+            id='reminder_ledger_prune_job',
+            name='Prune Reminder Ledger',
+            replace_existing=True
+        )
+        logger.info("Reminder engine started: each reminder fires at its due date minus its interval")
+    else:
+        logger.info(f"Scheduled to run daily at: {SCHEDULER_TIME}")
+        
+        # Schedule the job to run daily at specified time
+        scheduler.add_job(
+            process_deadline_reminders,
+            kwargs={"workers": args.workers, "leases": leases},
+            trigger=CronTrigger(hour=hour, minute=minute),
+            id='deadline_reminder_job',
+            name='Process Deadline Reminders',
+            replace_existing=True
+        )
+        
+        logger.info(f"Scheduler configured successfully")
+        logger.info(f"Next run scheduled for: {scheduler.get_jobs()[0].next_run_time}")
+        
+        # Optionally run immediately for testing
+        if os.getenv("RUN_ON_STARTUP", "false").lower() == "true":
+            logger.info("Running deadline reminders immediately (RUN_ON_STARTUP=true)")
+            process_deadline_reminders(workers=args.workers, leases=leases)
     
-    # Optionally run immediately for testing
-    if os.getenv("RUN_ON_STARTUP", "false").lower() == "true":
-        logger.info("Running deadline reminders immediately (RUN_ON_STARTUP=true)")
-        process_deadline_reminders()
+    logger.info("Press Ctrl+C to exit")
     
     try:
         # Start the scheduler
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
         logger.info("\n👋 Scheduler stopped by user")
+        if engine:
+            engine.stop()
+        leases.stop()
         scheduler.shutdown()
 
 
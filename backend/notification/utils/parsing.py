@@ -1,4 +1,7 @@
-from typing import Dict, Any, List
+import base64
+import json
+from datetime import timezone
+from typing import Dict, Any, List, Optional, Tuple
 from dateutil import parser as dateparser
 
 def parse_project_payload(form_or_json: Dict[str, Any]) -> Dict[str, Any]:
@@ -80,3 +83,102 @@ def parse_project_update_payload(form_or_json: Dict[str, Any]) -> Dict[str, Any]
                 update_data[field_name] = parsed_list
     
     return update_data
+
+
+# ---- Inbox Query Parsing (pagination + projection) ----
+NOTIFICATION_COLUMNS = {
+    "id", "userid", "notification", "created_at", "is_read", "notification_type", "related_task_id"
+}
+MAX_PAGE_LIMIT = 200
+MAX_BULK_IDS = 500
+
+def encode_notification_cursor(notification: Dict[str, Any]) -> str:
+    """
+    Build an opaque keyset cursor from the (created_at, id) of the last notification on a page.
+    """
+    raw = json.dumps([notification["created_at"], notification["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_notification_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_notification_cursor back into (created_at, id).
+    """
+    try:
+        created_at, notification_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return str(created_at), int(notification_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: '{cursor}'")
+
+def _parse_notification_fields(fields_raw: Optional[str]) -> str:
+    """
+    Turn a comma-separated fields parameter into a select string; id and
+    created_at are always included. Defaults to "*".
+    """
+    if not fields_raw:
+        return "*"
+    requested = [f.strip() for f in fields_raw.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in NOTIFICATION_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {unknown}")
+    columns = ["id", "created_at"] + [f for f in requested if f not in ("id", "created_at")]
+    return ",".join(dict.fromkeys(columns))
+
+def parse_notification_list_query(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse the optional fields / limit / cursor / since query parameters of the inbox endpoints.
+
+    - fields: comma-separated notification columns; id and created_at are always
+      included so pages can be chained. Defaults to "*".
+    - limit: page size (1..MAX_PAGE_LIMIT). Omit for the full, unpaginated list.
+    - cursor: next_cursor value returned by the previous page.
+    - since: ISO timestamp; only notifications created at or after it are returned
+      (naive values are UTC). Used to poll for new items.
+    """
+    g = args.get
+
+    fields = _parse_notification_fields(g("fields"))
+
+    limit = None
+    limit_raw = g("limit")
+    if limit_raw not in (None, ""):
+        try:
+            limit = int(limit_raw)
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+
+    cursor_raw = g("cursor")
+    cursor = decode_notification_cursor(cursor_raw) if cursor_raw else None
+
+    since = None
+    since_raw = (g("since") or "").strip()
+    if since_raw:
+        try:
+            parsed = dateparser.isoparse(since_raw)
+        except (ValueError, OverflowError):
+            raise ValueError("since must be an ISO 8601 timestamp")
+        since = (parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)).isoformat()
+
+    return {"fields": fields, "limit": limit, "cursor": cursor, "since": since}
+
+def parse_notification_ids(payload: Dict[str, Any]) -> List[int]:
+    """
+    Parse the ids of a bulk notification operation: a list of integers or a
+    comma-separated string, 1..MAX_BULK_IDS of them. Duplicates are dropped.
+    """
+    ids_raw = payload.get("ids")
+    try:
+        if isinstance(ids_raw, str):
+            ids = [int(part) for part in ids_raw.split(",") if part.strip()]
+        elif isinstance(ids_raw, list):
+            ids = [int(x) for x in ids_raw]
+        else:
+            ids = []
+    except (TypeError, ValueError):
+        raise ValueError("ids must be a list of integers")
+    if not ids:
+        raise ValueError("ids is required")
+    if len(ids) > MAX_BULK_IDS:
+        raise ValueError(f"At most {MAX_BULK_IDS} ids can be given at once")
+    return list(dict.fromkeys(ids))
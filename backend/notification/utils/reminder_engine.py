@@ -0,0 +1,222 @@
+"""
+Precise-time deadline reminder engine.
+
+The daily sweep sends every reminder of the day at SCHEDULER_TIME, so all the
+emails go out in one spike and a 3-day reminder for a task due at 17:00 arrives
+at 09:00. The engine instead fires each reminder at its own instant, the task's
+due date minus the reminder interval:
+
+- upcoming reminder instants sit in an in-memory min-heap
+- the heap is loaded incrementally: every refresh re-reads only the bounded
+  window from `catch_up` ago to `horizon` ahead, never the whole task table.
+  `catch_up` defaults to the largest reminder interval: a reminder older than
+  that belongs to a task that is already due, so it is never worth sending
+- a refresh replaces the window's contents, so due-date edits, new tasks and
+  completions are picked up within one refresh interval; heap entries that no
+  longer match are dropped lazily when they reach the top
+- right before firing, the due tasks are re-read in one batch, so an edit made
+  after the last refresh is not reminded at its old time
+- sending goes through the same ledger keys (task_id, reminder_days, due_date)
+  as the daily run, so switching modes never sends a reminder twice.
+  Reminders missed while the engine was down (up to `catch_up` ago, across
+  midnight too) and reminders whose send failed fire on the next refresh,
+  unless their task is already due
+- with several replicas, task_filter keeps only the tasks of the shards this
+  replica holds (utils/scheduler_lease.py)
+
+The engine does no I/O of its own; the scheduler passes in the functions that
+talk to the tasks service, the ledger and the notification service.
+
+Environment variables:
+    REMINDER_ENGINE_HORIZON_MINUTES   How far ahead each refresh loads (default 60)
+    REMINDER_ENGINE_REFRESH_SECONDS   Seconds between refreshes (default 300)
+"""
+import heapq
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.reminder_ledger import ReminderKey, reminder_key
+
+HORIZON = timedelta(minutes=int(os.getenv("REMINDER_ENGINE_HORIZON_MINUTES", "60")))
+REFRESH_INTERVAL = float(os.getenv("REMINDER_ENGINE_REFRESH_SECONDS", "300"))
+
+# Intervals of tasks whose reminder_intervals is null (matches the Task model default)
+DEFAULT_REMINDER_INTERVALS = [7, 3, 1]
+
+# How far back each refresh looks for reminders not sent yet
+CATCH_UP = timedelta(days=max(DEFAULT_REMINDER_INTERVALS))
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ReminderEngine:
+    """Min-heap of upcoming reminder instants, refreshed window by window."""
+
+    def __init__(self,
+                 fetch_window: Callable[[datetime, datetime], List[Dict[str, Any]]],
+                 dispatch: Callable[[ReminderKey], Dict[str, Any]],
+                 already_sent: Callable[[Iterable[ReminderKey]], Set[ReminderKey]],
+                 fetch_tasks: Optional[Callable[[List[int]], Dict[int, Dict[str, Any]]]] = None,
+                 horizon: timedelta = HORIZON,
+                 catch_up: timedelta = CATCH_UP,
+                 refresh_interval: float = REFRESH_INTERVAL,
+                 workers: int = 8,
+                 task_filter: Optional[Callable[[int], bool]] = None,
+                 now: Callable[[], datetime] = _utc_now):
+        """
+        Args:
+            fetch_window: (start, end) -> reminders whose instant is in [start, end), as
+                          returned by GET /tasks/due-reminders?from=&to=
+            dispatch: ledger key -> {"outcome": "sent" | "skipped" | "failed", ...}
+            already_sent: ledger keys -> the subset already sent
+            fetch_tasks: task ids -> {id: task with due_date, status, reminder_intervals},
+                         used to re-check reminders right before they fire (optional)
+            horizon: How far ahead each refresh loads
+            catch_up: How far back each refresh loads; the largest reminder interval
+            refresh_interval: Seconds between refreshes
+            workers: Reminders dispatched concurrently when several fire together
+            task_filter: task id -> whether this engine handles it (default: all tasks)
+            now: Clock returning an aware datetime
+        """
+        self.fetch_window = fetch_window
+        self.dispatch = dispatch
+        self.already_sent = already_sent
+        self.fetch_tasks = fetch_tasks
+        self.horizon = horizon
+        self.catch_up = catch_up
+        self.refresh_interval = refresh_interval
+        self.workers = workers
+        self.task_filter = task_filter
+        self.now = now
+
+        # Heap of (remind_at, key); an entry is live only while _scheduled[key] == remind_at
+        self._heap: List[Tuple[datetime, ReminderKey]] = []
+        self._scheduled: Dict[ReminderKey, datetime] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = {"refreshes": 0, "fired": 0, "sent": 0, "skipped": 0, "failed": 0, "dropped_stale": 0}
+
+    def refresh(self) -> int:
+        """
+        Reload the reminders from now - catch_up to now + horizon, skipping those
+        already sent and those whose task is already due. Returns how many are
+        scheduled afterwards.
+        """
+        now = self.now()
+        reminders = self.fetch_window(now - self.catch_up, now + self.horizon)
+
+        window: Dict[ReminderKey, datetime] = {}
+        for reminder in reminders:
+            if self.task_filter and not self.task_filter(reminder["task_id"]):
+                continue
+            if _parse_timestamp(reminder["due_date"]) <= now:
+                # Missed while the engine was down, and too late to remind now
+                continue
+            key = reminder_key(reminder["task_id"], reminder["reminder_days"], reminder["due_date"])
+            window[key] = _parse_timestamp(reminder["remind_at"])
+        for key in self.already_sent(window):
+            del window[key]
+
+        with self._lock:
+            for key, remind_at in window.items():
+                if self._scheduled.get(key) != remind_at:
+                    heapq.heappush(self._heap, (remind_at, key))
+            # Keys missing from the window were edited away, completed or sent elsewhere
+            self._scheduled = window
+            self.stats["refreshes"] += 1
+        return len(window)
+
+    def next_instant(self) -> Optional[datetime]:
+        """When the earliest scheduled reminder is due, or None if nothing is scheduled"""
+        with self._lock:
+            while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self) -> List[ReminderKey]:
+        """Remove and return every scheduled reminder whose instant has passed."""
+        now = self.now()
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                remind_at, key = heapq.heappop(self._heap)
+                if self._scheduled.get(key) == remind_at:
+                    del self._scheduled[key]
+                    due.append(key)
+        return due
+
+    def _still_due(self, keys: List[ReminderKey]) -> List[ReminderKey]:
+        """Drop reminders whose task changed since the last refresh (one batch read)."""
+        if not self.fetch_tasks or not keys:
+            return keys
+        tasks = self.fetch_tasks(sorted({key[0] for key in keys}))
+        valid = []
+        for key in keys:
+            task_id, reminder_days, due_day = key
+            task = tasks.get(task_id)
+            intervals = task.get("reminder_intervals") if task else None
+            if intervals is None:
+                intervals = DEFAULT_REMINDER_INTERVALS
+            if (task and task.get("status") != "Completed" and task.get("due_date")
+                    and reminder_key(task_id, reminder_days, task["due_date"]) == key
+                    and reminder_days in intervals):
+                valid.append(key)
+            else:
+                self.stats["dropped_stale"] += 1
+                logger.info(f"Dropping reminder for task {task_id} ({reminder_days} days): task changed")
+        return valid
+
+    def fire_due(self) -> int:
+        """Dispatch every reminder that is due now. Returns how many were dispatched."""
+        keys = self._still_due(self.pop_due())
+        if not keys:
+            return 0
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(keys)))) as pool:
+            for key, result in zip(keys, pool.map(self._dispatch_safely, keys)):
+                self.stats[result["outcome"]] += 1
+        self.stats["fired"] += len(keys)
+        return len(keys)
+
+    def _dispatch_safely(self, key: ReminderKey) -> Dict[str, Any]:
+        try:
+            return self.dispatch(key)
+        except Exception as e:
+            logger.error(f"Error dispatching reminder for task {key[0]}: {str(e)}")
+            return {"outcome": "failed"}
+
+    def run_forever(self) -> None:
+        """Refresh and fire until stop() is called."""
+        next_refresh = self.now()
+        while not self._stop.is_set():
+            try:
+                if self.now() >= next_refresh:
+                    scheduled = self.refresh()
+                    next_refresh = self.now() + timedelta(seconds=self.refresh_interval)
+                    logger.info(f"Reminder engine refreshed: {scheduled} reminder(s) scheduled")
+                self.fire_due()
+            except Exception as e:
+                logger.error(f"Reminder engine iteration failed: {str(e)}")
+
+            # Sleep until the next reminder or refresh, whichever comes first
+            wake_at = next_refresh
+            next_instant = self.next_instant()
+            if next_instant is not None and next_instant < wake_at:
+                wake_at = next_instant
+            self._stop.wait(max(0.0, (wake_at - self.now()).total_seconds()))
+
+    def stop(self) -> None:
+        """Make run_forever return after its current iteration."""
+        self._stop.set()
@@ -0,0 +1,207 @@
+"""
+Ledger of deadline reminders already sent by the deadline reminder scheduler.
+
+The scheduler used to decide whether a reminder had gone out by downloading
+every notification of the task and looking for "{n} day" in today's texts,
+once per task per interval. The ledger records each sent reminder instead,
+keyed by (task_id, reminder_days, due_date):
+
+- the key is unique, so recording the same reminder twice is a no-op
+- due_date is part of the key, so moving a task's deadline re-arms its reminders
+- already_sent() answers "which of these keys are recorded?" for a whole run in
+  one query
+- claim() records a key before sending and returns False if it was already
+  there, so two overlapping runs never send the same reminder; mark_sent()
+  confirms it once delivered, and release() removes the claim when the send
+  fails so the next run retries it
+- a claim that is never confirmed (the run crashed mid-send) expires after
+  CLAIM_LEASE seconds and can be claimed again
+- one checkpoint row per run date records the last task fully processed, so a
+  run that crashed resumes where it stopped
+- lease rows with a TTL let scheduler replicas agree on who runs which shard
+  (utils/scheduler_lease.py)
+
+The ledger lives in Postgres, reached through the shared Supabase client, so
+every scheduler replica sees the same claims, sent reminders and leases.
+Claims and leases expire by the database clock: claim() and acquire_lease()
+are single conditional upserts in SQL functions, and already_sent() compares
+against now() in the database too. The tables and functions are defined in
+utils/reminder_ledger.sql; run it once before starting the scheduler.
+
+Usage from the scheduler:
+
+    ledger = ReminderLedger()
+    done = ledger.already_sent(keys)
+    for key in keys:
+        if key not in done and ledger.claim(key):
+            if send(key):
+                ledger.mark_sent(key)
+            else:
+                ledger.release(key)
+"""
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from supabase import Client
+
+import supabase_client
+
+LEDGER_TABLE = "reminder_ledger"
+RUNS_TABLE = "reminder_runs"
+LEASES_TABLE = "scheduler_leases"
+ACTIVE_LEASES_VIEW = "active_scheduler_leases"
+
+# Keys sent per reminders_already_sent call, to keep request bodies small
+QUERY_CHUNK_SIZE = 500
+
+# Seconds before an unconfirmed claim is considered abandoned
+CLAIM_LEASE = 600.0
+
+ReminderKey = Tuple[int, int, str]
+
+
+def reminder_key(task_id: int, reminder_days: int, due_date: Union[str, date, datetime]) -> ReminderKey:
+    """
+    Normalized ledger key; due_date may be an ISO timestamp, and only its date is kept.
+    """
+    if isinstance(due_date, datetime):
+        due_day = due_date.date()
+    elif isinstance(due_date, date):
+        due_day = due_date
+    else:
+        due_day = datetime.fromisoformat(due_date.replace('Z', '+00:00')).date()
+    return int(task_id), int(reminder_days), due_day.isoformat()
+
+
+class ReminderLedger:
+    """Postgres-backed set of sent (task_id, reminder_days, due_date) reminders."""
+
+    def __init__(self, client: Optional[Client] = None, claim_lease: float = CLAIM_LEASE):
+        self.client: Client = client or supabase_client.get_client()
+        self.claim_lease = claim_lease
+
+    def already_sent(self, keys: Iterable[ReminderKey]) -> Set[ReminderKey]:
+        """
+        The subset of `keys` that are sent or claimed by a run still within its lease.
+        """
+        keys = list(dict.fromkeys(keys))
+        sent: Set[ReminderKey] = set()
+        for start in range(0, len(keys), QUERY_CHUNK_SIZE):
+            chunk = keys[start:start + QUERY_CHUNK_SIZE]
+            rows = self.client.rpc("reminders_already_sent", {
+                "p_task_ids": [key[0] for key in chunk],
+                "p_reminder_days": [key[1] for key in chunk],
+                "p_due_dates": [key[2] for key in chunk],
+                "p_claim_lease_seconds": self.claim_lease,
+            }).execute().data or []
+            sent.update(reminder_key(row['task_id'], row['reminder_days'], row['due_date']) for row in rows)
+        return sent
+
+    def claim(self, key: ReminderKey) -> bool:
+        """
+        Claim `key` for sending. Returns False if it is already sent or claimed
+        by a run still within its lease.
+        """
+        task_id, reminder_days, due_date = key
+        res = self.client.rpc("claim_reminder", {
+            "p_task_id": task_id, "p_reminder_days": reminder_days, "p_due_date": due_date,
+            "p_claim_lease_seconds": self.claim_lease,
+        }).execute()
+        return res.data is True
+
+    def mark_sent(self, key: ReminderKey) -> None:
+        """Confirm a claimed reminder was delivered."""
+        self._match_key(self.client.table(LEDGER_TABLE).update({"status": "sent"}), key).execute()
+
+    def release(self, key: ReminderKey) -> None:
+        """
+        Forget `key`, e.g. after its send failed, so it can be claimed again. The
+        precise-time engine picks it up on its next refresh. The daily sweep only
+        selects its own day's reminders, so a reminder it releases is sent again
+        only if that day's sweep is run again.
+        """
+        self._match_key(self.client.table(LEDGER_TABLE).delete(), key).execute()
+
+    @staticmethod
+    def _match_key(query, key: ReminderKey):
+        task_id, reminder_days, due_date = key
+        return query.eq("task_id", task_id).eq("reminder_days", reminder_days).eq("due_date", due_date)
+
+    def prune(self, before: Optional[date] = None) -> int:
+        """
+        Drop entries for due dates before `before` (default today); those reminders
+        can no longer come due. Returns how many were removed.
+        """
+        before = before or datetime.now().date()
+        res = self.client.table(LEDGER_TABLE).delete().lt("due_date", before.isoformat()).execute()
+        return len(res.data or [])
+
+    def entries(self) -> List[ReminderKey]:
+        """Every recorded key, oldest due date first"""
+        rows = self.client.table(LEDGER_TABLE).select("task_id, reminder_days, due_date") \
+            .order("due_date").order("task_id").order("reminder_days").execute().data or []
+        return [reminder_key(row['task_id'], row['reminder_days'], row['due_date']) for row in rows]
+
+    @staticmethod
+    def _run_id(run_date: date, scope: str) -> str:
+        # Sharded replicas keep one run row per shard set, e.g. "2026-10-18#shards-0,2-of-4"
+        return run_date.isoformat() + (f"#{scope}" if scope else "")
+
+    @staticmethod
+    def _now() -> str:
+        # Run start/finish times are bookkeeping only; no expiry is decided from them
+        return datetime.now(timezone.utc).isoformat()
+
+    def start_run(self, run_date: date, scope: str = "") -> Optional[int]:
+        """
+        Begin the run for `run_date` (and `scope`, the shards it covers). If an
+        earlier run for the same date and scope stopped before finishing, returns
+        its checkpoint (last task id fully processed) so this run can resume after
+        it; otherwise starts afresh and returns None.
+        """
+        run_id = self._run_id(run_date, scope)
+        rows = self.client.table(RUNS_TABLE).select("checkpoint_task_id, finished_at") \
+            .eq("run_date", run_id).execute().data or []
+        if rows and rows[0]['finished_at'] is None:
+            return rows[0]['checkpoint_task_id']
+        self.client.table(RUNS_TABLE).upsert({
+            "run_date": run_id, "checkpoint_task_id": None, "started_at": self._now(),
+            "finished_at": None, "metrics": None
+        }).execute()
+        return None
+
+    def save_checkpoint(self, run_date: date, task_id: int, scope: str = "") -> None:
+        """Record that every reminder up to and including `task_id` has been processed."""
+        self.client.table(RUNS_TABLE).update({"checkpoint_task_id": task_id}) \
+            .eq("run_date", self._run_id(run_date, scope)).execute()
+
+    def finish_run(self, run_date: date, metrics: Dict[str, Any], scope: str = "") -> None:
+        """Mark the run complete and keep its metrics."""
+        self.client.table(RUNS_TABLE).update({"finished_at": self._now(), "metrics": metrics}) \
+            .eq("run_date", self._run_id(run_date, scope)).execute()
+
+    def last_run(self) -> Optional[Dict[str, Any]]:
+        """The most recent run: date, checkpoint, start/finish times and metrics"""
+        rows = self.client.table(RUNS_TABLE) \
+            .select("run_date, checkpoint_task_id, started_at, finished_at, metrics") \
+            .order("run_date", desc=True).limit(1).execute().data or []
+        return rows[0] if rows else None
+
+    def acquire_lease(self, name: str, holder: str, ttl: float) -> bool:
+        """
+        Take or renew the lease `name` for `ttl` seconds, counted by the database
+        clock. Succeeds if the lease is free, expired or already held by `holder`.
+        """
+        res = self.client.rpc("acquire_scheduler_lease", {
+            "p_name": name, "p_holder": holder, "p_ttl_seconds": ttl
+        }).execute()
+        return res.data is True
+
+    def release_lease(self, name: str, holder: str) -> None:
+        """Give up the lease `name` if `holder` holds it."""
+        self.client.table(LEASES_TABLE).delete().eq("name", name).eq("holder", holder).execute()
+
+    def lease_holders(self) -> Dict[str, str]:
+        """Current holder of each unexpired lease"""
+        rows = self.client.table(ACTIVE_LEASES_VIEW).select("name, holder").order("name").execute().data or []
+        return {row['name']: row['holder'] for row in rows}
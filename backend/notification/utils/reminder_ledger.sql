@@ -0,0 +1,81 @@
+-- Tables and functions behind utils/reminder_ledger.py (deadline reminder ledger,
+-- run checkpoints and scheduler shard leases). Run once in the Supabase SQL
+-- editor, or with psql, before starting the deadline reminder scheduler.
+--
+-- Claim expiry and lease expiry are decided with the database clock (now()),
+-- never the scheduler host's, so replicas with skewed clocks still agree on
+-- who may send. Each conditional write is a single INSERT ... ON CONFLICT
+-- statement, so two replicas racing for the same key cannot both win.
+
+CREATE TABLE IF NOT EXISTS reminder_ledger (
+    task_id BIGINT NOT NULL,
+    reminder_days INTEGER NOT NULL,
+    due_date DATE NOT NULL,
+    -- When the reminder was claimed
+    sent_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    status TEXT NOT NULL DEFAULT 'claimed' CHECK (status IN ('claimed', 'sent')),
+    PRIMARY KEY (task_id, reminder_days, due_date)
+);
+CREATE INDEX IF NOT EXISTS idx_reminder_ledger_due_date ON reminder_ledger (due_date);
+
+CREATE TABLE IF NOT EXISTS reminder_runs (
+    -- Run date, plus "#<scope>" for sharded replicas, e.g. "2026-10-18#shards-0,2-of-4"
+    run_date TEXT PRIMARY KEY,
+    checkpoint_task_id BIGINT,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ,
+    metrics JSONB
+);
+
+CREATE TABLE IF NOT EXISTS scheduler_leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+-- Leases that have not expired yet
+CREATE OR REPLACE VIEW active_scheduler_leases AS
+    SELECT name, holder, expires_at FROM scheduler_leases WHERE expires_at > now();
+
+-- Claim a reminder before sending it. True when the caller now holds the claim:
+-- the key was free, or its claim was never confirmed and is older than
+-- p_claim_lease_seconds.
+CREATE OR REPLACE FUNCTION claim_reminder(
+    p_task_id BIGINT, p_reminder_days INTEGER, p_due_date DATE, p_claim_lease_seconds DOUBLE PRECISION
+) RETURNS BOOLEAN LANGUAGE sql AS $$
+    WITH claimed AS (
+        INSERT INTO reminder_ledger AS l (task_id, reminder_days, due_date, sent_at, status)
+        VALUES (p_task_id, p_reminder_days, p_due_date, now(), 'claimed')
+        ON CONFLICT (task_id, reminder_days, due_date) DO UPDATE SET sent_at = now()
+        WHERE l.status = 'claimed' AND l.sent_at <= now() - make_interval(secs => p_claim_lease_seconds)
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM claimed);
+$$;
+
+-- The keys among the given (task_id, reminder_days, due_date) triples that are
+-- sent, or claimed less than p_claim_lease_seconds ago.
+CREATE OR REPLACE FUNCTION reminders_already_sent(
+    p_task_ids BIGINT[], p_reminder_days INTEGER[], p_due_dates DATE[], p_claim_lease_seconds DOUBLE PRECISION
+) RETURNS TABLE (task_id BIGINT, reminder_days INTEGER, due_date DATE) LANGUAGE sql STABLE AS $$
+    SELECT l.task_id, l.reminder_days, l.due_date
+    FROM unnest(p_task_ids, p_reminder_days, p_due_dates) AS k (task_id, reminder_days, due_date)
+    JOIN reminder_ledger l
+        ON l.task_id = k.task_id AND l.reminder_days = k.reminder_days AND l.due_date = k.due_date
+    WHERE l.status = 'sent' OR l.sent_at > now() - make_interval(secs => p_claim_lease_seconds);
+$$;
+
+-- Take or renew the lease p_name for p_ttl_seconds. True when it is free,
+-- expired, or already held by p_holder.
+CREATE OR REPLACE FUNCTION acquire_scheduler_lease(
+    p_name TEXT, p_holder TEXT, p_ttl_seconds DOUBLE PRECISION
+) RETURNS BOOLEAN LANGUAGE sql AS $$
+    WITH acquired AS (
+        INSERT INTO scheduler_leases AS s (name, holder, expires_at)
+        VALUES (p_name, p_holder, now() + make_interval(secs => p_ttl_seconds))
+        ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+        WHERE s.holder = excluded.holder OR s.expires_at <= now()
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM acquired);
+$$;
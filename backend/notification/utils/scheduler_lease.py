@@ -0,0 +1,119 @@
+"""
+Shard leases for running several deadline reminder scheduler replicas.
+
+Without coordination, two scheduler processes would both select and send the
+same reminders. Task ids are split into REMINDER_SHARDS contiguous ranges of a
+32-bit hash, and each range is owned by whichever replica holds its lease, a
+row with an expiry in the reminder ledger's Postgres tables
+(utils/reminder_ledger.py):
+
+- with the default of one shard this is plain leader election: one replica
+  sends, the others stand by and take over when its lease expires
+- with more shards, replicas split the work; REMINDER_MAX_SHARDS caps how many
+  shards one replica takes so the load spreads (set it above
+  shards / replicas so survivors absorb the shards of a replica that dies)
+- leases are renewed every ttl / 3 seconds; a replica that stops renewing loses
+  its shards after REMINDER_LEASE_TTL seconds, measured by the database clock,
+  so clock skew between replica hosts does not matter
+- the ledger's per-reminder claims remain the last line of defence, so even a
+  lease handover in the middle of a send does not duplicate a reminder
+
+Replicas can run on any host that reaches the Supabase project.
+
+Environment variables:
+    REMINDER_SHARDS      Hash ranges task ids are split into (default 1)
+    REMINDER_MAX_SHARDS  Most shards one replica holds (default: all of them)
+    REMINDER_LEASE_TTL   Seconds a lease lasts without renewal (default 60)
+"""
+import logging
+import os
+import socket
+import threading
+import uuid
+import zlib
+from typing import Optional, Set
+
+from utils.reminder_ledger import ReminderLedger
+
+SHARDS = int(os.getenv("REMINDER_SHARDS", "1"))
+MAX_SHARDS = int(os.getenv("REMINDER_MAX_SHARDS", "0")) or SHARDS
+LEASE_TTL = float(os.getenv("REMINDER_LEASE_TTL", "60"))
+
+logger = logging.getLogger(__name__)
+
+
+def shard_of(task_id: int, shards: int) -> int:
+    """Shard of a task: the hash range its crc32 falls in."""
+    return (zlib.crc32(str(task_id).encode()) * shards) >> 32
+
+
+class ShardLeases:
+    """The shards this replica currently holds, kept alive by a renewal thread."""
+
+    def __init__(self, ledger: ReminderLedger, shards: int = SHARDS, max_shards: int = MAX_SHARDS,
+                 ttl: float = LEASE_TTL, holder: Optional[str] = None):
+        self.ledger = ledger
+        self.shards = max(1, shards)
+        self.max_shards = max(1, min(max_shards, self.shards))
+        self.ttl = ttl
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.owned: Set[int] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _lease_name(self, shard: int) -> str:
+        return f"deadline-reminders/{shard}-of-{self.shards}"
+
+    def renew(self) -> Set[int]:
+        """
+        Renew the shards held and take free ones up to max_shards. Returns the
+        shards held afterwards.
+        """
+        owned = {shard for shard in self.owned
+                 if self.ledger.acquire_lease(self._lease_name(shard), self.holder, self.ttl)}
+        # Start the scan at a holder-specific offset so replicas do not all race for shard 0
+        offset = zlib.crc32(self.holder.encode()) % self.shards
+        for step in range(self.shards):
+            if len(owned) >= self.max_shards:
+                break
+            shard = (offset + step) % self.shards
+            if shard not in owned and self.ledger.acquire_lease(self._lease_name(shard), self.holder, self.ttl):
+                owned.add(shard)
+        if owned != self.owned:
+            logger.info(f"Scheduler {self.holder} now holds shards {sorted(owned)} of {self.shards}")
+        self.owned = owned
+        return set(owned)
+
+    def owns(self, task_id: int) -> bool:
+        """Whether this replica should send the reminders of `task_id`"""
+        return shard_of(task_id, self.shards) in self.owned
+
+    def scope(self) -> str:
+        """Run scope for the ledger's checkpoints, e.g. "shards-0,2-of-4" ("" when unsharded)"""
+        if self.shards == 1:
+            return ""
+        return f"shards-{','.join(str(shard) for shard in sorted(self.owned))}-of-{self.shards}"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.renew()
+            except Exception as e:
+                logger.error(f"Lease renewal failed: {str(e)}")
+
+    def start(self) -> Set[int]:
+        """Take the initial leases and keep renewing them on a background thread."""
+        owned = self.renew()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="scheduler-leases", daemon=True)
+        self._thread.start()
+        return owned
+
+    def stop(self) -> None:
+        """Stop renewing and hand the shards back immediately."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(self.ttl)
+        for shard in self.owned:
+            self.ledger.release_lease(self._lease_name(shard), self.holder)
+        self.owned = set()
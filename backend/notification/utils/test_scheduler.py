@@ -15,8 +15,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from deadline_reminder_scheduler import (
     test_scheduler_connection,
     process_deadline_reminders,
-    get_tasks_with_upcoming_deadlines,
-    calculate_days_until_due,
+    get_due_reminders,
     send_deadline_reminder
 )
 
@@ -39,35 +38,22 @@ def main():
         print("      - Supabase credentials are valid")
         return
     
-    # Test 2: Get tasks
-    print("2.  Fetching tasks with upcoming deadlines...")
-    tasks = get_tasks_with_upcoming_deadlines(max_days_ahead=7)
-    print(f"   Found {len(tasks)} tasks with upcoming deadlines\n")
+    # Test 2: Get today's reminders
+    print("2.  Fetching the reminders due today...")
+    today = datetime.now().date()
+    reminders = get_due_reminders(today)
+    print(f"   Found {len(reminders)} reminders due today\n")
     
-    if tasks:
-        print("   Task details:")
-        for task in tasks:
-            task_id = task.get("id")
-            task_name = task.get("task_name", "Unknown")
-            due_date = task.get("due_date")
-            status = task.get("status")
-            reminder_intervals = task.get("reminder_intervals", [7, 3, 1])
-            
-            days_until = calculate_days_until_due(due_date)
-            
-            print(f"   - Task {task_id}: '{task_name}'")
-            print(f"     Status: {status}")
-            print(f"     Due: {due_date}")
-            print(f"     Days until due: {days_until}")
-            print(f"     Reminder intervals: {reminder_intervals}")
-            
-            # Check if reminder should be sent
-            should_send = days_until in reminder_intervals
-            print(f"     Should send reminder today: {'YES' if should_send else 'NO'}")
+    if reminders:
+        print("   Reminder details:")
+        for reminder in reminders:
+            print(f"   - Task {reminder.get('task_id')}: '{reminder.get('task_name', 'Unknown')}'")
+            print(f"     Due: {reminder.get('due_date')}")
+            print(f"     Reminder: {reminder.get('reminder_days')} days before due")
             print()
     else:
-        print("   No tasks found. This is normal if:")
-        print("      - No tasks have due dates in the next 7 days")
+        print("   No reminders found. This is normal if:")
+        print("      - No task is due exactly one of its reminder intervals from today")
         print("      - All tasks with upcoming due dates are completed")
         print()
     
@@ -0,0 +1,253 @@
+"""
+Durable outbox for notification triggers sent to the notification microservice.
+
+Task, comment and project writes used to POST to the notification service in
+the request thread, so every create/update waited on the notification service
+and, behind it, on the email provider. Writers now append the trigger to a local
+SQLite outbox and return immediately; a background dispatcher thread drains it:
+
+- one row per trigger (path + JSON payload), written before the request returns
+- delivered with service_client.post; the row is deleted on a 2xx response
+- connection errors, 5xx, 408 and 429 are retried with exponential backoff
+- other 4xx responses, and rows that exhaust their attempts, are kept as
+  dead letters (status 'dead') for inspection or requeue_dead()
+- rows are claimed with a lease, so several processes sharing one file never
+  send the same trigger concurrently, and a crash mid-send is retried
+
+Usage from a microservice:
+
+    import notification_outbox
+    notification_outbox.enqueue("/notifications/triggers/task-collaborator-addition", payload)
+
+Environment variables:
+    NOTIFICATION_OUTBOX_PATH          SQLite file (default notification_outbox.db next to this module,
+                                      shared by every service started from this checkout)
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS  Attempts before a trigger is dead-lettered (default 5)
+    NOTIFICATION_OUTBOX_RETRY_BASE    First retry delay in seconds, doubled per attempt (default 2)
+    NOTIFICATION_OUTBOX_POLL_INTERVAL Seconds between polls when the outbox is idle (default 1)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import service_client
+
+# Not relative to the working directory, so a service started from another directory
+# still finds the triggers it queued before a restart
+OUTBOX_PATH = os.getenv("NOTIFICATION_OUTBOX_PATH",
+                        os.path.join(os.path.dirname(os.path.abspath(__file__)), "notification_outbox.db"))
+MAX_ATTEMPTS = int(os.getenv("NOTIFICATION_OUTBOX_MAX_ATTEMPTS", "5"))
+RETRY_BASE = float(os.getenv("NOTIFICATION_OUTBOX_RETRY_BASE", "2"))
+POLL_INTERVAL = float(os.getenv("NOTIFICATION_OUTBOX_POLL_INTERVAL", "1"))
+
+# Longest wait between retries, and how long a claimed row is hidden from other dispatchers
+MAX_RETRY_DELAY = 300.0
+CLAIM_LEASE = 60.0
+BATCH_SIZE = 50
+
+# Responses worth retrying; any other non-2xx status is dead-lettered immediately
+RETRYABLE_STATUSES = {408, 429}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox (status, next_attempt_at);
+"""
+
+
+class NotificationOutbox:
+    """SQLite-backed queue of notification triggers plus its dispatcher thread."""
+
+    def __init__(self, path: str = OUTBOX_PATH, max_attempts: int = MAX_ATTEMPTS,
+                 retry_base: float = RETRY_BASE, poll_interval: float = POLL_INTERVAL):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        with self._connect() as conn:
+            # WAL lets writers append while the dispatcher reads; the mode persists in the file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation keeps the outbox safe to use from any thread
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, path: str, payload: Dict[str, Any]) -> int:
+        """
+        Durably record a trigger and wake the dispatcher. Returns the outbox row id.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO notification_outbox (path, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                (path, json.dumps(payload, default=str), now, now),
+            )
+            row_id = cur.lastrowid
+        self._wakeup.set()
+        return row_id
+
+    def _claim_due(self, limit: int) -> List[sqlite3.Row]:
+        """Claim up to `limit` due rows by pushing their next_attempt_at out by CLAIM_LEASE."""
+        now = time.time()
+        claimed = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM notification_outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            for row in rows:
+                cur = conn.execute(
+                    "UPDATE notification_outbox SET next_attempt_at = ? WHERE id = ? AND next_attempt_at = ?",
+                    (now + CLAIM_LEASE, row["id"], row["next_attempt_at"]),
+                )
+                if cur.rowcount == 1:
+                    claimed.append(row)
+        return claimed
+
+    def _deliver(self, row: sqlite3.Row) -> None:
+        attempts = row["attempts"] + 1
+        retryable = True
+        try:
+            response = service_client.post("notification", row["path"], json=json.loads(row["payload"]))
+            if 200 <= response.status_code < 300:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM notification_outbox WHERE id = ?", (row["id"],))
+                return
+            error = f"HTTP {response.status_code}: {response.text[:500]}"
+            retryable = response.status_code >= 500 or response.status_code in RETRYABLE_STATUSES
+        except Exception as e:
+            error = str(e)
+
+        with self._connect() as conn:
+            if retryable and attempts < self.max_attempts:
+                delay = min(self.retry_base * (2 ** (attempts - 1)), MAX_RETRY_DELAY)
+                conn.execute(
+                    "UPDATE notification_outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (attempts, time.time() + delay, error, row["id"]),
+                )
+            else:
+                print(f"Warning: Notification trigger {row['path']} dead-lettered after {attempts} attempt(s): {error}")
+                conn.execute(
+                    "UPDATE notification_outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                    (attempts, error, row["id"]),
+                )
+
+    def dispatch_pending(self, limit: int = BATCH_SIZE) -> int:
+        """
+        Deliver the triggers that are currently due. Returns how many were attempted.
+        """
+        rows = self._claim_due(limit)
+        for row in rows:
+            self._deliver(row)
+        return len(rows)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                attempted = self.dispatch_pending()
+            except Exception as e:
+                print(f"Warning: Notification outbox dispatch failed: {e}")
+                attempted = 0
+            if attempted < BATCH_SIZE:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the background dispatcher thread if it is not already running."""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the dispatcher thread; pending rows stay in the outbox."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Row counts per status"""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM notification_outbox GROUP BY status").fetchall()
+        counts = {"pending": 0, "dead": 0}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Dead-lettered triggers, oldest first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, path, payload, attempts, last_error, created_at FROM notification_outbox "
+                "WHERE status = 'dead' ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(row, payload=json.loads(row["payload"])) for row in rows]
+
+    def requeue_dead(self) -> int:
+        """Move every dead letter back to pending with a fresh attempt budget."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE notification_outbox SET status = 'pending', attempts = 0, next_attempt_at = ? "
+                "WHERE status = 'dead'",
+                (time.time(),),
+            )
+        self._wakeup.set()
+        return cur.rowcount
+
+
+_outbox: Optional[NotificationOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> NotificationOutbox:
+    """
+    Process-wide outbox, created on first use.
+    """
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                _outbox = NotificationOutbox()
+    return _outbox
+
+
+def enqueue(path: str, payload: Dict[str, Any]) -> int:
+    """Queue a POST of `payload` to `path` on the notification service; the dispatcher sends it."""
+    outbox = get_outbox()
+    outbox.start()
+    return outbox.enqueue(path, payload)
+
+
+def start_dispatcher() -> None:
+    """Start draining the outbox, e.g. at app startup to pick up rows left by a previous run."""
+    get_outbox().start()
@@ -1,8 +1,13 @@
 import os
+import sys
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Make the shared backend modules (supabase_client, service_client, notification_outbox)
+# importable for this service's repos and services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 load_dotenv()
 
 def create_app():
@@ -13,6 +18,10 @@ def create_app():
     from controllers.project_controller import project_bp
     app.register_blueprint(project_bp)
 
+    # Deliver notification triggers left in the outbox by a previous run
+    import notification_outbox  # importable once the services have set up the backend path
+    notification_outbox.start_dispatcher()
+
     return app
 
 if __name__ == "__main__":
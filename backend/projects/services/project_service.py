@@ -3,6 +3,9 @@ import requests
 from models.project import Project
 from repo.supa_project_repo import SupabaseProjectRepo
 
+import service_client
+import notification_outbox
+
 class ProjectService:
     def __init__(self, repo: Optional[SupabaseProjectRepo] = None):
         self.repo = repo or SupabaseProjectRepo()
@@ -48,7 +51,7 @@ class ProjectService:
             creator_name = "System"
             if owner_id:
                 try:
-                    response = requests.get(f"http://127.0.0.1:5003/users/{owner_id}")
+                    response = service_client.get("users", f"/users/{owner_id}")
                     if response.status_code == 200:
                         user_data = response.json()
                         creator_name = user_data.get("data", {}).get("name", "System")
@@ -59,15 +62,12 @@ class ProjectService:
             collaborator_ids = [collab_id for collab_id in collaborators if collab_id != owner_id]
             
             if collaborator_ids:
-                response = requests.post("http://127.0.0.1:5006/notifications/triggers/project-collaborator-addition", 
-                                       json={
-                                           "project_id": project_id,
-                                           "collaborator_ids": collaborator_ids,
-                                           "project_name": project_name,
-                                           "creator_name": creator_name
-                                       })
-                if response.status_code not in [200, 201]:
-                    print(f"Warning: Failed to send project collaborator notifications: {response.status_code}")
+                notification_outbox.enqueue("/notifications/triggers/project-collaborator-addition", {
+                    "project_id": project_id,
+                    "collaborator_ids": collaborator_ids,
+                    "project_name": project_name,
+                    "creator_name": creator_name
+                })
         except Exception as e:
             print(f"Warning: Failed to send project collaborator notifications: {e}")
 
@@ -167,7 +167,7 @@ class ProjectService:
             # Try to get updater from request context or use owner as fallback
             if owner_id:
                 try:
-                    response = requests.get(f"http://127.0.0.1:5003/users/{owner_id}")
+                    response = service_client.get("users", f"/users/{owner_id}")
                     if response.status_code == 200:
                         user_data = response.json()
                         updater_name = user_data.get("data", {}).get("name", "System")
@@ -177,15 +177,12 @@ class ProjectService:
             # Send notifications to newly added collaborators
             collaborator_ids = list(newly_added_collaborators)
             if collaborator_ids:
-                response = requests.post("http://127.0.0.1:5006/notifications/triggers/project-collaborator-addition", 
-                                       json={
-                                           "project_id": project_id,
-                                           "collaborator_ids": collaborator_ids,
-                                           "project_name": project_name,
-                                           "creator_name": updater_name
-                                       })
-                if response.status_code not in [200, 201]:
-                    print(f"Warning: Failed to send project collaborator addition notifications: {response.status_code}")
+                notification_outbox.enqueue("/notifications/triggers/project-collaborator-addition", {
+                    "project_id": project_id,
+                    "collaborator_ids": collaborator_ids,
+                    "project_name": project_name,
+                    "creator_name": updater_name
+                })
         except Exception as e:
             print(f"Warning: Failed to send project collaborator addition notifications: {e}")
 
@@ -213,7 +210,7 @@ class ProjectService:
 
         # Get task details from task microservice
         try:
-            task_response = requests.get(f"http://127.0.0.1:5002/tasks/{task_id}")
+            task_response = service_client.get("tasks", f"/tasks/{task_id}")
             if task_response.status_code != 200:
                 return {"status": 404, "message": f"Task with ID {task_id} not found in task microservice"}
             
@@ -265,7 +262,7 @@ class ProjectService:
 
         # Use bulk update to set project_id for task and all subtasks
         try:
-            bulk_update_response = requests.post("http://127.0.0.1:5002/tasks/update-project/bulk", 
+            bulk_update_response = service_client.post("tasks", "/tasks/update-project/bulk", 
                 json={
                     "task_ids": all_task_ids,
                     "project_id": project_id
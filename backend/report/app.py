@@ -1,8 +1,13 @@
 import os
+import sys
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Make the shared backend modules (supabase_client, service_client, notification_outbox)
+# importable for this service's repos and services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 load_dotenv()
 
 def create_app():
@@ -1,20 +1,29 @@
 import os
-import requests
+import threading
+from concurrent.futures import Future
 from typing import Optional, Dict, Any, List
 
+import service_client
+
+# Task columns read by the report service; keeps attachments/description blobs off the wire
+REPORT_TASK_FIELDS = "id,task_name,status,priority,owner_id,collaborators,project_id,created_at,due_date,completed_at"
+TASK_PAGE_SIZE = 200
+# Max userids per bulk lookup on the users service (its GET /users limit)
+USER_BATCH_SIZE = 500
+# Result of a cache entry whose bulk lookup failed; waiters fetch the key themselves
+_NOT_FETCHED = object()
+
 class ReportRepo:
-    def __init__(self):
-        # Microservice URLs - these should be environment variables in production
-        self.users_service_url = os.getenv("USERS_SERVICE_URL", "http://localhost:5003")
-        self.tasks_service_url = os.getenv("TASKS_SERVICE_URL", "http://localhost:5002")
-        self.projects_service_url = os.getenv("PROJECTS_SERVICE_URL", "http://localhost:5001")
-        self.team_service_url = os.getenv("TEAM_SERVICE_URL", "http://localhost:5004")
-        self.dept_service_url = os.getenv("DEPT_SERVICE_URL", "http://localhost:5005")
+    """Reads report inputs from the other microservices via the shared service_client."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        # Per-call timeout in seconds; None uses the service_client default
+        self.timeout = timeout
 
     def get_user_info(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user information from users microservice"""
         try:
-            response = requests.get(f"{self.users_service_url}/users/{user_id}")
+            response = service_client.get("users", f"/users/{user_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data')
             return None
@@ -22,6 +31,28 @@ class ReportRepo:
             print(f"Error fetching user info: {e}")
             return None
 
+    def get_users_info(self, user_ids: List[int]) -> Optional[Dict[int, Dict[str, Any]]]:
+        """Get many users from the users microservice in one request per USER_BATCH_SIZE ids
+
+        Returns {userid: user}; unknown userids are absent. Returns None if the
+        lookup failed, so callers can fall back to get_user_info.
+        """
+        unique_ids = list(dict.fromkeys(user_ids))
+        users = {}
+        try:
+            for start in range(0, len(unique_ids), USER_BATCH_SIZE):
+                chunk = unique_ids[start:start + USER_BATCH_SIZE]
+                response = service_client.get("users", "/users", params={"ids": ",".join(str(i) for i in chunk)},
+                                              timeout=self.timeout)
+                if response.status_code != 200:
+                    return None
+                for user in response.json().get('data', []):
+                    users[user.get('userid')] = user
+            return users
+        except Exception as e:
+            print(f"Error fetching users info: {e}")
+            return None
+
     def get_user_tasks(self, user_id: int, start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
         """Get all tasks for a user from tasks microservice with optional date filtering
         
@@ -29,42 +60,55 @@ class ReportRepo:
             user_id: ID of the user
             start_date: Start date for filtering (YYYY-MM-DD format)
             end_date: End date for filtering (YYYY-MM-DD format)
+        
+        Raises:
+            RuntimeError: if any page cannot be fetched; an empty or partial list
+            would make the report look complete while undercounting
         """
-        try:
-            url = f"{self.tasks_service_url}/tasks/user-task/{user_id}"
-            params = {}
-            if start_date:
-                params['start_date'] = start_date
-            if end_date:
-                params['end_date'] = end_date
-                
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                tasks = response.json().get('data', [])
-                
-                # If microservice doesn't support date filtering, filter here
-                if (start_date or end_date) and tasks:
-                    filtered_tasks = []
-                    for task in tasks:
-                        task_date = task.get('created_at', '')
-                        if task_date:
-                            # Extract date part (YYYY-MM-DD)
-                            task_date = task_date[:10]
-                            
-                            # Check if task falls within date range
-                            if start_date and task_date < start_date:
-                                continue
-                            if end_date and task_date > end_date:
-                                continue
-                                
-                        filtered_tasks.append(task)
-                    return filtered_tasks
-                
-                return tasks
-            return []
-        except Exception as e:
-            print(f"Error fetching user tasks: {e}")
-            return []
+        params = {'fields': REPORT_TASK_FIELDS, 'limit': TASK_PAGE_SIZE}
+        if start_date:
+            params['start_date'] = start_date
+        if end_date:
+            params['end_date'] = end_date
+            
+        # Walk the cursor pages, pulling only the columns reports use
+        tasks = []
+        while True:
+            try:
+                response = service_client.get("tasks", f"/tasks/user-task/{user_id}", params=dict(params), timeout=self.timeout)
+            except Exception as e:
+                raise RuntimeError(f"Could not fetch tasks for user {user_id}: {e}") from e
+            if response.status_code == 404 and 'cursor' not in params:
+                # The user has no tasks
+                return []
+            if response.status_code != 200:
+                raise RuntimeError(f"Could not fetch tasks for user {user_id}: tasks service returned "
+                                   f"HTTP {response.status_code} after {len(tasks)} task(s)")
+            body = response.json()
+            tasks.extend(body.get('data', []))
+            if not body.get('next_cursor'):
+                break
+            params['cursor'] = body['next_cursor']
+
+        # If microservice doesn't support date filtering, filter here
+        if (start_date or end_date) and tasks:
+            filtered_tasks = []
+            for task in tasks:
+                task_date = task.get('created_at', '')
+                if task_date:
+                    # Extract date part (YYYY-MM-DD)
+                    task_date = task_date[:10]
+                    
+                    # Check if task falls within date range
+                    if start_date and task_date < start_date:
+                        continue
+                    if end_date and task_date > end_date:
+                        continue
+                        
+                filtered_tasks.append(task)
+            return filtered_tasks
+        
+        return tasks
 
     def get_user_projects(self, user_id: int, start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
         """Get all projects for a user from projects microservice with optional date filtering
@@ -75,14 +119,13 @@ class ReportRepo:
             end_date: End date for filtering (YYYY-MM-DD format)
         """
         try:
-            url = f"{self.projects_service_url}/projects/user/{user_id}"
             params = {}
             if start_date:
                 params['start_date'] = start_date
             if end_date:
                 params['end_date'] = end_date
                 
-            response = requests.get(url, params=params)
+            response = service_client.get("projects", f"/projects/user/{user_id}", params=params, timeout=self.timeout)
             if response.status_code == 200:
                 projects = response.json().get('data', [])
                 
@@ -113,7 +156,7 @@ class ReportRepo:
     def get_project_tasks(self, project_id: int) -> List[Dict[str, Any]]:
         """Get all tasks for a project from tasks microservice"""
         try:
-            response = requests.get(f"{self.tasks_service_url}/tasks/project/{project_id}")
+            response = service_client.get("tasks", f"/tasks/project/{project_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data', [])
             return []
@@ -124,7 +167,7 @@ class ReportRepo:
     def get_project_info(self, project_id: int) -> Optional[Dict[str, Any]]:
         """Get project information from projects microservice"""
         try:
-            response = requests.get(f"{self.projects_service_url}/projects/{project_id}")
+            response = service_client.get("projects", f"/projects/{project_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data')
             return None
@@ -135,7 +178,7 @@ class ReportRepo:
     def get_team_members(self, team_id: int) -> List[Dict[str, Any]]:
         """Get all team members from users microservice"""
         try:
-            response = requests.get(f"{self.users_service_url}/users/team/{team_id}")
+            response = service_client.get("users", f"/users/team/{team_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data', [])
             return []
@@ -146,7 +189,7 @@ class ReportRepo:
     def get_dept_members(self, dept_id: int) -> List[Dict[str, Any]]:
         """Get all department members from users microservice"""
         try:
-            response = requests.get(f"{self.users_service_url}/users/department/{dept_id}")
+            response = service_client.get("users", f"/users/department/{dept_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data', [])
             return []
@@ -157,7 +200,7 @@ class ReportRepo:
     def get_team_info(self, team_id: int) -> Optional[Dict[str, Any]]:
         """Get team information from team microservice"""
         try:
-            response = requests.get(f"{self.team_service_url}/teams/{team_id}")
+            response = service_client.get("team", f"/teams/{team_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data')
             return None
@@ -168,7 +211,7 @@ class ReportRepo:
     def get_dept_info(self, dept_id: int) -> Optional[Dict[str, Any]]:
         """Get department information from dept microservice"""
         try:
-            response = requests.get(f"{self.dept_service_url}/departments/{dept_id}")
+            response = service_client.get("dept", f"/departments/{dept_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data')
             return None
@@ -179,7 +222,7 @@ class ReportRepo:
     def get_tasks_by_team(self, team_id: int) -> List[Dict[str, Any]]:
         """Get all tasks for team members from tasks microservice"""
         try:
-            response = requests.get(f"{self.tasks_service_url}/tasks/team/{team_id}")
+            response = service_client.get("tasks", f"/tasks/team/{team_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data', [])
             return []
@@ -190,7 +233,7 @@ class ReportRepo:
     def get_tasks_by_department(self, dept_id: int) -> List[Dict[str, Any]]:
         """Get all tasks for department members from tasks microservice"""
         try:
-            response = requests.get(f"{self.tasks_service_url}/tasks/department/{dept_id}")
+            response = service_client.get("tasks", f"/tasks/department/{dept_id}", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data', [])
             return []
@@ -201,7 +244,7 @@ class ReportRepo:
     def get_all_departments(self) -> List[Dict[str, Any]]:
         """Get all departments from dept microservice"""
         try:
-            response = requests.get(f"{self.dept_service_url}/departments")
+            response = service_client.get("dept", "/departments", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data', [])
             return []
@@ -212,7 +255,7 @@ class ReportRepo:
     def get_all_teams(self) -> List[Dict[str, Any]]:
         """Get all teams from team microservice"""
         try:
-            response = requests.get(f"{self.team_service_url}/teams")
+            response = service_client.get("team", "/teams", timeout=self.timeout)
             if response.status_code == 200:
                 return response.json().get('data', [])
             return []
@@ -222,3 +265,101 @@ class ReportRepo:
         
     
 
+
+
+class CachedReportRepo:
+    """Per-report memoizing wrapper around ReportRepo.
+
+    A report looks up the same users, teams and projects over and over (every
+    task row resolves its owner and collaborators). Wrapping the repo for the
+    duration of one report makes each distinct lookup hit the upstream service
+    at most once. Methods that are not memoized are delegated unchanged.
+
+    The cache holds one Future per key. The lock only guards the dict: the
+    first caller of a key fetches it with the lock released, and concurrent
+    callers of the same key wait on its Future, so lookups of different keys
+    (e.g. the concurrent member fetches) never queue behind each other.
+    """
+
+    # Lookups memoized per report, keyed by their positional arguments
+    CACHED_METHODS = (
+        'get_user_info', 'get_project_tasks', 'get_project_info',
+        'get_team_info', 'get_dept_info', 'get_team_members', 'get_dept_members',
+    )
+
+    def __init__(self, repo: ReportRepo):
+        self._repo = repo
+        self._cache: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._repo, name)
+        if name not in self.CACHED_METHODS:
+            return attr
+
+        def cached(*args):
+            return self._memoized((name,) + args, lambda: attr(*args))
+
+        return cached
+
+    def _memoized(self, key: tuple, fetch):
+        while True:
+            with self._lock:
+                future = self._cache.get(key)
+                owner = future is None
+                if owner:
+                    future = self._cache[key] = Future()
+                    self.misses += 1
+
+            if owner:
+                try:
+                    future.set_result(fetch())
+                except Exception as e:
+                    # Failures are not cached: the next lookup tries again
+                    with self._lock:
+                        self._cache.pop(key, None)
+                    future.set_exception(e)
+                return future.result()
+
+            value = future.result()
+            if value is not _NOT_FETCHED:
+                with self._lock:
+                    self.hits += 1
+                return value
+            # A failed bulk lookup gave the key back; fetch it on its own
+
+    def prime_users(self, user_ids: List[int]) -> None:
+        """Resolve every not-yet-cached user in one bulk lookup
+
+        Later get_user_info calls for these ids are served from the cache. If
+        the bulk lookup fails nothing is cached and get_user_info falls back to
+        one request per user.
+        """
+        with self._lock:
+            pending = [uid for uid in dict.fromkeys(user_ids)
+                       if uid is not None and ('get_user_info', uid) not in self._cache]
+            if not pending:
+                return
+            futures = {uid: Future() for uid in pending}
+            for uid, future in futures.items():
+                self._cache[('get_user_info', uid)] = future
+            self.misses += 1
+
+        users = None
+        try:
+            users = self._repo.get_users_info(pending)
+        finally:
+            with self._lock:
+                for uid, future in futures.items():
+                    if users is None:
+                        del self._cache[('get_user_info', uid)]
+                        future.set_result(_NOT_FETCHED)
+                    else:
+                        future.set_result(users.get(uid))
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for report metadata"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
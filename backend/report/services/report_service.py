@@ -1,16 +1,86 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import functools
 from datetime import datetime, timedelta
 from dateutil import parser as dateparser
+import os
 import statistics
 
 from models.report import ReportData, TeamReportData
-from repo.report_repo import ReportRepo
+from repo.report_repo import ReportRepo, CachedReportRepo
 
+# Max concurrent member fetches while building team/department reports
+REPORT_FETCH_WORKERS = int(os.getenv("REPORT_FETCH_WORKERS", "8"))
+# Timeout in seconds for each upstream call made while building a report
+REPORT_FETCH_TIMEOUT = float(os.getenv("REPORT_FETCH_TIMEOUT", "10"))
 
-class ReportService:
-    def __init__(self, repo: Optional[ReportRepo] = None):
-        self.repo = repo or ReportRepo()
 
+def _report_scoped(method):
+    """Run a report generator against a fresh CachedReportRepo.
+
+    The method runs on a shallow copy of the service, so concurrent requests
+    never share a cache. The cache's hit/miss counters are added to the result
+    under metadata.lookup_cache.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        scoped = copy.copy(self)
+        scoped.repo = CachedReportRepo(self.repo)
+        result = method(scoped, *args, **kwargs)
+        if isinstance(result, dict):
+            result.setdefault("metadata", {})["lookup_cache"] = scoped.repo.stats()
+        return result
+    return wrapper
+
+
+class ReportService:
+    def __init__(self, repo: Optional[ReportRepo] = None, max_workers: int = REPORT_FETCH_WORKERS,
+                 fetch_timeout: float = REPORT_FETCH_TIMEOUT):
+        self.repo = repo or ReportRepo(timeout=fetch_timeout)
+        self.max_workers = max_workers
+
+    def _prefetch_member_data(self, user_ids: List[int], start_date: str = None,
+                              end_date: str = None) -> Dict[int, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """Fetch tasks and projects for many users concurrently with a bounded thread pool.
+
+        Returns {user_id: (tasks, projects)} with None results normalised to [].
+        Results are collected in user_ids order, so the first failing member
+        raises exactly as the sequential loop did.
+        """
+        if not user_ids:
+            return {}
+
+        workers = max(1, min(self.max_workers, len(user_ids) * 2))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (user_id,
+                 pool.submit(self.repo.get_user_tasks, user_id, start_date, end_date),
+                 pool.submit(self.repo.get_user_projects, user_id, start_date, end_date))
+                for user_id in user_ids
+            ]
+
+            member_data = {}
+            for user_id, tasks_future, projects_future in futures:
+                member_data[user_id] = (tasks_future.result() or [], projects_future.result() or [])
+            return member_data
+
+    def _prime_task_users(self, tasks: List[Dict[str, Any]]) -> None:
+        """Resolve the owners and collaborators of tasks in one bulk lookup, when the repo supports it"""
+        prime_users = getattr(self.repo, 'prime_users', None)
+        if prime_users is None:
+            return
+        user_ids = []
+        for task in tasks:
+            if task.get('owner_id'):
+                user_ids.append(task['owner_id'])
+            collaborators = task.get('collaborators') or []
+            if isinstance(collaborators, list):
+                user_ids.extend(collaborators)
+        if user_ids:
+            prime_users(user_ids)
+
+    @_report_scoped
     def generate_personal_report(self, user_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
         """Generate personal report for staff showing their own stats
         
@@ -51,6 +121,7 @@ class ReportService:
         except Exception as e:
             return {"status": 500, "message": f"Error generating personal report: {str(e)}"}
 
+    @_report_scoped
     def generate_team_report(self, manager_user_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
         """Generate team report for managers showing their team members' stats
         
@@ -96,33 +167,22 @@ class ReportService:
 
             # Generate personal reports for all team members INCLUDING the manager
             member_reports = []
+            other_members = [member for member in team_members if member['userid'] != manager_user_id]
             
-            # First, add the manager's own report
-            manager_tasks = self.repo.get_user_tasks(manager_user_id, start_date, end_date)
-            manager_projects = self.repo.get_user_projects(manager_user_id, start_date, end_date)
+            # Fetch every member's tasks and projects up front, in parallel
+            member_data = self._prefetch_member_data(
+                [manager_user_id] + [member['userid'] for member in other_members], start_date, end_date
+            )
             
-            if manager_tasks is None:
-                manager_tasks = []
-            if manager_projects is None:
-                manager_projects = []
+            # First, add the manager's own report
+            manager_tasks, manager_projects = member_data[manager_user_id]
             
             manager_report = self._generate_user_report_data(manager_info, manager_tasks, manager_projects)
             member_reports.append(manager_report)
             
-            # Then add other team members' reports
-            for member in team_members:
-                # Skip the manager since we already added them
-                if member['userid'] == manager_user_id:
-                    continue
-                    
-                member_tasks = self.repo.get_user_tasks(member['userid'], start_date, end_date)
-                member_projects = self.repo.get_user_projects(member['userid'], start_date, end_date)
-                
-                # Handle None values
-                if member_tasks is None:
-                    member_tasks = []
-                if member_projects is None:
-                    member_projects = []
+            # Then add other team members' reports (manager already added)
+            for member in other_members:
+                member_tasks, member_projects = member_data[member['userid']]
                 
                 member_report = self._generate_user_report_data(member, member_tasks, member_projects)
                 member_reports.append(member_report)
@@ -150,6 +210,7 @@ class ReportService:
         except Exception as e:
             return {"status": 500, "message": f"Error generating team report: {str(e)}"}
 
+    @_report_scoped
     def generate_department_report(self, director_user_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
         """Generate department report for director showing department-wide performance and detailed workload analysis
         
@@ -195,15 +256,15 @@ class ReportService:
 
             # Generate personal reports for all department members INCLUDING the director
             member_reports = []
+            other_members = [member for member in dept_members if member['userid'] != director_user_id]
             
-            # First, add the director's own report
-            director_tasks = self.repo.get_user_tasks(director_user_id, start_date, end_date)
-            director_projects = self.repo.get_user_projects(director_user_id, start_date, end_date)
+            # Fetch every member's tasks and projects up front, in parallel
+            member_data = self._prefetch_member_data(
+                [director_user_id] + [member['userid'] for member in other_members], start_date, end_date
+            )
             
-            if director_tasks is None:
-                director_tasks = []
-            if director_projects is None:
-                director_projects = []
+            # First, add the director's own report
+            director_tasks, director_projects = member_data[director_user_id]
             
             director_report = self._generate_user_report_data(director_info, director_tasks, director_projects)
             
@@ -217,20 +278,9 @@ class ReportService:
             
             member_reports.append(director_report)
             
-            # Then add other department members' reports
-            for member in dept_members:
-                # Skip the director since we already added them
-                if member['userid'] == director_user_id:
-                    continue
-                    
-                member_tasks = self.repo.get_user_tasks(member['userid'], start_date, end_date)
-                member_projects = self.repo.get_user_projects(member['userid'], start_date, end_date)
-                
-                # Handle None values
-                if member_tasks is None:
-                    member_tasks = []
-                if member_projects is None:
-                    member_projects = []
+            # Then add other department members' reports (director already added)
+            for member in other_members:
+                member_tasks, member_projects = member_data[member['userid']]
                 
                 member_report = self._generate_user_report_data(member, member_tasks, member_projects)
                 
@@ -273,6 +323,7 @@ class ReportService:
         except Exception as e:
             return {"status": 500, "message": f"Error generating department report: {str(e)}"}
         
+    @_report_scoped
     def generate_company_report(self, admin_user_id: int, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
         """Generate company-wide report showing all departments, teams, and members organized hierarchically
         
@@ -544,6 +595,7 @@ class ReportService:
             project_tasks = self.repo.get_project_tasks(project_id) if project_id else []
             if project_tasks is None:
                 project_tasks = []
+            self._prime_task_users(project_tasks)
             
             # Process each task in the project
             project_task_details = []
@@ -851,6 +903,7 @@ class ReportService:
                     project_tasks = self.repo.get_project_tasks(project_id) if project_id else []
                     if project_tasks is None:
                         project_tasks = []
+                    self._prime_task_users(project_tasks)
                     
                     # Build member involvement map for this project
                     member_involvement = {}  # {member_id: {'name': name, 'role': role, 'involved_tasks': [task_ids]}}
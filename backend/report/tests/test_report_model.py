@@ -7,11 +7,13 @@ from unittest.mock import Mock, patch
 
 # Add parent directory to path to find modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from models.report import Report, ReportData, TeamReportData
 from services.report_service import ReportService
 from services.export_service import ExportService
-from repo.report_repo import ReportRepo
+from repo.report_repo import ReportRepo, CachedReportRepo
 
 
 class TestReportModel(unittest.TestCase):
@@ -969,6 +971,116 @@ class TestReportServiceErrorPaths(unittest.TestCase):
         
         assert result['status'] == 500
 
+    
+    def _team_fixture(self, member_ids):
+        """Manager 352 leading a team whose members have one task each"""
+        self.mock_repo.get_user_info.return_value = {
+            'userid': 352, 'name': 'Manager', 'role': 'manager', 'team_id': 5
+        }
+        self.mock_repo.get_team_info.return_value = {'id': 5, 'name': 'Team Five'}
+        self.mock_repo.get_team_members.return_value = [
+            {'userid': user_id, 'name': f'User {user_id}', 'role': 'staff', 'team_id': 5} for user_id in member_ids
+        ]
+        self.mock_repo.get_user_projects.return_value = []
+        self.mock_repo.get_project_tasks.return_value = []
+        self.mock_repo.get_users_info.return_value = {
+            user_id: {'userid': user_id, 'name': f'User {user_id}', 'role': 'staff'} for user_id in member_ids
+        }
+    
+    def test_generate_team_report_prefetch_keeps_member_order(self):
+        """Test concurrent prefetch keeps manager first and members in team order"""
+        import threading
+        import time
+        self._team_fixture([103, 352, 101, 102])
+        
+        active = {'now': 0, 'peak': 0}
+        lock = threading.Lock()
+        
+        def slow_tasks(user_id, start_date=None, end_date=None):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            time.sleep(0.05)
+            with lock:
+                active['now'] -= 1
+            return [{'id': user_id, 'task_name': f'Task {user_id}', 'status': 'Ongoing', 'owner_id': user_id}]
+        
+        self.mock_repo.get_user_tasks.side_effect = slow_tasks
+        
+        result = self.service.generate_team_report(352)
+        
+        assert result['status'] == 200
+        members = result['data']['team_report']['member_reports']
+        assert [m['user_id'] for m in members] == [352, 103, 101, 102]
+        assert active['peak'] > 1
+        assert self.mock_repo.get_user_tasks.call_count == 4
+    
+    def test_generate_team_report_member_fetch_error_returns_500(self):
+        """Test a failing member fetch still fails the whole report"""
+        self._team_fixture([101, 102])
+        
+        def failing_tasks(user_id, start_date=None, end_date=None):
+            if user_id == 102:
+                raise Exception("tasks service down")
+            return []
+        
+        self.mock_repo.get_user_tasks.side_effect = failing_tasks
+        
+        result = self.service.generate_team_report(352)
+        
+        assert result['status'] == 500
+        assert 'tasks service down' in result['message']
+
+    
+    def test_generate_team_report_memoizes_lookups(self):
+        """Test shared users and projects are fetched once per report and counted in metadata"""
+        self._team_fixture([101, 102, 103])
+        self.mock_repo.get_user_tasks.return_value = []
+        self.mock_repo.get_user_projects.return_value = [{'id': 7, 'proj_name': 'Shared Project'}]
+        self.mock_repo.get_project_tasks.return_value = [
+            {'id': 1, 'task_name': 'T1', 'status': 'Ongoing', 'owner_id': 101, 'collaborators': [102, 103]},
+            {'id': 2, 'task_name': 'T2', 'status': 'Completed', 'owner_id': 102, 'collaborators': [101]},
+        ]
+        
+        result = self.service.generate_team_report(352)
+        
+        assert result['status'] == 200
+        assert self.mock_repo.get_project_tasks.call_count == 1
+        # Task owners and collaborators are resolved by one bulk lookup; only the manager is fetched alone
+        self.mock_repo.get_users_info.assert_called_once_with([101, 102, 103])
+        user_lookups = [c.args for c in self.mock_repo.get_user_info.call_args_list]
+        assert user_lookups == [(352,)]
+        cache_stats = result['metadata']['lookup_cache']
+        # One miss per distinct project, user lookup and bulk lookup, plus the team info and team members lookups
+        assert cache_stats['misses'] == self.mock_repo.get_project_tasks.call_count + len(user_lookups) + 1 + 2
+        assert cache_stats['hits'] > 0
+    
+    def test_generate_team_report_falls_back_when_bulk_lookup_fails(self):
+        """Test task users are fetched one by one when the bulk lookup is unavailable"""
+        self._team_fixture([101, 102])
+        self.mock_repo.get_users_info.return_value = None
+        self.mock_repo.get_user_projects.return_value = [{'id': 7, 'proj_name': 'Shared Project'}]
+        self.mock_repo.get_project_tasks.return_value = [
+            {'id': 1, 'task_name': 'T1', 'status': 'Ongoing', 'owner_id': 101, 'collaborators': [102]},
+        ]
+        
+        result = self.service.generate_team_report(352)
+        
+        assert result['status'] == 200
+        looked_up = {c.args[0] for c in self.mock_repo.get_user_info.call_args_list}
+        assert {101, 102} <= looked_up
+    
+    def test_report_cache_is_scoped_per_report(self):
+        """Test a second report does not reuse the first report's cache"""
+        self._team_fixture([101])
+        self.mock_repo.get_user_tasks.return_value = []
+        
+        self.service.generate_team_report(352)
+        self.service.generate_team_report(352)
+        
+        assert self.mock_repo.get_user_info.call_count == 2
+        assert self.service.repo is self.mock_repo
+
 
 class TestExportServiceCoverage(unittest.TestCase):
     """Test export service edge cases"""
@@ -1073,7 +1185,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         """Set up test fixtures"""
         self.repo = ReportRepo()
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_user_info_error(self, mock_get):
         """Test get_user_info handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1082,16 +1194,75 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result is None
     
-    @patch('requests.get')
+    @patch('service_client.get')
+    def test_get_users_info_bulk_lookup(self, mock_get):
+        """Test get_users_info resolves many users in one request keyed by userid"""
+        from unittest.mock import Mock
+        response = Mock(status_code=200)
+        response.json.return_value = {'data': [{'userid': 101, 'name': 'A'}, {'userid': 102, 'name': 'B'}]}
+        mock_get.return_value = response
+        
+        result = self.repo.get_users_info([101, 102, 101, 103])
+        
+        assert result == {101: {'userid': 101, 'name': 'A'}, 102: {'userid': 102, 'name': 'B'}}
+        assert mock_get.call_count == 1
+        assert mock_get.call_args.kwargs['params'] == {'ids': '101,102,103'}
+    
+    @patch('service_client.get')
+    def test_get_users_info_error(self, mock_get):
+        """Test get_users_info returns None so callers can fall back"""
+        mock_get.side_effect = Exception("Connection error")
+        
+        assert self.repo.get_users_info([101]) is None
+    
+    @patch('service_client.get')
     def test_get_user_tasks_error(self, mock_get):
-        """Test get_user_tasks handles errors"""
+        """Test get_user_tasks raises instead of reporting a user with no tasks"""
         mock_get.side_effect = Exception("Connection error")
         
+        with self.assertRaisesRegex(RuntimeError, "Connection error"):
+            self.repo.get_user_tasks(101)
+    
+    @patch('service_client.get')
+    def test_get_user_tasks_follows_cursor_pages(self, mock_get):
+        """Test get_user_tasks requests projected pages until next_cursor is empty"""
+        from unittest.mock import Mock
+        page1 = Mock(status_code=200)
+        page1.json.return_value = {'data': [{'id': 1}], 'next_cursor': 'abc'}
+        page2 = Mock(status_code=200)
+        page2.json.return_value = {'data': [{'id': 2}], 'next_cursor': None}
+        mock_get.side_effect = [page1, page2]
+        
         result = self.repo.get_user_tasks(101)
         
-        assert result == []
+        assert result == [{'id': 1}, {'id': 2}]
+        first_params = mock_get.call_args_list[0].kwargs['params']
+        second_params = mock_get.call_args_list[1].kwargs['params']
+        assert 'description' not in first_params['fields']
+        assert 'cursor' not in first_params
+        assert second_params['cursor'] == 'abc'
+    
+    @patch('service_client.get')
+    def test_get_user_tasks_failed_page_raises(self, mock_get):
+        """Test a failure after the first page raises instead of returning a truncated or empty list"""
+        from unittest.mock import Mock
+        page1 = Mock(status_code=200)
+        page1.json.return_value = {'data': [{'id': 1}], 'next_cursor': 'abc'}
+        for status in (404, 503):
+            mock_get.side_effect = [page1, Mock(status_code=status)]
+            
+            with self.assertRaisesRegex(RuntimeError, f"HTTP {status} after 1 task"):
+                self.repo.get_user_tasks(101)
     
-    @patch('requests.get')
+    @patch('service_client.get')
+    def test_get_user_tasks_no_tasks(self, mock_get):
+        """Test a 404 on the first page means the user has no tasks"""
+        from unittest.mock import Mock
+        mock_get.return_value = Mock(status_code=404)
+        
+        assert self.repo.get_user_tasks(101) == []
+    
+    @patch('service_client.get')
     def test_get_user_projects_error(self, mock_get):
         """Test get_user_projects handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1100,7 +1271,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result == []
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_project_tasks_error(self, mock_get):
         """Test get_project_tasks handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1109,7 +1280,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result == []
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_project_info_error(self, mock_get):
         """Test get_project_info handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1118,7 +1289,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result is None
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_team_members_error(self, mock_get):
         """Test get_team_members handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1127,7 +1298,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result == []
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_dept_members_error(self, mock_get):
         """Test get_dept_members handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1136,7 +1307,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result == []
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_team_info_error(self, mock_get):
         """Test get_team_info handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1145,7 +1316,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result is None
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_dept_info_error(self, mock_get):
         """Test get_dept_info handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1154,7 +1325,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result is None
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_tasks_by_team_success(self, mock_get):
         """Test get_tasks_by_team success path"""
         from unittest.mock import Mock
@@ -1167,7 +1338,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result == [{'id': 1, 'task_name': 'Task 1'}]
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_tasks_by_team_error(self, mock_get):
         """Test get_tasks_by_team handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1176,7 +1347,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result == []
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_tasks_by_department_success(self, mock_get):
         """Test get_tasks_by_department success path"""
         from unittest.mock import Mock
@@ -1189,7 +1360,7 @@ class TestReportRepoCoverage(unittest.TestCase):
         
         assert result == [{'id': 1, 'task_name': 'Task 1'}]
     
-    @patch('requests.get')
+    @patch('service_client.get')
     def test_get_tasks_by_department_error(self, mock_get):
         """Test get_tasks_by_department handles errors"""
         mock_get.side_effect = Exception("Connection error")
@@ -1199,5 +1370,91 @@ class TestReportRepoCoverage(unittest.TestCase):
         assert result == []
 
 
+
+class TestCachedReportRepo(unittest.TestCase):
+    """Test the per-report lookup cache under concurrent use"""
+    
+    def test_different_keys_fetch_concurrently(self):
+        """Test a slow lookup does not hold up lookups of other keys"""
+        import threading
+        started = threading.Event()
+        release = threading.Event()
+        
+        def slow_team(team_id):
+            started.set()
+            release.wait(5)
+            return {'id': team_id}
+        
+        repo = Mock()
+        repo.get_team_info.side_effect = slow_team
+        repo.get_user_info.side_effect = lambda user_id: {'userid': user_id}
+        cached = CachedReportRepo(repo)
+        
+        slow = threading.Thread(target=cached.get_team_info, args=(1,))
+        slow.start()
+        try:
+            started.wait(5)
+            # Would block behind the team lookup if the lock were held across fetches
+            assert cached.get_user_info(101) == {'userid': 101}
+            assert slow.is_alive()
+        finally:
+            release.set()
+            slow.join()
+    
+    def test_same_key_is_fetched_once(self):
+        """Test concurrent callers of one key share a single upstream fetch"""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        started = threading.Event()
+        release = threading.Event()
+        repo = Mock()
+        
+        def fetch(user_id):
+            started.set()
+            release.wait(5)
+            return {'userid': user_id}
+        
+        repo.get_user_info.side_effect = fetch
+        cached = CachedReportRepo(repo)
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            first = pool.submit(cached.get_user_info, 101)
+            started.wait(5)
+            others = [pool.submit(cached.get_user_info, 101) for _ in range(3)]
+            release.set()
+            results = [first.result()] + [f.result() for f in others]
+        
+        assert results == [{'userid': 101}] * 4
+        assert repo.get_user_info.call_count == 1
+        assert cached.stats() == {'hits': 3, 'misses': 1}
+    
+    def test_failed_lookup_is_retried(self):
+        """Test an exception is not cached"""
+        repo = Mock()
+        repo.get_project_info.side_effect = [Exception("down"), {'id': 7}]
+        cached = CachedReportRepo(repo)
+        
+        with self.assertRaises(Exception):
+            cached.get_project_info(7)
+        assert cached.get_project_info(7) == {'id': 7}
+    
+    def test_failed_bulk_lookup_falls_back_to_single_lookups(self):
+        """Test prime_users caches the bulk result, or nothing when it fails"""
+        repo = Mock()
+        repo.get_users_info.return_value = None
+        repo.get_user_info.side_effect = lambda user_id: {'userid': user_id}
+        cached = CachedReportRepo(repo)
+        
+        cached.prime_users([101, 102])
+        assert cached.get_user_info(101) == {'userid': 101}
+        assert repo.get_user_info.call_count == 1
+        
+        repo.get_users_info.return_value = {103: {'userid': 103, 'name': 'C'}}
+        cached.prime_users([103, 104])
+        assert cached.get_user_info(103) == {'userid': 103, 'name': 'C'}
+        assert cached.get_user_info(104) is None
+        assert repo.get_user_info.call_count == 1
+
+
 if __name__ == '__main__': # pragma: no cover
     unittest.main() # pragma: no cover
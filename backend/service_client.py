@@ -0,0 +1,150 @@
+"""
+Shared HTTP client for calls between the backend microservices.
+
+Every service used to call `requests.get` / `requests.post` directly, which opens
+a new TCP connection per call and usually has no timeout. This module keeps one
+pooled `requests.Session` per process instead:
+
+- keep-alive connections, pooled per host (one pool per microservice)
+- default (connect, read) timeouts on every call
+- retry with exponential backoff for idempotent GETs; POSTs are never re-sent
+- base URLs read from the environment instead of hardcoded 127.0.0.1:500x
+
+Usage from a microservice:
+
+    import service_client
+    response = service_client.get("users", f"/users/{user_id}")
+    response = service_client.post("notification", "/notifications/triggers/...", json=payload)
+
+Environment variables:
+    <NAME>_SERVICE_URL       Base URL per service, e.g. USERS_SERVICE_URL
+    SERVICE_CONNECT_TIMEOUT  Connect timeout in seconds (default 3)
+    SERVICE_READ_TIMEOUT     Read timeout in seconds (default 10)
+    SERVICE_POOL_SIZE        Max keep-alive connections per host (default 20)
+    SERVICE_GET_RETRIES      Retries for idempotent GETs (default 3)
+    SERVICE_RETRY_BACKOFF    Backoff factor in seconds (default 0.2)
+"""
+import os
+import threading
+from typing import Optional, Union, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Default base URLs, keyed by service name; overridden by <NAME>_SERVICE_URL
+DEFAULT_SERVICE_URLS = {
+    "projects": "http://127.0.0.1:5001",
+    "tasks": "http://127.0.0.1:5002",
+    "users": "http://127.0.0.1:5003",
+    "team": "http://127.0.0.1:5004",
+    "dept": "http://127.0.0.1:5005",
+    "notification": "http://127.0.0.1:5006",
+    "report": "http://127.0.0.1:5007",
+    "comments": "http://127.0.0.1:5008",
+}
+
+CONNECT_TIMEOUT = float(os.getenv("SERVICE_CONNECT_TIMEOUT", "3"))
+READ_TIMEOUT = float(os.getenv("SERVICE_READ_TIMEOUT", "10"))
+POOL_SIZE = int(os.getenv("SERVICE_POOL_SIZE", "20"))
+GET_RETRIES = int(os.getenv("SERVICE_GET_RETRIES", "3"))
+RETRY_BACKOFF = float(os.getenv("SERVICE_RETRY_BACKOFF", "0.2"))
+
+DEFAULT_TIMEOUT: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def base_url(service: str) -> str:
+    """
+    Base URL for a microservice, e.g. base_url("users") -> "http://127.0.0.1:5003".
+    """
+    env_value = os.getenv(f"{service.upper()}_SERVICE_URL")
+    if env_value:
+        return env_value.rstrip("/")
+    if service not in DEFAULT_SERVICE_URLS:
+        raise ValueError(f"Unknown service '{service}'")
+    return DEFAULT_SERVICE_URLS[service]
+
+
+def url_for(service: str, path: str) -> str:
+    """
+    Absolute URL for `path` on a microservice.
+    """
+    return f"{base_url(service)}/{path.lstrip('/')}"
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=GET_RETRIES,
+        connect=GET_RETRIES,
+        read=GET_RETRIES,
+        status=GET_RETRIES,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        # Only idempotent methods are re-sent after a read error or bad status
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=len(DEFAULT_SERVICE_URLS), pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Process-wide pooled session, created on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def reserve_connections(count: int) -> None:
+    """
+    Make sure the shared pool keeps at least `count` connections per host, e.g.
+    one per worker thread of a caller that sends requests concurrently.
+    A session built with a smaller pool is replaced.
+    """
+    global POOL_SIZE, _session
+    with _session_lock:
+        if count > POOL_SIZE:
+            POOL_SIZE = count
+            _session = None
+
+
+def request(method: str, service: str, path: str,
+            timeout: Optional[Union[float, Tuple[float, float]]] = None, **kwargs) -> requests.Response:
+    """
+    Send a request to a microservice over the shared session.
+
+    Args:
+        method: HTTP method
+        service: Service name (see DEFAULT_SERVICE_URLS)
+        path: Path on that service, e.g. "/users/5"
+        timeout: Overrides DEFAULT_TIMEOUT for this call
+        **kwargs: Passed through to requests (params, json, ...)
+    """
+    return get_session().request(method, url_for(service, path), timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def get(service: str, path: str, **kwargs) -> requests.Response:
+    """GET on a microservice; retried with backoff on connection errors and 502/503/504."""
+    return request("GET", service, path, **kwargs)
+
+
+def post(service: str, path: str, **kwargs) -> requests.Response:
+    """POST on a microservice; only retried when the connection could not be opened."""
+    return request("POST", service, path, **kwargs)
+
+
+def put(service: str, path: str, **kwargs) -> requests.Response:
+    """PUT on a microservice."""
+    return request("PUT", service, path, **kwargs)
@@ -0,0 +1,98 @@
+"""
+Process-wide Supabase client shared by every repo.
+
+Each repo class used to call `create_client(...)` in its constructor, and some
+code paths built a repo per call, so every client came with its own HTTP pool
+and paid DNS + TCP + TLS setup again. This module builds one client per process
+on top of a single httpx pool:
+
+- keep-alive connections reused across repos, requests and threads
+- HTTP/2 multiplexing (many concurrent queries over one TLS connection)
+- tunable pool limits and timeouts
+
+Usage from a repo:
+
+    import supabase_client
+    self.client = supabase_client.get_client()
+
+Environment variables:
+    SUPABASE_URL, SUPABASE_SERVICE_KEY  Project URL and service key (required)
+    SUPABASE_HTTP2                      "0" to disable HTTP/2 (default on)
+    SUPABASE_MAX_CONNECTIONS            Max open connections in the pool (default 50)
+    SUPABASE_MAX_KEEPALIVE              Max idle keep-alive connections (default 20)
+    SUPABASE_KEEPALIVE_EXPIRY           Seconds an idle connection is kept (default 30)
+    SUPABASE_CONNECT_TIMEOUT            Connect timeout in seconds (default 5)
+    SUPABASE_READ_TIMEOUT               Read timeout in seconds (default 30)
+
+Run bench_supabase_client.py in this directory for the per-call latency of a
+fresh client versus the shared one.
+"""
+import os
+import threading
+from typing import Optional
+
+import httpx
+from supabase import Client, create_client
+from supabase.lib.client_options import SyncClientOptions
+
+HTTP2 = os.getenv("SUPABASE_HTTP2", "1") == "1"
+MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "50"))
+MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("SUPABASE_READ_TIMEOUT", "30"))
+
+_client: Optional[Client] = None
+_client_lock = threading.Lock()
+
+
+def build_http_client(http2: bool = HTTP2) -> httpx.Client:
+    """
+    Pooled httpx client handed to supabase-py for PostgREST, storage and auth.
+    """
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        follow_redirects=True,
+    )
+
+
+def build_client(url: Optional[str] = None, key: Optional[str] = None,
+                 http_client: Optional[httpx.Client] = None) -> Client:
+    """
+    New Supabase client on a pooled httpx client. Prefer get_client(); this is
+    for callers that need an isolated client (benchmarks, tests).
+    """
+    url = url or os.environ["SUPABASE_URL"]
+    key = key or os.environ["SUPABASE_SERVICE_KEY"]
+    options = SyncClientOptions(httpx_client=http_client or build_http_client())
+    return create_client(url, key, options=options)
+
+
+def get_client() -> Client:
+    """
+    Process-wide Supabase client, created on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = build_client()
+    return _client
+
+
+def reset_client() -> None:
+    """
+    Drop the shared client and close its pool, e.g. after a fork or when the
+    environment changed. The next get_client() builds a new one.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.options.httpx_client.close()
+        _client = None
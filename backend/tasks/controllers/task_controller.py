@@ -1,6 +1,7 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from services.task_service import TaskService
-from utils.parsing import parse_task_payload, parse_subtask_payload, parse_task_update_payload
+from utils.parsing import parse_task_payload, parse_subtask_payload, parse_task_update_payload, parse_task_list_query, parse_task_batch_query, parse_due_reminders_query
 
 task_bp = Blueprint("tasks", __name__)
 service = TaskService()
@@ -362,6 +363,45 @@ def update_task():
     except Exception as e:
         return jsonify({"Message": str(e), "Code": 500}), 500
 
+@task_bp.route("/tasks/batch", methods=["GET"])
+def get_tasks_batch():
+    """
+    Get many tasks by ID in one request.
+
+    Query parameters:
+    - ids: comma-separated task IDs, e.g. ?ids=1,2,3 (at most 500)
+    - fields: optional comma-separated columns to return (id and created_at are always included)
+
+    RETURNS:
+    {
+        "Message": "Retrieved {count} tasks",
+        "data": {
+            "tasks": [ ... list of task objects, in the requested order ... ],
+            "task_count": int,
+            "missing_tasks": [ ... {"task_id", "error"} for IDs not found ... ] (only if some are missing)
+        },
+        "Code": 200
+    }
+
+    RESPONSES:
+        200: All tasks found
+        207: Partially successful (some tasks not found)
+        400: Missing or invalid ids / fields
+        404: None of the tasks were found
+        500: Internal Server Error
+    """
+    try:
+        query = parse_task_batch_query(request.args)
+        result = service.get_tasks_batch(query["ids"], query["fields"])
+        status = result.pop("__status", 200)
+        result["Code"] = status
+
+        return jsonify(result), status
+    except ValueError as ve:
+        return jsonify({"Message": str(ve), "Code": 400}), 400
+    except Exception as e:
+        return jsonify({"Message": str(e), "Code": 500}), 500
+
 # get task by task_id
 @task_bp.route("/tasks/<int:task_id>", methods=["GET"])
 def get_task_by_id(task_id: int):
@@ -374,14 +414,55 @@ def get_task_by_id(task_id: int):
         return jsonify({"Message": str(e), "Code": 500}), 500
     
 
+def _stream_json(result: dict, status: int) -> Response:
+    """
+    Stream a result dict as JSON, emitting the `data` list one item at a time
+    so large task pages are never serialized into a single string.
+    """
+    data = result.pop("data", [])
+
+    def generate():
+        yield json.dumps(result)[:-1] + ', "data": ['
+        for index, item in enumerate(data):
+            yield ("," if index else "") + json.dumps(item, default=str)
+        yield "]}"
+
+    return Response(stream_with_context(generate()), status=status, mimetype="application/json")
+
 # get tasks by user_id (in owner_id or collaborators) with nested subtasks
 @task_bp.route("/tasks/user-task/<int:user_id>", methods=["GET"])
 def get_tasks_by_user(user_id: int):
+    """
+    Get parent tasks (with nested subtasks) where the user is owner or collaborator.
+
+    Query Parameters (all optional):
+    - fields: Comma-separated task columns to return (id and created_at always included).
+              Subtasks are only attached when "subtasks" is requested or fields is omitted.
+    - limit: Page size (1-500). Omit to return every task.
+    - cursor: The next_cursor value from the previous page
+
+    RETURNS:
+    {
+        "status": "success",
+        "data": [ ... list of tasks ... ],
+        "next_cursor": "<str>" | null (only when limit is given),
+        "Code": 200
+    }
+
+    RESPONSES:
+        200: Tasks found and returned
+        400: Invalid fields, limit or cursor
+        404: No tasks found for this user
+        500: Internal Server Error
+    """
     try:
-        result = service.get_by_user(user_id)
+        query = parse_task_list_query(request.args)
+        result = service.get_by_user(user_id, **query)
         status = result.pop("__status", 200)
         result["Code"] = status
-        return jsonify(result), status
+        return _stream_json(result, status)
+    except ValueError as ve:
+        return jsonify({"Message": str(ve), "Code": 400}), 400
     except Exception as e:
         return jsonify({"Message": str(e), "Code": 500}), 500
 
@@ -618,26 +699,79 @@ def get_tasks_with_upcoming_deadlines():
     except Exception as e:
         return jsonify({"Message": str(e), "Code": 500}), 500
     
+@task_bp.route("/tasks/due-reminders", methods=["GET"])
+def get_due_reminders():
+    """
+    Get the deadline reminders due on a given day: one entry per (task, interval)
+    pair where the task is due exactly that many days later and the interval is in
+    its reminder_intervals. Completed tasks are excluded.
+    
+    With from/to, returns instead the reminders whose instant (due date minus
+    interval) falls in that time window, for schedulers that fire each reminder
+    at its exact time.
+    
+    Query Parameters:
+    - date: Day the reminders are for, YYYY-MM-DD (default: today)
+    - from, to: ISO timestamps bounding the reminder instants, at most 7 days apart (instead of date)
+    - max_days_ahead: Largest reminder interval to consider, 0-365 (default: 7)
+    
+    RETURNS:
+    {
+        "Message": "Successfully retrieved X deadline reminders due on YYYY-MM-DD",
+        "data": [ {"task_id", "task_name", "due_date", "reminder_days", "remind_at"}, ... ],
+        "Code": 200
+    }
+    
+    RESPONSES:
+    200: Reminders found and returned
+    400: Invalid date / from / to / max_days_ahead
+    404: No reminders due
+    500: Internal Server Error
+    """
+    try:
+        query = parse_due_reminders_query(request.args)
+        if query["start"] is not None:
+            result = service.get_reminders_between(query["start"], query["end"], query["max_days_ahead"])
+        else:
+            result = service.get_due_reminders(query["today"], query["max_days_ahead"])
+        status = result.pop("__status", 200)
+        result["Code"] = status
+        return jsonify(result), status
+    except ValueError as ve:
+        return jsonify({"Message": str(ve), "Code": 400}), 400
+    except Exception as e:
+        return jsonify({"Message": str(e), "Code": 500}), 500
+    
 @task_bp.route("/tasks", methods=["GET"])
 def get_all_tasks():
     """
     Get all tasks for all teams/users.
     
+    Query Parameters (all optional):
+    - fields: Comma-separated task columns to return (id and created_at always included)
+    - limit: Page size (1-500). Omit to return every task.
+    - cursor: The next_cursor value from the previous page
+    
     Returns:
     {
         "data": [ ... list of all tasks ... ],
+        "next_cursor": "<str>" | null (only when limit is given),
         "Code": 200
     }
     
     Responses:
         200: Tasks found and returned (or empty list if no tasks)
+        400: Invalid fields, limit or cursor
         500: Internal Server Error
     """
     try:
-        result = service.get_all_tasks()
+        query = parse_task_list_query(request.args)
+        result = service.get_all_tasks(**query)
         status = result.pop("__status", 200)
         result["Code"] = status
-        return jsonify(result), status
+        return _stream_json(result, status)
+    except ValueError as ve:
+        return jsonify({"Message": str(ve), "Code": 400}), 400
     except Exception as e:
         return jsonify({"Message": str(e), "Code": 500}), 500
     
@@ -1,17 +1,31 @@
+import logging
 import os
 import uuid
-from typing import Optional, Dict, Any, List
-from supabase import create_client, Client
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+from supabase import Client
 
-SUPABASE_URL = os.environ["SUPABASE_URL"]
-SUPABASE_KEY = os.environ["SUPABASE_SERVICE_KEY"]
+import supabase_client
 
 # Table name kept as 'task' to match your existing schema.
 TABLE = "task"
 
+# Max IDs per in_ / or_ filter, keeps the PostgREST query string bounded.
+IN_FILTER_CHUNK_SIZE = 100
+
+# Columns the deadline reminder scheduler needs
+REMINDER_COLUMNS = "id,task_name,due_date,reminder_intervals"
+# Intervals of tasks whose reminder_intervals is null (matches the Task model default)
+DEFAULT_REMINDER_INTERVALS = [7, 3, 1]
+# Days OR-ed into one due-reminder query, and rows fetched per page
+REMINDER_DAYS_PER_QUERY = 31
+REMINDER_PAGE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
 class SupabaseTaskRepo:
     def __init__(self):
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.client: Client = supabase_client.get_client()
 
     def find_by_owner_and_name(self, owner_id: int, task_name: str) -> List[Dict[str, Any]]:
         return self.client.table(TABLE).select("*").eq("owner_id", owner_id).eq("task_name", task_name).execute().data
@@ -30,6 +44,24 @@ class SupabaseTaskRepo:
             # Task not found or other error
             return None
 
+    def get_tasks(self, task_ids: List[int], fields: str = "*") -> Dict[int, Dict[str, Any]]:
+        """
+        Fetch many tasks by ID with one in_ query per IN_FILTER_CHUNK_SIZE IDs.
+
+        Returns {task_id: task}; IDs that do not exist are absent, so callers
+        can report them individually.
+        """
+        unique_ids = list(dict.fromkeys(task_ids))
+        tasks: Dict[int, Dict[str, Any]] = {}
+
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK_SIZE]
+            res = self.client.table(TABLE).select(fields).in_("id", chunk).execute()
+            for task in res.data or []:
+                tasks[task["id"]] = task
+
+        return tasks
+
     def find_by_user(self, user_id: int) -> list:
         """
         Find all tasks (parent and subtask) where user is owner or collaborator.
@@ -58,21 +90,55 @@ class SupabaseTaskRepo:
         res = self.client.table(TABLE).select("*").eq("parent_task", parent_task_id).eq("type", "subtask").execute()
         return res.data or []
 
-    def find_parent_tasks_by_user(self, user_id: int) -> List[Dict[str, Any]]:
+    def find_subtasks_by_parents(self, parent_task_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Find the subtasks of many parent tasks at once, grouped by parent task ID.
+
+        Every requested parent ID is present in the result, mapped to an empty
+        list when it has no subtasks.
+        """
+        grouped: Dict[int, List[Dict[str, Any]]] = {parent_id: [] for parent_id in parent_task_ids}
+
+        for start in range(0, len(parent_task_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = parent_task_ids[start:start + IN_FILTER_CHUNK_SIZE]
+            res = self.client.table(TABLE).select("*").in_("parent_task", chunk).eq("type", "subtask").execute()
+            for subtask in res.data or []:
+                grouped.setdefault(subtask["parent_task"], []).append(subtask)
+
+        return grouped
+
+    def find_parent_tasks_by_user(self, user_id: int, fields: str = "*", limit: Optional[int] = None,
+                                  cursor: Optional[Tuple[str, int]] = None) -> List[Dict[str, Any]]:
         """
         Find only parent tasks (type='parent' or null) where user is owner or collaborator.
+
+        Owner and collaborator matches come from a single query. When limit or cursor
+        is given, results are keyset-paginated on (created_at, id).
         """
-        # Get parent tasks where user is owner
-        owner_res = self.client.table(TABLE).select("*").eq("owner_id", user_id).in_("type", ["parent", None]).execute()
-        owner_tasks = owner_res.data or []
+        query = self.client.table(TABLE).select(fields).or_(
+            f"owner_id.eq.{user_id},collaborators.cs.[{user_id}]"
+        ).in_("type", ["parent", None])
+        return self._paginate(query, limit, cursor).execute().data or []
 
-        # Get parent tasks where user is collaborator  
-        collab_res = self.client.table(TABLE).select("*").filter("collaborators", "cs", [user_id]).in_("type", ["parent", None]).execute()
-        collab_tasks = collab_res.data or []
+    def _paginate(self, query, limit: Optional[int], cursor: Optional[Tuple[str, int]]):
+        """
+        Apply keyset pagination on (created_at, id) to a select query.
+        Leaves the query untouched when neither limit nor cursor is given.
+        """
+        if limit is None and cursor is None:
+            return query
 
-        # Combine and deduplicate
-        combined = {t["id"]: t for t in (owner_tasks + collab_tasks)}
-        return list(combined.values())
+        if cursor is not None:
+            created_at, last_id = cursor
+            # Quote the timestamp: it contains PostgREST-reserved characters (':' and '.')
+            query = query.or_(
+                f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{last_id})'
+            )
+
+        query = query.order("created_at").order("id")
+        if limit is not None:
+            query = query.limit(limit)
+        return query
 
     def update_task(self, task_id: int, patch: Dict[str, Any]) -> Dict[str, Any]:
         res = self.client.table(TABLE).update(patch).eq("id", task_id).execute()
@@ -80,6 +146,22 @@ class SupabaseTaskRepo:
             raise RuntimeError("Update failed — no data returned")
         return res.data[0]
 
+    def update_tasks(self, task_ids: List[int], patch: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Apply the same patch to many tasks with one update().in_ statement per
+        IN_FILTER_CHUNK_SIZE IDs. Returns the updated rows; IDs that matched no
+        row are simply absent.
+        """
+        unique_ids = list(dict.fromkeys(task_ids))
+        updated: List[Dict[str, Any]] = []
+
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK_SIZE]
+            res = self.client.table(TABLE).update(patch).in_("id", chunk).execute()
+            updated.extend(res.data or [])
+
+        return updated
+
     def add_subtask_to_parent(self, parent_task_id: int, subtask_id: int) -> Dict[str, Any]:
         """
         Add a subtask ID to the parent task's subtasks list.
@@ -159,63 +241,75 @@ class SupabaseTaskRepo:
             print(f"Delete error for task {task_id}: {e}")
             return False
 
-    def find_parent_tasks_by_team(self, team_id: int) -> List[Dict[str, Any]]:
+    def _find_member_ids(self, column: str, value: int) -> List[int]:
         """
-        Find all parent tasks for users in a specific team.
+        Return the user IDs whose `column` (team_id / dept_id) equals `value`.
+        """
+        user_res = self.client.table("user").select("userid").eq(column, value).execute()
+        return [user["userid"] for user in (user_res.data or [])]
+
+    def find_parent_tasks_by_members(self, user_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Find all parent tasks where any of the given users is owner or collaborator.
+
+        Uses one `in_` query on owner_id and one query OR-ing a collaborators
+        containment check per member, per chunk of IN_FILTER_CHUNK_SIZE users,
+        instead of two queries per user.
         """
-        # Get all users in the team first
-        user_res = self.client.table("user").select("userid").eq("team_id", team_id).execute()
-        user_ids = [user["userid"] for user in (user_res.data or [])]
-        
-        if not user_ids:
-            return []
-        
-        # Get parent tasks where any team member is owner or collaborator
         all_tasks = []
-        
-        for user_id in user_ids:
-            # Get parent tasks where user is owner
-            owner_res = self.client.table(TABLE).select("*").eq("owner_id", user_id).in_("type", ["parent", None]).execute()
+
+        for start in range(0, len(user_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = user_ids[start:start + IN_FILTER_CHUNK_SIZE]
+
+            # Get parent tasks owned by any member in the chunk
+            owner_res = self.client.table(TABLE).select("*").in_("owner_id", chunk).in_("type", ["parent", None]).execute()
             owner_tasks = owner_res.data or []
-            
-            # Get parent tasks where user is collaborator  
-            collab_res = self.client.table(TABLE).select("*").filter("collaborators", "cs", [user_id]).in_("type", ["parent", None]).execute()
+
+            # Get parent tasks with any member of the chunk among their collaborators
+            collab_res = self.client.table(TABLE).select("*").or_(
+                ",".join(f"collaborators.cs.[{user_id}]" for user_id in chunk)
+            ).in_("type", ["parent", None]).execute()
             collab_tasks = collab_res.data or []
-            
+
             all_tasks.extend(owner_tasks + collab_tasks)
-        
+
         # Deduplicate by task ID
         combined = {t["id"]: t for t in all_tasks}
         return list(combined.values())
 
+    @staticmethod
+    def _member_lookup_round_trips(user_ids: List[int]) -> int:
+        """Queries made by a team/department lookup: the member query plus two per chunk of members"""
+        chunks = -(-len(user_ids) // IN_FILTER_CHUNK_SIZE)
+        return 1 + 2 * chunks
+
+    def find_parent_tasks_by_team(self, team_id: int) -> List[Dict[str, Any]]:
+        """
+        Find all parent tasks for users in a specific team.
+        """
+        # Get all users in the team first
+        user_ids = self._find_member_ids("team_id", team_id)
+        if not user_ids:
+            return []
+
+        tasks = self.find_parent_tasks_by_members(user_ids)
+        logger.debug("%s %s task lookup took %d Supabase round trips",
+                     "team", team_id, self._member_lookup_round_trips(user_ids))
+        return tasks
+
     def find_parent_tasks_by_department(self, dept_id: int) -> List[Dict[str, Any]]:
         """
         Find all parent tasks for users in a specific department.
         """
         # Get all users in the department first
-        user_res = self.client.table("user").select("userid").eq("dept_id", dept_id).execute()
-        user_ids = [user["userid"] for user in (user_res.data or [])]
-        
+        user_ids = self._find_member_ids("dept_id", dept_id)
         if not user_ids:
             return []
-        
-        # Get parent tasks where any department member is owner or collaborator
-        all_tasks = []
-        
-        for user_id in user_ids:
-            # Get parent tasks where user is owner
-            owner_res = self.client.table(TABLE).select("*").eq("owner_id", user_id).in_("type", ["parent", None]).execute()
-            owner_tasks = owner_res.data or []
-            
-            # Get parent tasks where user is collaborator  
-            collab_res = self.client.table(TABLE).select("*").filter("collaborators", "cs", [user_id]).in_("type", ["parent", None]).execute()
-            collab_tasks = collab_res.data or []
-            
-            all_tasks.extend(owner_tasks + collab_tasks)
-        
-        # Deduplicate by task ID
-        combined = {t["id"]: t for t in all_tasks}
-        return list(combined.values())
+
+        tasks = self.find_parent_tasks_by_members(user_ids)
+        logger.debug("%s %s task lookup took %d Supabase round trips",
+                     "department", dept_id, self._member_lookup_round_trips(user_ids))
+        return tasks
 
     def find_tasks_with_upcoming_deadlines(self, max_days_ahead: int = 7) -> List[Dict[str, Any]]:
         """
@@ -227,8 +321,6 @@ class SupabaseTaskRepo:
         Returns:
             List of tasks with due dates in the next max_days_ahead days
         """
-        from datetime import datetime, timedelta
-        
         # Calculate date range
         today = datetime.now().date()
         end_date = today + timedelta(days=max_days_ahead)
@@ -245,9 +337,85 @@ class SupabaseTaskRepo:
         
         return res.data or []
     
-    def find_all_parent_tasks(self) -> list:
+    def find_due_reminders(self, today, max_days_ahead: int = 7) -> List[Dict[str, Any]]:
         """
-        Find all tasks (parent and subtasks) in the system.
+        Find the (task, interval) pairs whose reminder falls on `today` (UTC): non-completed
+        tasks due exactly n days after `today` (0 <= n <= max_days_ahead) with n in
+        their reminder_intervals.
+
+        Args:
+            today: Date the reminders are for
+            max_days_ahead: Largest interval to consider
+
+        Returns:
+            Same as find_reminders_between
         """
-        res = self.client.table(TABLE).select("*").is_("parent_task", None).execute()
-        return res.data or []
+        start = datetime.combine(today, time.min, tzinfo=timezone.utc)
+        return self.find_reminders_between(start, start + timedelta(days=1), max_days_ahead)
+
+    def find_reminders_between(self, start, end, max_days_ahead: int = 7) -> List[Dict[str, Any]]:
+        """
+        Find the (task, interval) pairs whose reminder instant, due_date minus n days,
+        falls in [start, end), for non-completed tasks with n in their reminder_intervals
+        (0 <= n <= max_days_ahead). The interval check runs in the database, one
+        and(...) clause per n OR-ed into a single query.
+
+        Args:
+            start, end: Timezone-aware bounds of the window
+            max_days_ahead: Largest interval to consider
+
+        Returns:
+            [{"task_id", "task_name", "due_date", "reminder_days", "remind_at"}] ordered by
+            remind_at, then task id
+        """
+        pairs = []
+        for first_day in range(0, max_days_ahead + 1, REMINDER_DAYS_PER_QUERY):
+            days_in_query = range(first_day, min(first_day + REMINDER_DAYS_PER_QUERY, max_days_ahead + 1))
+            clauses = []
+            for days in days_in_query:
+                offset = timedelta(days=days)
+                interval = f"reminder_intervals.cs.[{days}]"
+                if days in DEFAULT_REMINDER_INTERVALS:
+                    interval = f"or({interval},reminder_intervals.is.null)"
+                # Quote the timestamps: they contain PostgREST-reserved characters (':' and '.')
+                clauses.append(f'and(due_date.gte."{(start + offset).isoformat()}",'
+                               f'due_date.lt."{(end + offset).isoformat()}",{interval})')
+
+            # Keyset-paginate on id so a busy window is not cut off at the PostgREST row limit
+            last_id = 0
+            while True:
+                rows = self.client.table(TABLE).select(REMINDER_COLUMNS).neq(
+                    "status", "Completed"
+                ).or_(",".join(clauses)).gt("id", last_id).order("id").limit(REMINDER_PAGE_SIZE).execute().data or []
+                for task in rows:
+                    due = datetime.fromisoformat(task["due_date"].replace('Z', '+00:00'))
+                    if due.tzinfo is None:
+                        due = due.replace(tzinfo=timezone.utc)
+                    intervals = task.get("reminder_intervals")
+                    if intervals is None:
+                        intervals = DEFAULT_REMINDER_INTERVALS
+                    # A row can match several intervals when the window spans more than a day
+                    for days in sorted(set(intervals) & set(days_in_query)):
+                        remind_at = due - timedelta(days=days)
+                        if start <= remind_at < end:
+                            pairs.append({
+                                "task_id": task["id"],
+                                "task_name": task.get("task_name"),
+                                "due_date": task["due_date"],
+                                "reminder_days": days,
+                                "remind_at": remind_at.isoformat()
+                            })
+                if len(rows) < REMINDER_PAGE_SIZE:
+                    break
+                last_id = rows[-1]["id"]
+
+        pairs.sort(key=lambda pair: (datetime.fromisoformat(pair["remind_at"]), pair["task_id"]))
+        return pairs
+    
+    def find_all_parent_tasks(self, fields: str = "*", limit: Optional[int] = None,
+                              cursor: Optional[Tuple[str, int]] = None) -> list:
+        """
+        Find all parent tasks in the system, optionally keyset-paginated on (created_at, id).
+        """
+        query = self.client.table(TABLE).select(fields).is_("parent_task", None)
+        return self._paginate(query, limit, cursor).execute().data or []
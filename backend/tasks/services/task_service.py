@@ -1,14 +1,17 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, UTC, timedelta,timezone
 from dateutil import parser as dateparser
 from dateutil.relativedelta import relativedelta
 from models.task import Task
 from repo.supa_task_repo import SupabaseTaskRepo
-import requests
+from utils.parsing import encode_task_cursor
 import time
 import copy
 import calendar
 
+import service_client
+import notification_outbox
+
 class TaskService:
     def __init__(self, repo: Optional[SupabaseTaskRepo] = None):
         self.repo = repo or SupabaseTaskRepo()
@@ -37,46 +40,74 @@ class TaskService:
         return {"__status": 201, "Message": f"Task created! Task ID: {created.get('id')}", "data": created}
 
     # get tasks by user_id (in owner_id or collaborators) with nested subtasks
-    def get_by_user(self, user_id: int) -> Dict[str, Any]:
+    def get_by_user(self, user_id: int, fields: str = "*", limit: Optional[int] = None,
+                    cursor: Optional[Tuple[str, int]] = None) -> Dict[str, Any]:
 
         # Get only parent tasks for the user
-        parent_tasks = self.repo.find_parent_tasks_by_user(user_id)
+        parent_tasks = self.repo.find_parent_tasks_by_user(user_id, fields=fields, limit=limit, cursor=cursor)
         
-        # Check if no tasks found
-        if not parent_tasks:
+        # Check if no tasks found (an empty later page is not an error)
+        if not parent_tasks and cursor is None:
             return {"__status": 404, "Message": f"No tasks found for user ID {user_id}"}
         
-        # For each parent task, get its subtasks
+        # Load subtasks for all parent tasks in one query
+        if self._wants_subtasks(fields):
+            self._attach_subtasks(parent_tasks)
+        
+        result = {
+            "__status": 200,
+            "status": "success",
+            "data": parent_tasks
+        }
+        if limit is not None:
+            result["next_cursor"] = self._next_cursor(parent_tasks, limit)
+        return result
+
+    @staticmethod
+    def _wants_subtasks(fields: str) -> bool:
+        """Subtasks are only hydrated when the projection includes them."""
+        return fields == "*" or "subtasks" in fields.split(",")
+
+    @staticmethod
+    def _next_cursor(page: list, limit: int) -> Optional[str]:
+        """Cursor for the page after `page`, or None when this was the last page."""
+        if len(page) < limit:
+            return None
+        return encode_task_cursor(page[-1])
+
+    def _attach_subtasks(self, parent_tasks: list) -> list:
+        """
+        Replace each parent task's `subtasks` with its formatted subtask rows,
+        loaded for all parents with a single repo query.
+        """
+        if not parent_tasks:
+            return parent_tasks
+
+        subtasks_by_parent = self.repo.find_subtasks_by_parents([parent_task["id"] for parent_task in parent_tasks])
+
         for parent_task in parent_tasks:
-            parent_task_id = parent_task["id"]
-            subtasks = self.repo.find_subtasks_by_parent(parent_task_id)
-            
             # Format subtasks for frontend
             formatted_subtasks = []
-            for subtask in subtasks:
-                formatted_subtask = {
+            for subtask in subtasks_by_parent.get(parent_task["id"], []):
+                formatted_subtasks.append({
                     "id": subtask["id"],
-                    "task_name": subtask["task_name"], 
+                    "task_name": subtask["task_name"],
                     "description": subtask["description"],
-                    "due_date": subtask["due_date"],  
+                    "due_date": subtask["due_date"],
                     "status": subtask["status"],
                     "owner_id": subtask["owner_id"],
                     "collaborators": subtask["collaborators"] or [],
                     "project_id": subtask["project_id"],
                     "created_at": subtask["created_at"],
                     "parent_task": subtask["parent_task"],
-                    "type": subtask["type"]
-                }
-                formatted_subtasks.append(formatted_subtask)
-            
-            # Format parent task for frontend
+                    "type": "subtask",
+                    "priority": subtask.get("priority"),
+                    "attachments": subtask.get("attachments") or []
+                })
+
             parent_task["subtasks"] = formatted_subtasks
-        
-        return {
-            "__status": 200,
-            "status": "success",
-            "data": parent_tasks
-        }
+
+        return parent_tasks
 
     def update_status(self, task_id: int, new_status: str):
         updated = self.repo.update_task(task_id, {"status": new_status})
@@ -206,6 +237,36 @@ class TaskService:
         task = self.repo.get_task(task_id)
         return task
 
+    def get_tasks_batch(self, task_ids: List[int], fields: str = "*") -> Dict[str, Any]:
+        """
+        Get many tasks by ID in one lookup, in the order requested.
+
+        Returns 200 when every task was found, 207 with missing_tasks when some
+        were not, and 404 when none were.
+        """
+        found = self.repo.get_tasks(task_ids, fields)
+
+        tasks = []
+        missing_tasks = []
+        for task_id in dict.fromkeys(task_ids):
+            if task_id in found:
+                tasks.append(found[task_id])
+            else:
+                missing_tasks.append({"task_id": task_id, "error": "Task not found"})
+
+        response_data = {"tasks": tasks, "task_count": len(tasks)}
+        if not tasks:
+            response_data["missing_tasks"] = missing_tasks
+            return {"__status": 404, "Message": "None of the requested tasks were found", "data": response_data}
+        if missing_tasks:
+            response_data["missing_tasks"] = missing_tasks
+            return {
+                "__status": 207,
+                "Message": f"Retrieved {len(tasks)} tasks, {len(missing_tasks)} not found",
+                "data": response_data
+            }
+        return {"__status": 200, "Message": f"Retrieved {len(tasks)} tasks", "data": response_data}
+
     def _trigger_update_notifications(self, existing_task_data: Dict[str, Any], update_fields: Dict[str, Any], task_id: int):
         """
         Trigger consolidated notifications when specific task fields are updated.
@@ -328,15 +389,12 @@ class TaskService:
     def _send_consolidated_task_update_notification(self, task_id: int, collaborators: list, changes: list, updater_name: str):
         """Send consolidated notification for multiple task changes."""
         try:
-            response = requests.post("http://127.0.0.1:5006/notifications/triggers/task-consolidated-update",
-                                   json={
-                                       "task_id": task_id,
-                                       "user_ids": collaborators,
-                                       "changes": changes,
-                                       "updater_name": updater_name
-                                   })
-            if response.status_code not in [200, 201]:
-                print(f"Warning: Failed to send consolidated update notification: {response.status_code}")
+            notification_outbox.enqueue("/notifications/triggers/task-consolidated-update", {
+                "task_id": task_id,
+                "user_ids": collaborators,
+                "changes": changes,
+                "updater_name": updater_name
+            })
         except Exception as e:
             print(f"Warning: Failed to send consolidated update notification: {e}")
     
@@ -347,21 +405,18 @@ class TaskService:
             old_owner_name = "Previous Owner"
             if old_owner_id:
                 try:
-                    response = requests.get(f"http://127.0.0.1:5003/users/{old_owner_id}")
+                    response = service_client.get("users", f"/users/{old_owner_id}")
                     if response.status_code == 200:
                         user_data = response.json()
                         old_owner_name = user_data.get("data", {}).get("name", "Previous Owner")
                 except Exception:
                     pass  # Use default name if we can't fetch it
             
-            response = requests.post("http://127.0.0.1:5006/notifications/triggers/task-ownership-transfer", 
-                                   json={
-                                       "task_id": task_id,
-                                       "new_owner_id": new_owner_id,
-                                       "previous_owner_name": old_owner_name
-                                   })
-            if response.status_code not in [200, 201]:
-                print(f"Warning: Failed to send ownership transfer notification: {response.status_code}")
+            notification_outbox.enqueue("/notifications/triggers/task-ownership-transfer", {
+                "task_id": task_id,
+                "new_owner_id": new_owner_id,
+                "previous_owner_name": old_owner_name
+            })
         except Exception as e:
             print(f"Warning: Failed to send ownership transfer notification: {e}")
 
@@ -378,7 +433,7 @@ class TaskService:
             creator_name = "System"
             if owner_id:
                 try:
-                    response = requests.get(f"http://127.0.0.1:5003/users/{owner_id}")
+                    response = service_client.get("users", f"/users/{owner_id}")
                     if response.status_code == 200:
                         user_data = response.json()
                         creator_name = user_data.get("data", {}).get("name", "System")
@@ -389,14 +444,11 @@ class TaskService:
             collaborator_ids = [collab_id for collab_id in collaborators if collab_id != owner_id]
             
             if collaborator_ids:
-                response = requests.post("http://127.0.0.1:5006/notifications/triggers/task-collaborator-addition", 
-                                       json={
-                                           "task_id": task_id,
-                                           "collaborator_ids": collaborator_ids,
-                                           "creator_name": creator_name
-                                       })
-                if response.status_code not in [200, 201]:
-                    print(f"Warning: Failed to send collaborator notifications: {response.status_code}")
+                notification_outbox.enqueue("/notifications/triggers/task-collaborator-addition", {
+                    "task_id": task_id,
+                    "collaborator_ids": collaborator_ids,
+                    "creator_name": creator_name
+                })
         except Exception as e:
             print(f"Warning: Failed to send collaborator notifications: {e}")
 
@@ -429,7 +481,7 @@ class TaskService:
             # Try to get updater from request context or use owner as fallback
             if owner_id:
                 try:
-                    response = requests.get(f"http://127.0.0.1:5003/users/{owner_id}")
+                    response = service_client.get("users", f"/users/{owner_id}")
                     if response.status_code == 200:
                         user_data = response.json()
                         updater_name = user_data.get("data", {}).get("name", "System")
@@ -439,14 +491,11 @@ class TaskService:
             # Send notifications to newly added collaborators
             collaborator_ids = list(newly_added_collaborators)
             if collaborator_ids:
-                response = requests.post("http://127.0.0.1:5006/notifications/triggers/task-collaborator-addition", 
-                                       json={
-                                           "task_id": task_id,
-                                           "collaborator_ids": collaborator_ids,
-                                           "creator_name": updater_name
-                                       })
-                if response.status_code not in [200, 201]:
-                    print(f"Warning: Failed to send collaborator addition notifications: {response.status_code}")
+                notification_outbox.enqueue("/notifications/triggers/task-collaborator-addition", {
+                    "task_id": task_id,
+                    "collaborator_ids": collaborator_ids,
+                    "creator_name": updater_name
+                })
         except Exception as e:
             print(f"Warning: Failed to send collaborator addition notifications: {e}")
 
@@ -577,22 +626,31 @@ class TaskService:
             return {"__status": 400, "Message": "project_id must be an integer"}
         
         updated_tasks = []
-        failed_updates = []
         
-        for task_id in task_ids:
+        # Check which tasks exist with one lookup
+        try:
+            existing_tasks = self.repo.get_tasks(task_ids, "id")
+        except Exception as e:
+            return {"__status": 500, "Message": f"Failed to look up tasks: {str(e)}"}
+        
+        found_ids = [task_id for task_id in task_ids if task_id in existing_tasks]
+        failed_updates = [
+            {"task_id": task_id, "error": "Task not found"}
+            for task_id in task_ids if task_id not in existing_tasks
+        ]
+        
+        # Set project_id on every existing task in a single statement
+        if found_ids:
             try:
-                # Check if task exists
-                existing_task = self.repo.get_task(task_id)
-                if not existing_task:
-                    failed_updates.append({"task_id": task_id, "error": "Task not found"})
-                    continue
-                
-                # Update the task's project_id
-                updated_task = self.repo.update_task(task_id, {"project_id": project_id})
-                updated_tasks.append(updated_task)
-                
+                updated_by_id = {task["id"]: task for task in self.repo.update_tasks(found_ids, {"project_id": project_id})}
             except Exception as e:
-                failed_updates.append({"task_id": task_id, "error": str(e)})
+                failed_updates.extend({"task_id": task_id, "error": str(e)} for task_id in found_ids)
+            else:
+                for task_id in found_ids:
+                    if task_id in updated_by_id:
+                        updated_tasks.append(updated_by_id[task_id])
+                    else:
+                        failed_updates.append({"task_id": task_id, "error": "Update failed — no data returned"})
         
         # Prepare response
         total_tasks = len(task_ids)
@@ -667,15 +725,17 @@ class TaskService:
         subtask_details = []
         failed_subtasks = []
         
-        for subtask_id in subtask_ids:
-            try:
-                subtask = self.repo.get_task(subtask_id)
+        try:
+            found = self.repo.get_tasks(subtask_ids)
+        except Exception as e:
+            failed_subtasks = [{"subtask_id": subtask_id, "error": str(e)} for subtask_id in subtask_ids]
+        else:
+            for subtask_id in subtask_ids:
+                subtask = found.get(subtask_id)
                 if subtask:
                     subtask_details.append(subtask)
                 else:
                     failed_subtasks.append({"subtask_id": subtask_id, "error": "Subtask not found"})
-            except Exception as e:
-                failed_subtasks.append({"subtask_id": subtask_id, "error": str(e)})
         
         # Prepare response
         if not subtask_details:
@@ -718,33 +778,8 @@ class TaskService:
             # Get all parent tasks for team members
             parent_tasks = self.repo.find_parent_tasks_by_team(team_id)
             
-            # For each parent task, get its subtasks
-            for parent_task in parent_tasks:
-                parent_task_id = parent_task["id"]
-                subtasks = self.repo.find_subtasks_by_parent(parent_task_id)
-                
-                # Format subtasks for frontend
-                formatted_subtasks = []
-                for subtask in subtasks:
-                    formatted_subtask = {
-                        "id": subtask["id"],
-                        "task_name": subtask["task_name"], 
-                        "description": subtask["description"],
-                        "due_date": subtask["due_date"],  
-                        "status": subtask["status"],
-                        "owner_id": subtask["owner_id"],
-                        "collaborators": subtask["collaborators"] or [],
-                        "project_id": subtask["project_id"],
-                        "created_at": subtask["created_at"],
-                        "parent_task": subtask["parent_task"],
-                        "type": "subtask",
-                        "priority": subtask["priority"],
-                        "attachments": subtask["attachments"] or []
-                    }
-                    formatted_subtasks.append(formatted_subtask)
-                
-                # Add subtasks to parent task
-                parent_task["subtasks"] = formatted_subtasks
+            # Load subtasks for all parent tasks in one query
+            self._attach_subtasks(parent_tasks)
             
             if not parent_tasks:
                 return {
@@ -773,33 +808,8 @@ class TaskService:
             # Get all parent tasks for department members
             parent_tasks = self.repo.find_parent_tasks_by_department(dept_id)
             
-            # For each parent task, get its subtasks
-            for parent_task in parent_tasks:
-                parent_task_id = parent_task["id"]
-                subtasks = self.repo.find_subtasks_by_parent(parent_task_id)
-                
-                # Format subtasks for frontend
-                formatted_subtasks = []
-                for subtask in subtasks:
-                    formatted_subtask = {
-                        "id": subtask["id"],
-                        "task_name": subtask["task_name"], 
-                        "description": subtask["description"],
-                        "due_date": subtask["due_date"],  
-                        "status": subtask["status"],
-                        "owner_id": subtask["owner_id"],
-                        "collaborators": subtask["collaborators"] or [],
-                        "project_id": subtask["project_id"],
-                        "created_at": subtask["created_at"],
-                        "parent_task": subtask["parent_task"],
-                        "type": "subtask",
-                        "priority": subtask["priority"],
-                        "attachments": subtask["attachments"] or []
-                    }
-                    formatted_subtasks.append(formatted_subtask)
-                
-                # Add subtasks to parent task
-                parent_task["subtasks"] = formatted_subtasks
+            # Load subtasks for all parent tasks in one query
+            self._attach_subtasks(parent_tasks)
             
             if not parent_tasks:
                 return {
@@ -852,6 +862,73 @@ class TaskService:
                 "data": []
             }
         
+    def get_due_reminders(self, today, max_days_ahead: int = 7) -> Dict[str, Any]:
+        """
+        Get the deadline reminders due on `today`, one entry per (task, interval) pair.
+        
+        Args:
+            today: Date the reminders are for
+            max_days_ahead: Largest reminder interval to consider
+            
+        Returns:
+            Dict with status, message, and reminder data
+        """
+        try:
+            reminders = self.repo.find_due_reminders(today, max_days_ahead)
+            
+            if not reminders:
+                return {
+                    "__status": 404,
+                    "Message": f"No deadline reminders due on {today.isoformat()}",
+                    "data": []
+                }
+            
+            return {
+                "__status": 200,
+                "Message": f"Successfully retrieved {len(reminders)} deadline reminders due on {today.isoformat()}",
+                "data": reminders
+            }
+        except Exception as e:
+            return {
+                "__status": 500,
+                "Message": f"Error retrieving due reminders: {str(e)}",
+                "data": []
+            }
+        
+    def get_reminders_between(self, start, end, max_days_ahead: int = 7) -> Dict[str, Any]:
+        """
+        Get the deadline reminders whose instant (due date minus interval) falls in [start, end).
+        
+        Args:
+            start, end: Timezone-aware bounds of the window
+            max_days_ahead: Largest reminder interval to consider
+            
+        Returns:
+            Dict with status, message, and reminder data
+        """
+        try:
+            reminders = self.repo.find_reminders_between(start, end, max_days_ahead)
+            
+            if not reminders:
+                return {
+                    "__status": 404,
+                    "Message": f"No deadline reminders due between {start.isoformat()} and {end.isoformat()}",
+                    "data": []
+                }
+            
+            return {
+                "__status": 200,
+                "Message": f"Successfully retrieved {len(reminders)} deadline reminders due between "
+                           f"{start.isoformat()} and {end.isoformat()}",
+                "data": reminders
+            }
+        except Exception as e:
+            return {
+                "__status": 500,
+                "Message": f"Error retrieving due reminders: {str(e)}",
+                "data": []
+            }
+        
     def _generate_next_occurrence(self, completed_task: dict):
         """
         Automatically generate the next task occurrence based on recurrence frequency.
@@ -985,9 +1062,10 @@ class TaskService:
                 new_subtask_ids = []
 
                 original_subtask_ids = completed_task.get("subtasks") or []
+                original_subtasks = self.repo.get_tasks(original_subtask_ids) if original_subtask_ids else {}
 
                 for orig_id in original_subtask_ids:
-                    orig = self.repo.get_task(orig_id)
+                    orig = original_subtasks.get(orig_id)
                     if not orig:
                         print(f"⚠️ Original subtask {orig_id} not found, skipping")
                         continue
@@ -1092,49 +1170,33 @@ class TaskService:
         
         return subtask_payload
     
-    def get_all_tasks(self) -> Dict[str, Any]:
+    def get_all_tasks(self, fields: str = "*", limit: Optional[int] = None,
+                      cursor: Optional[Tuple[str, int]] = None) -> Dict[str, Any]:
         """
         Get all tasks for all users (including subtasks).
+        Pass limit/cursor for keyset pagination and fields for column projection.
         """
         try:
-            parent_tasks = self.repo.find_all_parent_tasks()
-
-            for parent_task in parent_tasks:
-                parent_task_id = parent_task["id"]
-                subtasks = self.repo.find_subtasks_by_parent(parent_task_id)
-
-                formatted_subtasks = []
-                for subtask in subtasks:
-                    formatted_subtasks.append({
-                        "id": subtask["id"],
-                        "task_name": subtask["task_name"],
-                        "description": subtask["description"],
-                        "due_date": subtask["due_date"],
-                        "status": subtask["status"],
-                        "owner_id": subtask["owner_id"],
-                        "collaborators": subtask["collaborators"] or [],
-                        "project_id": subtask["project_id"],
-                        "created_at": subtask["created_at"],
-                        "parent_task": subtask["parent_task"],
-                        "type": "subtask",
-                        "priority": subtask["priority"],
-                        "attachments": subtask["attachments"] or []
-                    })
+            parent_tasks = self.repo.find_all_parent_tasks(fields=fields, limit=limit, cursor=cursor)
 
-                parent_task["subtasks"] = formatted_subtasks
+            if self._wants_subtasks(fields):
+                self._attach_subtasks(parent_tasks)
 
-            if not parent_tasks:
+            if not parent_tasks and cursor is None:
                 return {
                     "__status": 404,
                     "Message": "No tasks found",
                     "data": []
                 }
 
-            return {
+            result = {
                 "__status": 200,
                 "Message": f"Successfully retrieved {len(parent_tasks)} tasks",
                 "data": parent_tasks
             }
+            if limit is not None:
+                result["next_cursor"] = self._next_cursor(parent_tasks, limit)
+            return result
 
         except Exception as e:
             return {
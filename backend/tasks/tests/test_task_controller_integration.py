@@ -3,9 +3,12 @@ import json
 import sys
 import os
 from io import BytesIO
+from unittest.mock import patch
 
 # Add parent directory to path to find modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.task_service import TaskService
 from models.task import Task
 from repo.supa_task_repo import SupabaseTaskRepo
@@ -957,6 +960,44 @@ class TestTaskControllerIntegration(unittest.TestCase):
         self.assertIn("subtasks", parent_task)
         self.assertEqual(len(parent_task["subtasks"]), 1)
 
+    def test_get_tasks_by_user_paginated_with_fields(self):
+        """Test cursor pagination and field projection on user tasks."""
+        # Clean up any existing test data first
+        self.cleanup_test_data()
+        
+        for i in range(3):
+            create_response = self.client.post('/tasks/manager-task/create', json={
+                "owner_id": 297,
+                "task_name": f"Paged Task {i}",
+                "description": "Description"
+            })
+            self.assertEqual(create_response.status_code, 201)
+        
+        # First page
+        response = self.client.get('/tasks/user-task/297?limit=2&fields=task_name,status')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(len(data["data"]), 2)
+        self.assertIsNotNone(data["next_cursor"])
+        self.assertNotIn("description", data["data"][0])
+        self.assertIn("id", data["data"][0])
+        
+        # Second page holds the remaining task
+        response = self.client.get(f'/tasks/user-task/297?limit=2&fields=task_name,status&cursor={data["next_cursor"]}')
+        self.assertEqual(response.status_code, 200)
+        page2 = json.loads(response.data)
+        self.assertEqual(len(page2["data"]), 1)
+        self.assertIsNone(page2["next_cursor"])
+        first_ids = {task["id"] for task in data["data"]}
+        self.assertNotIn(page2["data"][0]["id"], first_ids)
+
+    def test_get_tasks_by_user_invalid_fields(self):
+        """Test unknown projection fields are rejected."""
+        response = self.client.get('/tasks/user-task/297?fields=not_a_column')
+        self.assertEqual(response.status_code, 400)
+        data = json.loads(response.data)
+        self.assertIn("Unknown fields", data["Message"])
+
     def test_get_tasks_by_user_not_found(self):
         """Test get tasks by user when no tasks found."""
         # Clean up any existing test data first
@@ -972,6 +1013,192 @@ class TestTaskControllerIntegration(unittest.TestCase):
         self.assertIn("No tasks found", data["Message"])
         self.assertIn("999", data["Message"])
 
+    # ==================== find_parent_tasks_by_members Tests ====================
+
+    def test_find_parent_tasks_by_members_set_based(self):
+        """Test member task lookup returns owned and collaborated tasks in constant round trips."""
+        # Clean up any existing test data first
+        self.cleanup_test_data()
+
+        owned_response = self.client.post('/tasks/manager-task/create', json={
+            "owner_id": 297,
+            "task_name": "Member Owned Task",
+            "description": "Owned by 297"
+        })
+        self.assertEqual(owned_response.status_code, 201)
+        owned_id = json.loads(owned_response.data)["data"]["id"]
+
+        collab_response = self.client.post('/tasks/manager-task/create', json={
+            "owner_id": 999,
+            "task_name": "Member Collab Task",
+            "description": "297 collaborates",
+            "collaborators": [297, 102]
+        })
+        self.assertEqual(collab_response.status_code, 201)
+        collab_id = json.loads(collab_response.data)["data"]["id"]
+
+        with patch.object(self.repo.client, "table", wraps=self.repo.client.table) as table:
+            tasks = self.repo.find_parent_tasks_by_members([297, 102, 103])
+
+        task_ids = [task["id"] for task in tasks]
+        self.assertIn(owned_id, task_ids)
+        self.assertIn(collab_id, task_ids)
+        # Deduplicated even though the collab task matches two members
+        self.assertEqual(len(task_ids), len(set(task_ids)))
+        # One owner query + one collaborator query for the whole member list
+        self.assertEqual(table.call_count, 2)
+
+    def test_find_subtasks_by_parents_groups_by_parent(self):
+        """Test batched subtask lookup groups subtasks under each requested parent."""
+        # Clean up any existing test data first
+        self.cleanup_test_data()
+
+        parent_ids = []
+        for name in ("Batch Parent 1", "Batch Parent 2"):
+            parent_response = self.client.post('/tasks/manager-task/create', json={
+                "owner_id": 297,
+                "task_name": name,
+                "description": "Parent"
+            })
+            self.assertEqual(parent_response.status_code, 201)
+            parent_ids.append(json.loads(parent_response.data)["data"]["id"])
+
+        subtask_response = self.client.post('/tasks/manager-subtask/create', json={
+            "owner_id": 297,
+            "task_name": "Batch Subtask",
+            "description": "Sub desc",
+            "parent_task": parent_ids[0]
+        })
+        self.assertEqual(subtask_response.status_code, 201)
+
+        grouped = self.repo.find_subtasks_by_parents(parent_ids)
+
+        self.assertEqual(len(grouped[parent_ids[0]]), 1)
+        self.assertEqual(grouped[parent_ids[0]][0]["task_name"], "Batch Subtask")
+        self.assertEqual(grouped[parent_ids[1]], [])
+
+    # ==================== get_tasks_batch Tests ====================
+
+    def test_get_tasks_batch_reports_missing_ids(self):
+        """Test bulk fetch returns found tasks in order and lists missing IDs with 207."""
+        # Clean up any existing test data first
+        self.cleanup_test_data()
+
+        task_ids = []
+        for name in ("Batch Fetch 1", "Batch Fetch 2"):
+            create_response = self.client.post('/tasks/manager-task/create', json={
+                "owner_id": 297,
+                "task_name": name,
+                "description": "Batch fetch"
+            })
+            self.assertEqual(create_response.status_code, 201)
+            task_ids.append(json.loads(create_response.data)["data"]["id"])
+
+        ids = [task_ids[1], 99999999, task_ids[0]]
+        response = self.client.get(f'/tasks/batch?ids={",".join(str(i) for i in ids)}&fields=task_name')
+
+        self.assertEqual(response.status_code, 207)
+        data = json.loads(response.data)["data"]
+        self.assertEqual([task["id"] for task in data["tasks"]], [task_ids[1], task_ids[0]])
+        self.assertNotIn("description", data["tasks"][0])
+        self.assertEqual(data["missing_tasks"], [{"task_id": 99999999, "error": "Task not found"}])
+
+    def test_get_tasks_batch_invalid_ids(self):
+        """Test bulk fetch rejects missing or non-integer ids."""
+        self.assertEqual(self.client.get('/tasks/batch').status_code, 400)
+        self.assertEqual(self.client.get('/tasks/batch?ids=1,abc').status_code, 400)
+
+    # ==================== get_due_reminders Tests ====================
+
+    def test_get_due_reminders_honours_reminder_intervals(self):
+        """Test only tasks due on one of their own reminder intervals are returned."""
+        from datetime import date, timedelta
+
+        # Clean up any existing test data first
+        self.cleanup_test_data()
+
+        today = date.today()
+        due_date = (today + timedelta(days=3)).isoformat()
+        task_ids = {}
+        for name, intervals in (("Reminder Due", "5,3"), ("Reminder Not Due", "7,1")):
+            create_response = self.client.post('/tasks/manager-task/create', json={
+                "owner_id": 297,
+                "task_name": name,
+                "description": "Due reminders",
+                "due_date": due_date,
+                "reminder_intervals": intervals
+            })
+            self.assertEqual(create_response.status_code, 201)
+            task_ids[name] = json.loads(create_response.data)["data"]["id"]
+
+        response = self.client.get(f'/tasks/due-reminders?date={today.isoformat()}&max_days_ahead=7')
+
+        self.assertEqual(response.status_code, 200)
+        reminders = {r["task_id"]: r for r in json.loads(response.data)["data"]}
+        self.assertEqual(reminders[task_ids["Reminder Due"]]["reminder_days"], 3)
+        self.assertNotIn(task_ids["Reminder Not Due"], reminders)
+        self.assertEqual(set(reminders[task_ids["Reminder Due"]]),
+                         {"task_id", "task_name", "due_date", "reminder_days"})
+
+    def test_get_due_reminders_in_time_window(self):
+        """Test from/to returns reminders whose instant (due date minus interval) is in the window."""
+        from datetime import datetime, timedelta, timezone
+
+        # Clean up any existing test data first
+        self.cleanup_test_data()
+
+        remind_at = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(hours=2)
+        create_response = self.client.post('/tasks/manager-task/create', json={
+            "owner_id": 297,
+            "task_name": "Reminder Window",
+            "description": "Due reminders",
+            "due_date": (remind_at + timedelta(days=1)).isoformat(),
+            "reminder_intervals": "1"
+        })
+        self.assertEqual(create_response.status_code, 201)
+        task_id = json.loads(create_response.data)["data"]["id"]
+
+        window = {"from": (remind_at - timedelta(minutes=30)).isoformat(),
+                  "to": (remind_at + timedelta(minutes=30)).isoformat()}
+        response = self.client.get('/tasks/due-reminders', query_string=window)
+
+        self.assertEqual(response.status_code, 200)
+        reminders = {r["task_id"]: r for r in json.loads(response.data)["data"]}
+        self.assertEqual(reminders[task_id]["reminder_days"], 1)
+        self.assertEqual(datetime.fromisoformat(reminders[task_id]["remind_at"]), remind_at)
+
+    def test_get_due_reminders_invalid_query(self):
+        """Test invalid date or max_days_ahead is rejected."""
+        self.assertEqual(self.client.get('/tasks/due-reminders?date=18-10-2026').status_code, 400)
+        self.assertEqual(self.client.get('/tasks/due-reminders?max_days_ahead=1000').status_code, 400)
+        self.assertEqual(self.client.get('/tasks/due-reminders?from=2026-10-18T00:00:00Z').status_code, 400)
+
+    # ==================== bulk_update_project_id Tests ====================
+
+    def test_bulk_update_project_id_partial(self):
+        """Test bulk project update patches existing tasks and reports missing IDs with 207."""
+        # Clean up any existing test data first
+        self.cleanup_test_data()
+
+        create_response = self.client.post('/tasks/manager-task/create', json={
+            "owner_id": 297,
+            "task_name": "Bulk Project Task",
+            "description": "Bulk project update"
+        })
+        self.assertEqual(create_response.status_code, 201)
+        task_id = json.loads(create_response.data)["data"]["id"]
+
+        response = self.client.post('/tasks/update-project/bulk', json={
+            "task_ids": [task_id, 99999999],
+            "project_id": 1
+        })
+
+        self.assertEqual(response.status_code, 207)
+        data = json.loads(response.data)["data"]
+        self.assertEqual([task["id"] for task in data["updated_tasks"]], [task_id])
+        self.assertEqual(data["updated_tasks"][0]["project_id"], 1)
+        self.assertEqual(data["failed_details"], [{"task_id": 99999999, "error": "Task not found"}])
+
     # ==================== get_tasks_by_project Tests ====================
     
     def test_get_tasks_by_project_success(self):
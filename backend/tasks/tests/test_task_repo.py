@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add parent directory to path to find modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from postgrest._sync.request_builder import SyncQueryRequestBuilder
+from repo.supa_task_repo import SupabaseTaskRepo
+
+
+class TestTaskRepoFilters(unittest.TestCase):
+    """Query strings the repo sends to PostgREST, built by the real Supabase client."""
+
+    def setUp(self):
+        self.repo = SupabaseTaskRepo()
+        self.sent = []
+
+        def execute(builder):
+            self.sent.append(dict(builder.request.params))
+            return MagicMock(data=[])
+
+        patcher = patch.object(SyncQueryRequestBuilder, "execute", autospec=True, side_effect=execute)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _baseline_contains(self, user_id):
+        """Encoding of the original .filter("collaborators", "cs", [user_id]) (jsonb containment)"""
+        return dict(self.repo.client.table("task").select("*").filter("collaborators", "cs", [user_id]).request.params)
+
+    def test_member_lookup_keeps_the_jsonb_containment_encoding(self):
+        """Test one query per chunk checks each member with the same cs.[id] term as the baseline"""
+        self.repo.find_parent_tasks_by_members([5, 12])
+
+        owner_query, collaborator_query = self.sent
+        self.assertEqual(owner_query["owner_id"], "in.(5,12)")
+        self.assertEqual(self._baseline_contains(5)["collaborators"], "cs.[5]")
+        self.assertEqual(collaborator_query["or"], "(collaborators.cs.[5],collaborators.cs.[12])")
+
+    def test_user_lookup_matches_owner_or_jsonb_collaborator(self):
+        """Test owner and collaborator matches share one or_ using the baseline cs.[id] encoding"""
+        self.repo.find_parent_tasks_by_user(5, limit=10)
+
+        self.assertEqual(self.sent[0]["or"], "(owner_id.eq.5,collaborators.cs.[5])")
+        self.assertEqual(self.sent[0]["limit"], "10")
+
+    def test_due_reminders_check_intervals_with_jsonb_containment(self):
+        """Test each interval is matched with reminder_intervals.cs.[n], falling back to null for defaults"""
+        start = datetime(2026, 10, 18, tzinfo=timezone.utc)
+        self.repo.find_reminders_between(start, start.replace(day=19), max_days_ahead=2)
+
+        clauses = self.sent[0]["or"]
+        self.assertIn("reminder_intervals.cs.[0]", clauses)
+        self.assertIn("or(reminder_intervals.cs.[1],reminder_intervals.is.null)", clauses)
+        self.assertNotIn("{", clauses)
+
+
+if __name__ == '__main__':
+    unittest.main()
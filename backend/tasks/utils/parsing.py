@@ -1,4 +1,7 @@
-from typing import Dict, Any, List
+import base64
+import json
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
 from dateutil import parser as dateparser
 
 def parse_task_payload(form_or_json: Dict[str, Any]) -> Dict[str, Any]:
@@ -236,3 +239,140 @@ def parse_recurrence_fields(form_or_json: Dict[str, Any]) -> Dict[str, Any]:
         "recurrence_interval_days": recurrence_interval_days
     }
 
+
+# ---- List Query Parsing (pagination + projection) ----
+TASK_COLUMNS = {
+    "id", "owner_id", "task_name", "due_date", "description", "collaborators", "status",
+    "project_id", "parent_task", "type", "subtasks", "attachments", "created_at",
+    "completed_at", "priority", "recurrence_type", "recurrence_end_date",
+    "recurrence_interval_days", "reminder_intervals"
+}
+MAX_PAGE_LIMIT = 500
+MAX_BATCH_IDS = 500
+MAX_REMINDER_DAYS_AHEAD = 365
+MAX_REMINDER_WINDOW_DAYS = 7
+
+def encode_task_cursor(task: Dict[str, Any]) -> str:
+    """
+    Build an opaque keyset cursor from the (created_at, id) of the last task on a page.
+    """
+    raw = json.dumps([task["created_at"], task["id"]])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_task_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_task_cursor back into (created_at, id).
+    """
+    try:
+        created_at, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return str(created_at), int(task_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: '{cursor}'")
+
+def _parse_task_fields(fields_raw: Optional[str]) -> str:
+    """
+    Turn a comma-separated fields parameter into a select string; id and
+    created_at are always included. Defaults to "*".
+    """
+    if not fields_raw:
+        return "*"
+    requested = [f.strip() for f in fields_raw.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in TASK_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {unknown}")
+    columns = ["id", "created_at"] + [f for f in requested if f not in ("id", "created_at")]
+    return ",".join(dict.fromkeys(columns))
+
+def parse_task_list_query(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse the optional fields / limit / cursor query parameters of task list endpoints.
+
+    - fields: comma-separated task columns; id and created_at are always included
+      so pages can be chained and subtasks attached. Defaults to "*".
+    - limit: page size (1..MAX_PAGE_LIMIT). Omit for the full, unpaginated list.
+    - cursor: next_cursor value returned by the previous page.
+    """
+    g = args.get
+
+    fields = _parse_task_fields(g("fields"))
+
+    limit = None
+    limit_raw = g("limit")
+    if limit_raw not in (None, ""):
+        try:
+            limit = int(limit_raw)
+        except (TypeError, ValueError):
+            raise ValueError("limit must be an integer")
+        if limit < 1 or limit > MAX_PAGE_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+
+    cursor_raw = g("cursor")
+    cursor = decode_task_cursor(cursor_raw) if cursor_raw else None
+
+    return {"fields": fields, "limit": limit, "cursor": cursor}
+
+def parse_task_batch_query(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse the ids / fields query parameters of the bulk task fetch.
+
+    - ids: comma-separated task IDs (1..MAX_BATCH_IDS), required
+    - fields: same projection as parse_task_list_query
+    """
+    ids_raw = args.get("ids") or ""
+    try:
+        ids = [int(part) for part in ids_raw.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("ids must be a comma-separated list of integers")
+    if not ids:
+        raise ValueError("ids is required")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids can be requested at once")
+
+    return {"ids": ids, "fields": _parse_task_fields(args.get("fields"))}
+
+
+def parse_due_reminders_query(args: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parse the query parameters of the due-reminder lookup.
+
+    - date: YYYY-MM-DD the reminders are for, defaults to today
+    - from, to: ISO timestamps bounding the reminder instants instead of a whole day
+      (both required together, at most MAX_REMINDER_WINDOW_DAYS apart; naive values are UTC)
+    - max_days_ahead: largest reminder interval to consider (0..MAX_REMINDER_DAYS_AHEAD), defaults to 7
+
+    Returns {"today", "start", "end", "max_days_ahead"}; start/end are None for a date lookup.
+    """
+    try:
+        max_days_ahead = int(args.get("max_days_ahead", 7))
+    except (TypeError, ValueError):
+        raise ValueError("max_days_ahead must be an integer")
+    if max_days_ahead < 0 or max_days_ahead > MAX_REMINDER_DAYS_AHEAD:
+        raise ValueError(f"max_days_ahead must be between 0 and {MAX_REMINDER_DAYS_AHEAD}")
+
+    start_raw = (args.get("from") or "").strip()
+    end_raw = (args.get("to") or "").strip()
+    if start_raw or end_raw:
+        if not (start_raw and end_raw):
+            raise ValueError("from and to must be given together")
+        try:
+            start, end = dateparser.isoparse(start_raw), dateparser.isoparse(end_raw)
+        except (ValueError, OverflowError):
+            raise ValueError("from and to must be ISO 8601 timestamps")
+        start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+        if end <= start:
+            raise ValueError("to must be after from")
+        if end - start > timedelta(days=MAX_REMINDER_WINDOW_DAYS):
+            raise ValueError(f"from and to must be at most {MAX_REMINDER_WINDOW_DAYS} days apart")
+        return {"today": None, "start": start, "end": end, "max_days_ahead": max_days_ahead}
+
+    date_raw = (args.get("date") or "").strip()
+    if date_raw:
+        try:
+            today = date.fromisoformat(date_raw)
+        except ValueError:
+            raise ValueError("date must be in YYYY-MM-DD format")
+    else:
+        today = datetime.now().date()
+
+    return {"today": today, "start": None, "end": None, "max_days_ahead": max_days_ahead}
@@ -5,6 +5,8 @@ import os
 
 # Add parent directory to path to find modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.team_service import TeamService
 from models.team import Team
 from repo.supa_team_repo import SupabaseTeamRepo
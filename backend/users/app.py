@@ -1,8 +1,13 @@
 import os
+import sys
 from flask import Flask
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+# Make the shared backend modules (supabase_client, service_client, notification_outbox)
+# importable for this service's repos and services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 load_dotenv()
 
 def create_app():
@@ -10,9 +15,12 @@ def create_app():
     CORS(app, origins=os.getenv("CORS_ORIGINS", "*").split(","), supports_credentials=True)
 
     # Register routes
-    from controllers.user_controller import user_bp
+    from controllers.user_controller import user_bp, service
     app.register_blueprint(user_bp)
 
+    # Load the autocomplete / mention index before the first request needs it
+    service.search_index.refresh_in_background()
+
     return app
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+"""
+Benchmark: user autocomplete latency on a large user table.
+
+"scan" repeats what search_users used to do once the rows had arrived: take
+every user whose email contains the query, build a User for each and stop
+at the limit. "index" answers the same keystrokes from UserSearchIndex.
+Both run in-process against --users generated users, so the numbers leave out
+the database round trip the scan also paid on every keystroke.
+
+    python bench_user_autocomplete.py                       # 100k users, 2000 keystrokes, limit 5
+    python bench_user_autocomplete.py --users 250000 --limit 10
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+import uuid
+from typing import Any, Dict, List
+
+from models.user import User
+from services.user_search_index import UserSearchIndex
+
+FIRST_NAMES = ["Alice", "Bob", "Carol", "David", "Erin", "Farah", "Gavin", "Hana", "Ivan", "Jia",
+               "Kumar", "Lena", "Marcus", "Nora", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tan"]
+LAST_NAMES = ["Smith", "Tan", "Lee", "Garcia", "Ng", "Kowalski", "Okafor", "Rossi", "Sato", "Weber"]
+
+
+def _generate_users(count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    users = []
+    for userid in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        users.append({
+            "id": str(uuid.UUID(int=userid)), "userid": userid, "role": "staff",
+            "name": f"{first} {last}", "email": f"{first}.{last}{userid}@example.com".lower(),
+            "team_id": userid % 50, "dept_id": userid % 8,
+            "notification_preferences": {"in_app": True, "email": True},
+        })
+    return users
+
+
+def _scan(users: List[Dict[str, Any]], query: str, limit: int) -> List[Dict[str, Any]]:
+    """The previous search_users, minus the database call."""
+    matches = [user for user in users if query.lower() in user["email"].lower()]
+    found = []
+    for user_data in matches:
+        if len(found) >= limit:
+            break
+        user_dict = User(**user_data).__dict__
+        user_dict["username"] = user_data["email"].split("@")[0]
+        found.append(user_dict)
+    return found
+
+
+def _keystrokes(users: List[Dict[str, Any]], count: int, rng: random.Random) -> List[str]:
+    """Prefixes typed while looking for a user: 1-6 characters of a username or name word"""
+    queries = []
+    while len(queries) < count:
+        user = rng.choice(users)
+        word = rng.choice([user["email"].split("@")[0], *user["name"].lower().split()])
+        queries.extend(word[:length] for length in range(1, min(len(word), 6) + 1))
+    queries = queries[:count]
+    # A few misses, as typos produce
+    queries[::50] = ["".join(rng.choices(string.ascii_lowercase, k=4)) for _ in queries[::50]]
+    return queries
+
+
+def _report(label: str, timings: List[float]) -> None:
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"{label:<6} p50 {statistics.median(timings):9.3f} ms   p99 {p99:9.3f} ms   max {timings[-1]:9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100000, help="rows in the user table")
+    parser.add_argument("--keystrokes", type=int, default=2000, help="searches per variant")
+    parser.add_argument("--limit", type=int, default=5, help="suggestions per search")
+    parser.add_argument("--scan-keystrokes", type=int, default=200, help="searches for the slow scan baseline")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    users = _generate_users(args.users, rng)
+    queries = _keystrokes(users, args.keystrokes, rng)
+
+    index = UserSearchIndex(lambda: users)
+    start = time.perf_counter()
+    index.refresh()
+    print(f"{args.users} users, limit {args.limit}; index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for label, search, sample in (
+        ("scan", lambda q: _scan(users, q, args.limit), queries[:args.scan_keystrokes]),
+        ("index", lambda q: index.search(q, args.limit), queries),
+    ):
+        timings = []
+        for query in sample:
+            begin = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - begin) * 1000)
+        _report(label, timings)
+
+    start = time.perf_counter()
+    index.upsert({"userid": args.users + 1, "name": "New Hire", "email": "new.hire@example.com", "role": "staff"})
+    print(f"upsert of one new user: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
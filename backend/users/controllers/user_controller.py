@@ -45,6 +45,48 @@ def create_user():
     except Exception as e:
         return jsonify({"error": str(e), "status": 500}), 500
 
+@user_bp.route("/users", methods=["GET"])
+def get_users_by_userids():
+    """
+    Get many users by userid in one request.
+
+    Query Parameters:
+        ids (str): Comma-separated userids, e.g. ?ids=1,2,3 (at most 500)
+        fields (str): Optional comma-separated columns to return, e.g. ?fields=name,email
+                      (userid is always included)
+
+    Returns:
+    {
+        "message": "Retrieved {count} user(s)",
+        "data": [ ... list of users ... ],
+        "missing": [ ... userids that were not found ... ],
+        "status": 200
+    }
+
+    Responses:
+        200: Users returned (unknown userids are listed in "missing")
+        400: Missing or invalid ids / fields
+        500: Internal Server Error
+    """
+    try:
+        raw_ids = request.args.get("ids", "").strip()
+        try:
+            userids = [int(part) for part in raw_ids.split(",") if part.strip()]
+        except ValueError:
+            return jsonify({"error": "ids must be a comma-separated list of integers", "status": 400}), 400
+
+        raw_fields = request.args.get("fields", "").strip()
+        fields = [part.strip() for part in raw_fields.split(",") if part.strip()] or None
+
+        result = service.get_users_by_userids(userids, fields)
+        status_code = result.pop("status", 200)
+
+        return jsonify(result), status_code
+
+    except Exception as e:
+        return jsonify({"error": str(e), "status": 500}), 500
+
+
 @user_bp.route("/users/<int:userid>", methods=["GET"])
 def get_user_by_userid(userid: int):
     """
@@ -113,6 +155,76 @@ def search_users():
     except Exception as e:
         return jsonify({"error": str(e), "status": 500}), 500
 
+@user_bp.route("/users/autocomplete", methods=["GET"])
+def autocomplete_users():
+    """
+    Prefix suggestions for @mentions and user pickers, served from an in-memory index.
+    
+    Query parameters:
+    - q: Prefix of a username, email, name or word of a name
+    - limit: Maximum number of results (default: 10, max: 50)
+    
+    Returns:
+    {
+        "data": [ {"userid": ..., "name": ..., "email": ..., "role": ..., "username": ...}, ... ],
+        "status": 200
+    }
+    
+    Responses:
+        200: Matching users returned (possibly none)
+        400: Missing query or invalid limit
+        500: Internal Server Error
+    """
+    try:
+        prefix = request.args.get("q", "").strip()
+        limit = int(request.args.get("limit", 10))
+        
+        if not prefix:
+            return jsonify({"error": "Search query 'q' is required", "status": 400}), 400
+        
+        limit = max(1, min(limit, 50))  # Cap at 50 results
+        
+        result = service.autocomplete_users(prefix, limit)
+        status_code = result.pop("status", 200)
+        
+        return jsonify(result), status_code
+        
+    except ValueError as ve:
+        return jsonify({"error": str(ve), "status": 400}), 400
+    except Exception as e:
+        return jsonify({"error": str(e), "status": 500}), 500
+
+@user_bp.route("/users/by-username", methods=["GET"])
+def resolve_usernames():
+    """
+    Resolve @mention usernames (the part of an email before "@") to users, served from an in-memory index.
+    
+    Query parameters:
+    - usernames: Comma-separated usernames, case-insensitive (at most 100)
+    
+    Returns:
+    {
+        "data": { "<username>": {"userid": ..., "name": ..., "email": ..., "role": ..., "username": ...}, ... },
+        "missing": [ ... usernames that matched no user ... ],
+        "status": 200
+    }
+    
+    Responses:
+        200: Usernames resolved (unknown ones are listed in "missing")
+        400: Missing usernames or too many
+        500: Internal Server Error
+    """
+    try:
+        usernames = request.args.get("usernames", "").split(",")
+        
+        result = service.resolve_usernames(usernames)
+        status_code = result.pop("status", 200)
+        
+        return jsonify(result), status_code
+        
+    except Exception as e:
+        return jsonify({"error": str(e), "status": 500}), 500
+
 @user_bp.route("/users/<int:userid>", methods=["PUT", "PATCH"])
 def update_user_by_userid(userid: int):
     """
@@ -1,15 +1,20 @@
 import os
-from typing import Optional, Dict, Any
-from supabase import create_client, Client
+from typing import Optional, Dict, Any, List
+from supabase import Client
 
-SUPABASE_URL = os.environ["SUPABASE_URL"]
-SUPABASE_KEY = os.environ["SUPABASE_SERVICE_KEY"]
+import supabase_client
 
 TABLE = "user"
 
+# Max values per PostgREST in_() filter; keeps the request URL well under proxy limits
+IN_FILTER_CHUNK_SIZE = 100
+
+# Rows per request when reading the whole user table (at or below the PostgREST row limit)
+USER_PAGE_SIZE = 1000
+
 class SupabaseUserRepo:
     def __init__(self):
-        self.client: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self.client: Client = supabase_client.get_client()
 
     def get_user_by_userid(self, userid: int) -> Optional[Dict[str, Any]]:
         """
@@ -22,6 +27,19 @@ class SupabaseUserRepo:
             # User not found or other error
             return None
 
+    def get_users_by_userids(self, userids: List[int], fields: str = "*") -> list:
+        """
+        Get many users by userid with one in_() query per chunk of IN_FILTER_CHUNK_SIZE ids.
+        Unknown userids are simply absent from the result.
+        """
+        unique_ids = list(dict.fromkeys(userids))
+        users = []
+        for start in range(0, len(unique_ids), IN_FILTER_CHUNK_SIZE):
+            chunk = unique_ids[start:start + IN_FILTER_CHUNK_SIZE]
+            res = self.client.table(TABLE).select(fields).in_("userid", chunk).execute()
+            users.extend(res.data or [])
+        return users
+
     def update_user_by_userid(self, userid: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update user details by userid.
@@ -67,6 +85,41 @@ class SupabaseUserRepo:
         )
         return res.data or []
     
+    def search_users(self, query: str, limit: int, fields: str = "*") -> list:
+        """
+        Search for users whose email or name contains the query (case-insensitive),
+        returning at most `limit` rows. Served by the trigram indexes in user_search.sql.
+        """
+        # Quote the pattern so commas and parentheses in the query cannot break the or filter
+        pattern = '"*' + query.replace('\\', '\\\\').replace('"', '\\"') + '*"'
+        res = (
+            self.client
+            .table(TABLE)
+            .select(fields)
+            .or_(f"email.ilike.{pattern},name.ilike.{pattern}")
+            .order("userid")
+            .limit(limit)
+            .execute()
+        )
+        return res.data or []
+
+    def get_all_users_by_page(self, fields: str = "*") -> list:
+        """
+        Every user, in userid order. Keyset-paginated on userid so tables larger
+        than the PostgREST row limit are read completely.
+        """
+        users = []
+        last_id = None
+        while True:
+            query = self.client.table(TABLE).select(fields)
+            if last_id is not None:
+                query = query.gt("userid", last_id)
+            page = query.order("userid").limit(USER_PAGE_SIZE).execute().data or []
+            users.extend(page)
+            if len(page) < USER_PAGE_SIZE:
+                return users
+            last_id = page[-1]["userid"]
+
     def get_all_users(self) -> list:
         """
         Retrieve all users from the system.
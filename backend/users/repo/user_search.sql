@@ -0,0 +1,14 @@
+-- Trigram indexes behind SupabaseUserRepo.search_users (GET /users/search).
+-- Run once in the Supabase SQL editor, or with psql, before deploying the
+-- users service.
+--
+-- The search matches email or name with an unanchored, case-insensitive
+-- ilike ('%query%'), which a btree index cannot serve. pg_trgm GIN indexes
+-- can, so the search no longer scans the whole user table. Autocomplete
+-- (GET /users/autocomplete) and mention lookups are answered from the
+-- in-memory UserSearchIndex and do not touch these indexes.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_user_email_trgm ON "user" USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_user_name_trgm ON "user" USING gin (name gin_trgm_ops);
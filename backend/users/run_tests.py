@@ -38,7 +38,7 @@ def run_model_tests():
         env['PYTHONPATH'] = os.getcwd()
         
         result = subprocess.run([sys.executable, "-m", "unittest", 
-                               "test_user_model", "-v"],
+                               "test_user_model", "test_user_search_index", "-v"],
                               cwd="tests", capture_output=True, text=True, env=env)
         
         print("Model Test Results:")
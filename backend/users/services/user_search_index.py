@@ -0,0 +1,222 @@
+"""
+In-memory index of the user table for autocomplete and @mention lookups.
+
+Mention autocomplete searches users on every keystroke. The search used to run
+an unanchored ilike over email with select("*"), build a User for every match
+and only then stop at the limit. Resolving the @mentions of a new comment used
+to download the whole user table in the comments service. Both are answered
+from this index instead:
+
+- sorted (key, userid) entries, where the keys of a user are the lowercased
+  username (email local part), the email, the full name, and every word of
+  the name and of the username ("john.smith" also matches "smith")
+- a search bisects to the first key starting with the prefix and walks forward
+  until it has `limit` distinct users, so its cost is O(log n + limit) whatever
+  the table size
+- a username -> user map for exact mention lookups; when two users share a
+  local part, the lowest userid wins
+- results hold only the fields the dropdown shows (userid, name, email, role,
+  username)
+- built by paging through the user table on userid. Only the first build
+  blocks a request: once USER_SEARCH_INDEX_TTL seconds have passed, the next
+  lookup starts a rebuild on a background thread and keeps answering from the
+  current index, so keystrokes never wait for the table to load
+- a mention lookup that misses starts an early background rebuild, at most
+  every USER_SEARCH_INDEX_MISS_REFRESH seconds; upsert() applies users created
+  or updated through this service right away
+- rebuilds and upserts swap in new structures whole, so lookups never take a lock
+
+Run bench_user_autocomplete.py in the users directory for latencies on a 100k-user table.
+
+Environment variables:
+    USER_SEARCH_INDEX_TTL           Seconds before the index is rebuilt from the user table (default 300)
+    USER_SEARCH_INDEX_MISS_REFRESH  Minimum seconds between rebuilds caused by unknown usernames (default 30)
+"""
+import bisect
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+USER_SEARCH_INDEX_TTL = float(os.getenv("USER_SEARCH_INDEX_TTL", "300"))
+USER_SEARCH_INDEX_MISS_REFRESH = float(os.getenv("USER_SEARCH_INDEX_MISS_REFRESH", "30"))
+
+# Columns loaded into the index and returned by autocomplete
+AUTOCOMPLETE_FIELDS = "userid, name, email, role"
+
+_WORD_SEPARATORS = re.compile(r"[\s._\-+]+")
+
+
+def _username(email: Optional[str]) -> str:
+    if not email:
+        return ""
+    at_index = email.find('@')
+    return email[:at_index] if at_index > 0 else email
+
+
+def _keys(user: Dict[str, Any]) -> List[str]:
+    """Lowercased strings a user can be found by"""
+    email = (user.get('email') or "").lower()
+    name = (user.get('name') or "").lower().strip()
+    username = _username(email)
+    keys = {email, name, username}
+    keys.update(_WORD_SEPARATORS.split(name))
+    keys.update(_WORD_SEPARATORS.split(username))
+    keys.discard("")
+    return sorted(keys)
+
+
+class UserSearchIndex:
+    """Sorted prefix index and username map over the user table, rebuilt in the background."""
+
+    def __init__(self, load_users: Callable[[], Iterable[Dict[str, Any]]], ttl: float = USER_SEARCH_INDEX_TTL,
+                 miss_refresh: float = USER_SEARCH_INDEX_MISS_REFRESH):
+        """
+        Args:
+            load_users: Returns every user with at least userid, name, email and role, in userid order
+            ttl: Seconds before the index is rebuilt
+            miss_refresh: Minimum seconds between rebuilds caused by unknown usernames
+        """
+        self.load_users = load_users
+        self.ttl = ttl
+        self.miss_refresh = miss_refresh
+        self._entries: List[Tuple[str, int]] = []
+        self._users: Dict[int, Dict[str, Any]] = {}
+        self._by_username: Dict[str, Dict[str, Any]] = {}
+        self._built_at: Optional[float] = None
+        self._build_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` users with a key starting with `prefix` (case-insensitive),
+        in key order. Returns projected user dicts.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix or limit < 1:
+            return []
+        self._ensure_fresh()
+
+        entries, users = self._entries, self._users
+        found: Dict[int, Dict[str, Any]] = {}
+        # (prefix,) sorts before every (key, userid) with key >= prefix
+        position = bisect.bisect_left(entries, (prefix,))
+        while position < len(entries) and len(found) < limit:
+            key, userid = entries[position]
+            if not key.startswith(prefix):
+                break
+            if userid not in found and userid in users:
+                found[userid] = users[userid]
+            position += 1
+        return list(found.values())
+
+    def resolve_usernames(self, usernames: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up many usernames at once (case-insensitive). Returns
+        {lowercased username: projected user}; unknown usernames are absent.
+        """
+        wanted = {username.strip().lower() for username in usernames if username and username.strip()}
+        if not wanted:
+            return {}
+        self._ensure_fresh()
+
+        by_username = self._by_username
+        found = {username: by_username[username] for username in wanted if username in by_username}
+        if len(found) < len(wanted) and time.monotonic() - (self._built_at or 0) >= self.miss_refresh:
+            # Users added behind this service's back become mentionable after the rebuild
+            self.refresh_in_background()
+        return found
+
+    def refresh(self) -> int:
+        """Rebuild the index from the user table. Returns how many users it holds."""
+        requested_at = time.monotonic()
+        with self._build_lock:
+            # Another thread finished a rebuild while this one waited for the lock
+            if self._built_at is not None and self._built_at >= requested_at:
+                return len(self._users)
+
+            users: Dict[int, Dict[str, Any]] = {}
+            entries: List[Tuple[str, int]] = []
+            for user in self.load_users():
+                projected = self._project(user)
+                users[projected['userid']] = projected
+                entries.extend((key, projected['userid']) for key in _keys(projected))
+            entries.sort()
+            with self._write_lock:
+                self._entries, self._users = entries, users
+                self._by_username = self._username_map(users.values())
+                self._built_at = time.monotonic()
+            return len(users)
+
+    def refresh_in_background(self) -> threading.Thread:
+        """
+        Start a rebuild on a daemon thread unless one is already running, and
+        return the thread doing the rebuild. Lookups keep using the current
+        index until it finishes.
+        """
+        with self._refresh_lock:
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(
+                    target=self._refresh_safely, name="user-search-index-refresh", daemon=True
+                )
+                self._refresh_thread.start()
+            return self._refresh_thread
+
+    def upsert(self, user: Dict[str, Any]) -> None:
+        """Add or replace one user, e.g. right after it was created or updated."""
+        if self._built_at is None or user.get('userid') is None:
+            # Not built yet: the first lookup loads the user from the table anyway
+            return
+        projected = self._project(user)
+        userid = projected['userid']
+        with self._write_lock:
+            users = dict(self._users)
+            entries = list(self._entries)
+            previous = users.get(userid)
+            if previous is not None:
+                for key in _keys(previous):
+                    position = bisect.bisect_left(entries, (key, userid))
+                    if position < len(entries) and entries[position] == (key, userid):
+                        del entries[position]
+            for key in _keys(projected):
+                bisect.insort(entries, (key, userid))
+            users[userid] = projected
+            self._entries, self._users = entries, users
+            # users keeps the table's userid order, so the lowest userid still wins
+            self._by_username = self._username_map(users.values())
+
+    def _ensure_fresh(self) -> None:
+        if self._built_at is None:
+            # Nothing to serve yet: the very first lookups wait for the build
+            self._refresh_safely()
+        elif time.monotonic() - self._built_at >= self.ttl:
+            self.refresh_in_background()
+
+    def _refresh_safely(self) -> None:
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep answering from the previous index until the user table is reachable again
+            print(f"Error refreshing user search index: {e}")
+
+    @staticmethod
+    def _username_map(users: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Lowercased username -> user, keeping the first user (lowest userid) per username"""
+        by_username: Dict[str, Dict[str, Any]] = {}
+        for user in users:
+            if user['username']:
+                by_username.setdefault(user['username'].lower(), user)
+        return by_username
+
+    @staticmethod
+    def _project(user: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "userid": user.get('userid'),
+            "name": user.get('name') or "",
+            "email": user.get('email') or "",
+            "role": user.get('role') or "",
+            "username": _username(user.get('email')),
+        }
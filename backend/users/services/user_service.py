@@ -1,10 +1,23 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 from models.user import User
 from repo.supa_user_repo import SupabaseUserRepo
+from services.user_search_index import AUTOCOMPLETE_FIELDS, UserSearchIndex
+
+# Columns that may be requested through the bulk lookup's field projection
+USER_COLUMNS = ("id", "userid", "role", "name", "email", "team_id", "dept_id", "notification_preferences")
+
+# Max userids accepted by one bulk lookup
+MAX_BULK_USER_IDS = 500
+
+# Max usernames accepted by one mention lookup
+MAX_USERNAME_LOOKUP = 100
 
 class UserService:
-    def __init__(self, repo: Optional[SupabaseUserRepo] = None):
+    def __init__(self, repo: Optional[SupabaseUserRepo] = None, search_index: Optional[UserSearchIndex] = None):
         self.repo = repo or SupabaseUserRepo()
+        self.search_index = search_index or UserSearchIndex(
+            lambda: self.repo.get_all_users_by_page(AUTOCOMPLETE_FIELDS)
+        )
 
     def get_user_by_userid(self, userid: int) -> Dict[str, Any]:
         """
@@ -21,6 +34,54 @@ class UserService:
         except Exception as e:
             return {"status": 500, "message": f"Failed to parse user data: {str(e)}"}
 
+    def get_users_by_userids(self, userids: List[int], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Get many users by userid in one lookup.
+        Userids that do not exist are listed under "missing".
+        With fields, only those columns (plus userid) are returned.
+        """
+        if not userids:
+            return {"status": 400, "message": "At least one userid is required"}
+        if len(userids) > MAX_BULK_USER_IDS:
+            return {"status": 400, "message": f"At most {MAX_BULK_USER_IDS} userids can be requested at once"}
+
+        if fields:
+            invalid = [f for f in fields if f not in USER_COLUMNS]
+            if invalid:
+                return {"status": 400, "message": f"Invalid fields: {invalid}. Valid fields are: {list(USER_COLUMNS)}"}
+            columns = ["userid"] + [f for f in dict.fromkeys(fields) if f != "userid"]
+            select = ",".join(columns)
+        else:
+            select = "*"
+
+        try:
+            users_data = self.repo.get_users_by_userids(userids, select)
+
+            users = []
+            for user_data in users_data:
+                if fields:
+                    # Projected rows cannot be validated as a full User
+                    users.append(user_data)
+                    continue
+                try:
+                    user = User(**user_data)
+                    users.append(user.__dict__)
+                except Exception as e:
+                    print(f"Warning: Failed to parse user data: {str(e)}")
+                    continue
+
+            found = {user.get("userid") for user in users}
+            missing = [userid for userid in dict.fromkeys(userids) if userid not in found]
+
+            return {
+                "status": 200,
+                "message": f"Retrieved {len(users)} user(s)",
+                "data": users,
+                "missing": missing
+            }
+        except Exception as e:
+            return {"status": 500, "message": f"Failed to get users: {str(e)}"}
+
     def update_user_by_userid(self, userid: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Update user details by userid.
@@ -48,6 +109,7 @@ class UserService:
             
             # Update in repository
             updated_user_data = self.repo.update_user_by_userid(userid, filtered_data)
+            self.search_index.upsert(updated_user_data)
             
             # Return updated User object
             updated_user = User(**updated_user_data)
@@ -148,6 +210,7 @@ class UserService:
             
             # Create in repository
             created_user_data = self.repo.create_user(filtered_data)
+            self.search_index.upsert(created_user_data)
             
             # Return created User object
             created_user = User(**created_user_data)
@@ -201,38 +264,25 @@ class UserService:
 
     def search_users(self, search_query: str, limit: int = 10) -> Dict[str, Any]:
         """
-        Search users for mention suggestions.
-        Searches by username (extracted from email) and email.
+        Search users whose email or name contains the query.
+        The limit is applied by the database; for keystroke-driven suggestions use autocomplete_users.
         """
         try:
-            # Search users by email substring
-            users_data = self.repo.search_users_by_email(search_query)
+            users_data = self.repo.search_users(search_query, limit)
             
-            # Filter and limit results
             filtered_users = []
             for user_data in users_data:
-                if len(filtered_users) >= limit:
-                    break
-                    
-                # Extract username from email for additional matching
-                email = user_data.get('email', '')
-                if email:
-                    username = email.split('@')[0] if '@' in email else email
-                    
-                    # Check if search query matches username or email
-                    if (search_query.lower() in email.lower() or 
-                        search_query.lower() in username.lower()):
-                        
-                        # Convert to User object for validation
-                        try:
-                            user = User(**user_data)
-                            # Add username field for frontend convenience
-                            user_dict = user.__dict__
-                            user_dict['username'] = username
-                            filtered_users.append(user_dict)
-                        except Exception as e:
-                            print(f"Warning: Failed to parse user data: {str(e)}")
-                            continue
+                # Convert to User object for validation
+                try:
+                    user = User(**user_data)
+                    # Add username field for frontend convenience
+                    user_dict = user.__dict__
+                    email = user_data.get('email') or ''
+                    user_dict['username'] = email.split('@')[0] if '@' in email else email
+                    filtered_users.append(user_dict)
+                except Exception as e:
+                    print(f"Warning: Failed to parse user data: {str(e)}")
+                    continue
 
             return {
                 "status": 200,
@@ -242,7 +292,45 @@ class UserService:
             
         except Exception as e:
             return {"status": 500, "message": f"Failed to search users: {str(e)}"}
+
+    def autocomplete_users(self, prefix: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Users whose username, email, name or a word of their name starts with the prefix,
+        answered from the in-process prefix index. Returns userid, name, email, role and username.
+        """
+        try:
+            users = self.search_index.search(prefix, limit)
+            return {
+                "status": 200,
+                "message": f"Found {len(users)} user(s) matching '{prefix}'",
+                "data": users
+            }
+        except Exception as e:
+            return {"status": 500, "message": f"Failed to search users: {str(e)}"}
         
+    def resolve_usernames(self, usernames: List[str]) -> Dict[str, Any]:
+        """
+        Users for many @mention usernames (email local parts, case-insensitive) in one
+        lookup, answered from the in-process index. "data" maps each lowercased username
+        to userid, name, email, role and username; unknown usernames are listed under "missing".
+        """
+        wanted = list(dict.fromkeys(username.strip().lower() for username in usernames if username.strip()))
+        if not wanted:
+            return {"status": 400, "message": "At least one username is required"}
+        if len(wanted) > MAX_USERNAME_LOOKUP:
+            return {"status": 400, "message": f"At most {MAX_USERNAME_LOOKUP} usernames can be requested at once"}
+
+        try:
+            found = self.search_index.resolve_usernames(wanted)
+            return {
+                "status": 200,
+                "message": f"Resolved {len(found)} of {len(wanted)} username(s)",
+                "data": found,
+                "missing": [username for username in wanted if username not in found]
+            }
+        except Exception as e:
+            return {"status": 500, "message": f"Failed to resolve usernames: {str(e)}"}
+
     def get_all_users(self) -> Dict[str, Any]:
         """
         Get all users across the company (all departments and teams).
@@ -6,6 +6,8 @@ import uuid
 
 # Add parent directory to path to find modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from services.user_service import UserService
 from models.user import User
 from repo.supa_user_repo import SupabaseUserRepo
@@ -292,6 +294,31 @@ class TestUserControllerIntegration(unittest.TestCase):
         # Assertions - should return 404 due to Flask routing
         self.assertEqual(response.status_code, 404)
 
+    # ==================== get_users_by_userids Tests ====================
+
+    def test_get_users_by_userids_success(self):
+        """Test bulk lookup returns found users and lists unknown userids as missing."""
+        response = self.client.get('/users?ids=297,99999')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual([user["userid"] for user in data["data"]], [297])
+        self.assertEqual(data["missing"], [99999])
+
+    def test_get_users_by_userids_with_fields(self):
+        """Test bulk lookup only returns the requested columns plus userid."""
+        response = self.client.get('/users?ids=297&fields=name,email')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(set(data["data"][0].keys()), {"userid", "name", "email"})
+
+    def test_get_users_by_userids_invalid_input(self):
+        """Test bulk lookup rejects missing ids, non-integer ids and unknown fields."""
+        self.assertEqual(self.client.get('/users').status_code, 400)
+        self.assertEqual(self.client.get('/users?ids=1,abc').status_code, 400)
+        self.assertEqual(self.client.get('/users?ids=297&fields=password').status_code, 400)
+
 
     # ==================== update_user_by_userid Tests ====================
     
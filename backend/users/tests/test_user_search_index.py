@@ -0,0 +1,179 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add parent directory to path to find modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# and the backend directory for the shared modules (supabase_client, service_client)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from services.user_search_index import UserSearchIndex
+from services.user_service import UserService
+from repo import supa_user_repo
+
+
+def _user(userid, name, email):
+    return {"userid": userid, "name": name, "email": email, "role": "staff", "team_id": 1}
+
+
+class TestUserSearchIndex(unittest.TestCase):
+    """Unit tests for the autocomplete prefix index."""
+
+    def setUp(self):
+        self.users = [
+            _user(1, "Alice Smith", "alice.smith@example.com"),
+            _user(2, "Bob Tan", "bob@example.com"),
+            _user(3, "Alicia Keys", "akeys@example.com"),
+        ]
+        self.load_users = MagicMock(side_effect=lambda: list(self.users))
+        self.index = UserSearchIndex(self.load_users)
+
+    def test_prefix_matches_username_email_and_name_words(self):
+        """Test a prefix finds users by username, name and any word of either."""
+        assert [u["userid"] for u in self.index.search("ali", 10)] == [1, 3]
+        assert [u["userid"] for u in self.index.search("SMI", 10)] == [1]
+        assert [u["userid"] for u in self.index.search("keys", 10)] == [3]
+        assert [u["userid"] for u in self.index.search("akeys@", 10)] == [3]
+        assert self.index.search("zed", 10) == []
+        assert self.load_users.call_count == 1
+
+    def test_results_are_limited_and_projected(self):
+        """Test the limit stops the walk and only dropdown fields are returned."""
+        results = self.index.search("al", 1)
+
+        assert results == [{"userid": 1, "name": "Alice Smith", "email": "alice.smith@example.com",
+                            "role": "staff", "username": "alice.smith"}]
+
+    def test_upsert_applies_changes_without_a_reload(self):
+        """Test created and renamed users are searchable right away."""
+        self.index.search("a", 10)
+        self.index.upsert(_user(4, "Carol Ng", "carol@example.com"))
+        self.index.upsert(_user(2, "Robert Tan", "bob@example.com"))
+
+        assert [u["userid"] for u in self.index.search("carol", 10)] == [4]
+        assert [u["userid"] for u in self.index.search("robert", 10)] == [2]
+        assert self.index.search("bob", 10)[0]["name"] == "Robert Tan"
+        assert self.index.search("b", 10)[0]["userid"] == 2
+        assert len(self.index.search("tan", 10)) == 1
+        assert self.load_users.call_count == 1
+
+    def test_expired_index_is_rebuilt_in_the_background(self):
+        """Test an expired index keeps answering while it reloads, and a failed reload keeps it."""
+        self.index.search("a", 10)
+        self.users.append(_user(5, "Dana Lee", "dana@example.com"))
+        self.index.ttl = 0
+
+        # The lookup starts the reload on another thread
+        self.index.search("dana", 10)
+        self.index.refresh_in_background().join()
+        assert [u["userid"] for u in self.index.search("dana", 10)] == [5]
+
+        self.load_users.side_effect = RuntimeError("connection refused")
+        self.index.refresh_in_background().join()
+        assert [u["userid"] for u in self.index.search("dana", 10)] == [5]
+
+    def test_slow_reload_does_not_block_lookups(self):
+        """Test lookups return right away while a rebuild is still loading the table."""
+        import threading
+        self.index.search("a", 10)
+        loading, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            loading.set()
+            release.wait(5)
+            return list(self.users)
+
+        self.load_users.side_effect = slow_load
+        self.index.ttl = 0
+        try:
+            assert [u["userid"] for u in self.index.search("bob", 10)] == [2]
+            assert loading.wait(5)
+            assert self.index.resolve_usernames(["bob"])["bob"]["userid"] == 2
+        finally:
+            release.set()
+            self.index.refresh_in_background().join()
+
+    def test_resolve_usernames(self):
+        """Test mentions resolve case-insensitively on the email local part, lowest userid first."""
+        self.users.append(_user(6, "Other Bob", "BOB@other.example"))
+
+        found = self.index.resolve_usernames(["Alice.Smith", "bob", "nobody"])
+
+        assert set(found) == {"alice.smith", "bob"}
+        assert found["alice.smith"]["userid"] == 1
+        assert found["bob"]["userid"] == 2
+        assert self.load_users.call_count == 1
+
+    def test_username_miss_triggers_a_rate_limited_background_rebuild(self):
+        """Test a user added behind the service becomes mentionable, without reloading on every typo."""
+        self.index.miss_refresh = 0
+        self.index.resolve_usernames(["alice.smith"])
+        self.users.append(_user(7, "Erin Ng", "erin@example.com"))
+
+        assert self.index.resolve_usernames(["erin"]) == {}
+        self.index.refresh_in_background().join()
+        assert self.index.resolve_usernames(["erin"])["erin"]["userid"] == 7
+
+        calls = self.load_users.call_count
+        self.index.miss_refresh = 300
+        assert self.index.resolve_usernames(["nobody"]) == {}
+        assert self.load_users.call_count == calls
+
+    def test_upsert_updates_the_username_map(self):
+        """Test a changed email moves the user to its new username right away."""
+        self.index.resolve_usernames(["bob"])
+        self.index.upsert(_user(2, "Bob Tan", "robert@example.com"))
+
+        assert self.index.resolve_usernames(["bob", "robert"]) == {
+            "robert": {"userid": 2, "name": "Bob Tan", "email": "robert@example.com",
+                       "role": "staff", "username": "robert"}
+        }
+
+
+class TestUserSearchQueries(unittest.TestCase):
+    """Unit tests for the search queries sent to the user table."""
+
+    @patch("repo.supa_user_repo.supabase_client.get_client")
+    def test_search_pushes_limit_and_name_matching_into_the_query(self, mock_get_client):
+        """Test the substring search filters on email or name and limits in the database."""
+        mock_get_client.return_value = MagicMock()
+        repo = supa_user_repo.SupabaseUserRepo()
+        query = repo.client.table.return_value.select.return_value
+
+        repo.search_users('al, "x"', 5)
+
+        query.or_.assert_called_once_with('email.ilike."*al, \\"x\\"*",name.ilike."*al, \\"x\\"*"')
+        query.or_.return_value.order.return_value.limit.assert_called_once_with(5)
+
+    def test_service_autocomplete_and_write_paths_share_the_index(self):
+        """Test autocomplete reads the index and writes through the service update it."""
+        repo = MagicMock()
+        index = MagicMock()
+        index.search.return_value = [{"userid": 1}]
+        service = UserService(repo=repo, search_index=index)
+        repo.create_user.return_value = {"id": "a6b2c1d0-0000-0000-0000-000000000001", "userid": 9,
+                                         "role": "staff", "name": "New", "email": "new@example.com"}
+
+        assert service.autocomplete_users("al", 5) == {"status": 200, "message": "Found 1 user(s) matching 'al'",
+                                                        "data": [{"userid": 1}]}
+        service.create_user(dict(repo.create_user.return_value))
+
+        index.search.assert_called_once_with("al", 5)
+        index.upsert.assert_called_once_with(repo.create_user.return_value)
+
+    def test_service_resolves_usernames_from_the_index(self):
+        """Test the mention lookup normalizes usernames and lists the unknown ones."""
+        index = MagicMock()
+        index.resolve_usernames.return_value = {"bob": {"userid": 2}}
+        service = UserService(repo=MagicMock(), search_index=index)
+
+        result = service.resolve_usernames(["Bob", " bob", "nobody", ""])
+
+        assert result == {"status": 200, "message": "Resolved 1 of 2 username(s)",
+                          "data": {"bob": {"userid": 2}}, "missing": ["nobody"]}
+        index.resolve_usernames.assert_called_once_with(["bob", "nobody"])
+        assert service.resolve_usernames([""])["status"] == 400
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,11 @@ import { ref, reactive } from 'vue';
 // Notification service for API calls
 const NOTIFICATION_API = 'http://127.0.0.1:5006';
 const USER_API = 'http://127.0.0.1:5003';
+// WebSocket push hub of the notification service
+const NOTIFICATION_STREAM = 'ws://127.0.0.1:5016';
+
+// Notifications loaded per page; older pages are fetched on demand
+const NOTIFICATION_PAGE_SIZE = 20;
 
 // Helper function for API requests
 async function request(url, options = {}) {
@@ -22,9 +27,13 @@ async function request(url, options = {}) {
 
 // Notification API functions
 export const notificationService = {
-  // Get all notifications for a user
-  async getUserNotifications(userId) {
-    return await request(`${NOTIFICATION_API}/notifications/user/${userId}`);
+  // Get notifications for a user, newest first
+  // params (optional): { limit, cursor, since, fields }
+  async getUserNotifications(userId, params = {}) {
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([, value]) => value !== undefined && value !== null)
+    ).toString();
+    return await request(`${NOTIFICATION_API}/notifications/user/${userId}${query ? `?${query}` : ''}`);
   },
 
   // Get unread notifications for a user
@@ -56,6 +65,29 @@ export const notificationService = {
     });
   },
 
+  // Mark several of a user's notifications as read in one request
+  async markManyAsRead(userId, notificationIds) {
+    return await request(`${NOTIFICATION_API}/notifications/user/${userId}/read`, {
+      method: 'PUT',
+      body: JSON.stringify({ ids: notificationIds })
+    });
+  },
+
+  // Mark every unread notification of a user as read
+  async markAllAsRead(userId) {
+    return await request(`${NOTIFICATION_API}/notifications/user/${userId}/read-all`, {
+      method: 'PUT'
+    });
+  },
+
+  // Delete several of a user's notifications in one request
+  async deleteNotifications(userId, notificationIds) {
+    return await request(`${NOTIFICATION_API}/notifications/user/${userId}/delete`, {
+      method: 'POST',
+      body: JSON.stringify({ ids: notificationIds })
+    });
+  },
+
   // Delete a notification
   async deleteNotification(notificationId) {
     return await request(`${NOTIFICATION_API}/notifications/${notificationId}`, {
@@ -193,14 +225,22 @@ export const notificationUtils = {
   }
 };
 
+// Push stream connection (kept outside the reactive store)
+let stream = null;
+let streamUserId = null;
+let reconnectDelay = 1000;
+const MAX_RECONNECT_DELAY = 30000;
+
 // Reactive notification store (simple state management)
 export const notificationStore = reactive({
   notifications: [],
   unreadCount: 0,
+  // Cursor of the next older page, null once everything is loaded
+  nextCursor: null,
   loading: false,
   error: null,
 
-  // Initialize store with user notifications
+  // Initialize store with the latest page of user notifications
   async init(userId) {
     if (!userId) return;
     
@@ -209,25 +249,117 @@ export const notificationStore = reactive({
     
     try {
       const [notificationsRes, unreadCountRes] = await Promise.all([
-        notificationService.getUserNotifications(userId),
+        notificationService.getUserNotifications(userId, { limit: NOTIFICATION_PAGE_SIZE }),
         notificationService.getUnreadCount(userId)
       ]);
       
       this.notifications = notificationsRes.data || [];
+      this.nextCursor = notificationsRes.next_cursor || null;
       this.unreadCount = unreadCountRes.data?.unread_count || 0;
     } catch (error) {
       console.error('Failed to initialize notification store:', error);
       this.error = error.message;
       this.notifications = [];
+      this.nextCursor = null;
       this.unreadCount = 0;
     } finally {
       this.loading = false;
     }
   },
 
-  // Refresh notifications
+  // Refresh notifications: fetch only the ones created since the newest loaded
   async refresh(userId) {
-    await this.init(userId);
+    if (!userId) return;
+    if (this.notifications.length === 0) {
+      await this.init(userId);
+      return;
+    }
+    
+    const [newRes, unreadCountRes] = await Promise.all([
+      notificationService.getUserNotifications(userId, {
+        since: this.notifications[0].created_at,
+        limit: NOTIFICATION_PAGE_SIZE
+      }),
+      notificationService.getUnreadCount(userId)
+    ]);
+    
+    const fresh = newRes.data || [];
+    if (newRes.next_cursor) {
+      // More new notifications than one page: start over from the latest page
+      await this.init(userId);
+      return;
+    }
+    
+    const known = new Set(this.notifications.map(n => n.id));
+    this.notifications.unshift(...fresh.filter(n => !known.has(n.id)));
+    this.unreadCount = unreadCountRes.data?.unread_count || 0;
+  },
+
+  // Append the next older page of notifications
+  async loadMore(userId) {
+    if (!userId || !this.nextCursor) return;
+    
+    const res = await notificationService.getUserNotifications(userId, {
+      cursor: this.nextCursor,
+      limit: NOTIFICATION_PAGE_SIZE
+    });
+    
+    const known = new Set(this.notifications.map(n => n.id));
+    this.notifications.push(...(res.data || []).filter(n => !known.has(n.id)));
+    this.nextCursor = res.next_cursor || null;
+  },
+
+  // Receive notifications pushed by the notification service instead of polling.
+  // On every (re)connect the hub first replays what was created since the newest loaded one.
+  connect(userId) {
+    if (!userId || typeof WebSocket === 'undefined') return;
+    if (stream && streamUserId === userId) return;
+    this.disconnect();
+    
+    streamUserId = userId;
+    const since = this.notifications[0]?.created_at;
+    const url = `${NOTIFICATION_STREAM}/notifications/stream/${userId}` +
+      (since ? `?since=${encodeURIComponent(since)}` : '');
+    const socket = new WebSocket(url);
+    stream = socket;
+    
+    socket.onopen = () => {
+      reconnectDelay = 1000;
+    };
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'notification') {
+        this.receive(message.data);
+      }
+    };
+    socket.onclose = () => {
+      if (stream !== socket) return;
+      stream = null;
+      // Reconnect with backoff while the user is still subscribed
+      setTimeout(() => {
+        if (streamUserId === userId && !stream) this.connect(userId);
+      }, reconnectDelay);
+      reconnectDelay = Math.min(reconnectDelay * 2, MAX_RECONNECT_DELAY);
+    };
+  },
+
+  // Stop receiving pushed notifications
+  disconnect() {
+    streamUserId = null;
+    if (stream) {
+      const socket = stream;
+      stream = null;
+      socket.close();
+    }
+  },
+
+  // Add a pushed notification to the store (duplicates from a replay are ignored)
+  receive(notification) {
+    if (this.notifications.some(n => n.id === notification.id)) return;
+    this.notifications.unshift(notification);
+    if (!notification.is_read) {
+      this.unreadCount += 1;
+    }
   },
 
   // Mark notification as read and update store
@@ -264,6 +396,20 @@ export const notificationStore = reactive({
     }
   },
 
+  // Mark every notification of the user as read and update store
+  async markAllAsRead(userId) {
+    try {
+      await notificationService.markAllAsRead(userId);
+      
+      // Update local state
+      this.notifications.forEach(n => { n.is_read = true; });
+      this.unreadCount = 0;
+    } catch (error) {
+      console.error('Failed to mark all notifications as read:', error);
+      throw error;
+    }
+  },
+
   // Delete notification and update store
   async deleteNotification(notificationId) {
     try {